@@ -117,6 +117,9 @@ async def run_demo():
     fancy_print("Final Response", "subheader")
     print(response)
     
+    # Release pooled connections before the event loop shuts down
+    await orchestrator.claude_client.aclose()
+    
     # Closing message
     fancy_print("\nDemo completed! This demonstration showed how the orchestrator consulted multiple specialized agents to provide a comprehensive response.", "info")
     fancy_print("The real-time notifications showed which agents were being invoked, making the internal processing visible to the user.", "info")
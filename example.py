@@ -72,6 +72,9 @@ async def main():
         response = await orchestrator.process_query(query)
         print(f"\n[RESPONSE]\n{response}")
         print("\n" + "-"*80)
+    
+    # Release pooled connections before the event loop shuts down
+    await orchestrator.claude_client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -69,6 +69,10 @@ class NVIDIASalesAgent:
     async def process_query(self, query):
         """Process a user query and return the response."""
         return await self.orchestrator.process_query(query)
+    
+    async def aclose(self):
+        """Release pooled HTTP connections held by the Claude client."""
+        await self.orchestrator.claude_client.aclose()
 
 async def interactive_mode():
     """Run the sales agent in interactive mode where users can type queries."""
@@ -92,6 +96,8 @@ async def interactive_mode():
         print("\nNVIDIA Sales Agent:")
         response = await agent.process_query(user_input)
         print(f"\n{response}")
+    
+    await agent.aclose()
 
 async def demo_mode():
     """Run the sales agent in demo mode with predefined queries."""
@@ -122,6 +128,8 @@ async def demo_mode():
             print("\n" + "-" * 50)
             input("Press Enter for next demo query...")
     
+    await agent.aclose()
+    
     print("\nDemo completed! Thank you for using the NVIDIA Sales Agent.")
 
 if __name__ == "__main__":
@@ -0,0 +1,385 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import httpx
+
+
+class CassetteMissError(httpx.TransportError):
+    """
+    Raised by CassetteReplayer when a request was never recorded.
+
+    It stands in for a failed network exchange, so retry and circuit breaker
+    handling treat it like any other transport error.
+    """
+
+
+def request_fingerprint(request_body: Dict[str, Any]) -> str:
+    """
+    Identify a /v1/messages request independently of whether it was streamed.
+
+    Args:
+        request_body: The JSON request body
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical request
+    """
+    body = {key: value for key, value in request_body.items() if key != "stream"}
+    payload = json.dumps(body, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def message_to_sse_events(message: Dict[str, Any], words_per_chunk: int = 3) -> List[Dict[str, Any]]:
+    """
+    Turn a complete Messages API response into the equivalent stream events.
+
+    Args:
+        message: A non-streaming /v1/messages response body
+        words_per_chunk: Words per content_block_delta event
+
+    Returns:
+        list: Event payloads in the order the API would send them
+    """
+    text = "".join(block.get("text", "") for block in message.get("content", []))
+    usage = dict(message.get("usage") or {})
+    start_message = dict(message)
+    start_message["content"] = []
+    start_message["stop_reason"] = None
+    start_message["usage"] = dict(usage, output_tokens=1)
+
+    events = [
+        {"type": "message_start", "message": start_message},
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+    ]
+    words = text.split(" ")
+    for i in range(0, len(words), words_per_chunk):
+        piece = " ".join(words[i:i + words_per_chunk])
+        if i + words_per_chunk < len(words):
+            piece += " "
+        events.append({
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": piece}
+        })
+    events.extend([
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": message.get("stop_reason", "end_turn"), "stop_sequence": None},
+            "usage": {"output_tokens": usage.get("output_tokens", 0)}
+        },
+        {"type": "message_stop"},
+    ])
+    return events
+
+
+def format_sse_event(event: Dict[str, Any]) -> bytes:
+    """Encode one event payload in server-sent event wire format"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+def sse_to_message(body: str) -> Dict[str, Any]:
+    """
+    Reassemble a complete response body from a recorded event stream.
+
+    Args:
+        body: The raw text/event-stream body
+
+    Returns:
+        dict: The equivalent non-streaming /v1/messages response
+    """
+    message = {}
+    usage = {}
+    text = []
+    for line in body.splitlines():
+        if not line.startswith("data:"):
+            continue
+        event = json.loads(line[5:].strip())
+        event_type = event.get("type")
+        if event_type == "message_start":
+            message = dict(event.get("message", {}))
+            usage.update(message.get("usage") or {})
+        elif event_type == "content_block_delta" and event["delta"].get("type") == "text_delta":
+            text.append(event["delta"]["text"])
+        elif event_type == "message_delta":
+            usage.update(event.get("usage") or {})
+            message["stop_reason"] = event.get("delta", {}).get("stop_reason")
+    message["content"] = [{"type": "text", "text": "".join(text)}]
+    message["usage"] = usage
+    return message
+
+
+class Cassette:
+    """
+    Append-only JSON-lines file of recorded /v1/messages exchanges.
+
+    Each line holds the request fingerprint, the model, the observed latency and
+    the response (status, retry-after and the complete message or error body).
+    Prompts themselves are not stored. Paths ending in .gz are gzip-compressed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: File to read from and append to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Read every recorded exchange grouped by request fingerprint.
+
+        Returns:
+            dict: Fingerprint to the list of entries in recording order
+        """
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with self._open("r") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    entries.setdefault(entry["key"], []).append(entry)
+        return entries
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Append one exchange to the file.
+
+        Args:
+            entry: The entry to record
+        """
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            with self._open("a") as f:
+                f.write(line + "\n")
+
+
+class CassetteRecorder(httpx.AsyncBaseTransport):
+    """
+    httpx transport that forwards requests to the real API and records them.
+
+    Streamed responses are read completely before being handed back, so
+    recording runs show no streaming benefit; replay restores it.
+    """
+
+    requires_api_key = True
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Cassette file to append to
+            inner: Transport used to reach the API (defaults to a plain HTTP transport)
+        """
+        self.cassette = Cassette(path)
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._inner is None:
+            self._inner = httpx.AsyncHTTPTransport()
+        if request.method != "POST" or not request.url.path.endswith("/messages"):
+            return await self._inner.handle_async_request(request)
+
+        request_body = json.loads(request.content)
+        started = time.monotonic()
+        response = await self._inner.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        latency = time.monotonic() - started
+
+        text = content.decode("utf-8", errors="replace")
+        entry = {
+            "key": request_fingerprint(request_body),
+            "model": request_body.get("model"),
+            "latency_ms": round(latency * 1000, 1),
+            "status": response.status_code,
+        }
+        if response.status_code == 200:
+            if "text/event-stream" in response.headers.get("content-type", ""):
+                entry["message"] = sse_to_message(text)
+            else:
+                entry["message"] = json.loads(text)
+        else:
+            entry["error"] = text
+            if response.headers.get("retry-after"):
+                entry["retry_after"] = response.headers["retry-after"]
+        self.cassette.append(entry)
+
+        headers = [(k, v) for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        if self._inner is not None:
+            await self._inner.aclose()
+            self._inner = None
+
+
+class _DelayedEventStream(httpx.AsyncByteStream):
+    """Response body that releases SSE events with the configured pacing"""
+
+    def __init__(self, events: List[Dict[str, Any]], first_delay: float, chunk_delay: float):
+        self.events = events
+        self.first_delay = first_delay
+        self.chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        first = True
+        for event in self.events:
+            if event["type"] == "content_block_delta":
+                await asyncio.sleep(self.first_delay if first else self.chunk_delay)
+                first = False
+            yield format_sse_event(event)
+
+
+class CassetteReplayer(httpx.AsyncBaseTransport):
+    """
+    httpx transport that answers /v1/messages requests from a cassette.
+
+    No network access or API key is needed. Repeated identical requests walk
+    through their recordings in order (the last one repeats), so recorded
+    429/529 retries replay faithfully. Latency is injected deterministically:
+    either a fixed number of seconds or the recorded latency times a scale,
+    optionally with jitter derived from the request fingerprint.
+    """
+
+    requires_api_key = False
+
+    def __init__(self, path: str, latency: Union[str, float] = "recorded",
+                 latency_scale: float = 1.0, jitter: float = 0.0,
+                 time_to_first_token: float = 0.3):
+        """
+        Initialize the replayer.
+
+        Args:
+            path: Cassette file to replay
+            latency: "recorded" to reuse recorded latencies, or fixed seconds
+            latency_scale: Multiplier applied to recorded latencies
+            jitter: Relative jitter (0.1 = +/-10%) applied deterministically
+            time_to_first_token: Share of the latency spent before the first streamed token
+        """
+        self.entries = Cassette(path).load()
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.jitter = jitter
+        self.time_to_first_token = time_to_first_token
+        self._replay_counts = {}
+        self._lock = threading.Lock()
+
+    def _next_entry(self, key: str, request: Optional[httpx.Request] = None) -> Tuple[Dict[str, Any], int]:
+        """Return the next recording for a fingerprint and how many times it has now been replayed"""
+        recordings = self.entries.get(key)
+        if not recordings:
+            raise CassetteMissError(f"No recorded response for request {key[:12]}", request=request)
+        with self._lock:
+            index = self._replay_counts.get(key, 0)
+            self._replay_counts[key] = index + 1
+        return recordings[min(index, len(recordings) - 1)], index + 1
+
+    def _latency_for(self, key: str, entry: Dict[str, Any], occurrence: int) -> float:
+        """Compute the injected latency for one replayed response (occurrence counts from 1)"""
+        if self.latency == "recorded":
+            latency = entry.get("latency_ms", 0.0) / 1000 * self.latency_scale
+        else:
+            latency = float(self.latency)
+        if self.jitter:
+            digest = hashlib.sha256(f"{key}:{occurrence}".encode("utf-8")).digest()
+            unit = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+            latency *= 1 + self.jitter * (2 * unit - 1)
+        return max(0.0, latency)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request_body = json.loads(request.content)
+        key = request_fingerprint(request_body)
+        # The occurrence is taken under the replay lock, so concurrent identical
+        # requests get distinct, reproducible latencies
+        entry, occurrence = self._next_entry(key, request)
+        latency = self._latency_for(key, entry, occurrence)
+
+        if entry["status"] != 200:
+            await asyncio.sleep(latency)
+            headers = {"content-type": "application/json"}
+            if entry.get("retry_after"):
+                headers["retry-after"] = entry["retry_after"]
+            return httpx.Response(entry["status"], headers=headers,
+                                  content=entry.get("error", "").encode("utf-8"), request=request)
+
+        if request_body.get("stream"):
+            events = message_to_sse_events(entry["message"])
+            chunks = sum(1 for event in events if event["type"] == "content_block_delta")
+            first_delay = latency * self.time_to_first_token
+            chunk_delay = (latency - first_delay) / max(1, chunks - 1)
+            return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                                  stream=_DelayedEventStream(events, first_delay, chunk_delay),
+                                  request=request)
+
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=entry["message"], request=request)
+
+
+def backend_from_env() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Build a cassette backend from environment variables, if requested.
+
+    CLAUDE_CASSETTE names the cassette file and CLAUDE_CASSETTE_MODE selects
+    "record" or "replay" (the default). CLAUDE_REPLAY_LATENCY is "recorded"
+    or a fixed number of seconds.
+
+    Returns:
+        httpx.AsyncBaseTransport: The backend, or None to use the real API directly
+    """
+    path = os.environ.get("CLAUDE_CASSETTE")
+    if not path:
+        return None
+    mode = os.environ.get("CLAUDE_CASSETTE_MODE", "replay")
+    if mode == "record":
+        return CassetteRecorder(path)
+    latency = os.environ.get("CLAUDE_REPLAY_LATENCY", "recorded")
+    if latency != "recorded":
+        latency = float(latency)
+    return CassetteReplayer(path, latency=latency)
+
+
+_shared_backends: Dict[Tuple[str, str, str], httpx.AsyncBaseTransport] = {}
+_shared_backends_lock = threading.Lock()
+
+
+def get_shared_backend() -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Return the process-wide cassette backend requested by the environment.
+
+    Every ClaudeClient must share one backend: a replayer walks repeated requests
+    through their recordings in order across all clients, and a single recorder
+    appends to the cassette file. Backends are cached per mode, path and replay
+    latency, so changing the environment selects (or builds) another one.
+
+    Returns:
+        httpx.AsyncBaseTransport: The shared backend, or None to use the real API directly
+    """
+    path = os.environ.get("CLAUDE_CASSETTE")
+    if not path:
+        return None
+    key = (os.environ.get("CLAUDE_CASSETTE_MODE", "replay"), path,
+           os.environ.get("CLAUDE_REPLAY_LATENCY", "recorded"))
+    with _shared_backends_lock:
+        backend = _shared_backends.get(key)
+        if backend is None:
+            backend = backend_from_env()
+            _shared_backends[key] = backend
+        return backend
@@ -1,9 +1,20 @@
 import os
 import asyncio
+import contextvars
 import json
-import httpx
 import time
-from typing import Dict, Any, List, Optional
+import httpx
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Union
+from .http_pool import SharedHTTPPool, get_shared_pool, get_transport_pool
+from .completion_cache import CompletionCache, make_cache_key
+from .errors import ClaudeAPIError, DeadlineExceededError
+from .retry_policy import RetryPolicy, CircuitBreaker, get_circuit_breaker
+from .rate_limiter import LLMRateLimiter, get_shared_rate_limiter, estimate_tokens
+from .backends import get_shared_backend
+from .usage import record_call
+from .single_flight import SingleFlight, get_shared_single_flight
+from .hedging import HedgePolicy
+from .deadline import Deadline, current_deadline
 
 # Try to import from .env file if available
 try:
@@ -15,48 +26,457 @@ except ImportError:
 # Get API key from environment variable
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
 
+# A system prompt is either plain text or a list of Messages API text blocks
+SystemPrompt = Union[str, List[Dict[str, Any]]]
+
+def cacheable_system_prompt(static_text: str, dynamic_text: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Build system prompt blocks with a prompt-caching breakpoint after the static part
+    
+    The API caches the prompt prefix up to the breakpoint, so requests sharing the
+    static text only pay full input-token latency and cost for it on the first call.
+    Prefixes shorter than the model's minimum cacheable length are simply not cached.
+    
+    Args:
+        static_text: Text that is identical across calls
+        dynamic_text: Optional per-call text appended after the breakpoint
+        
+    Returns:
+        list: System prompt blocks for get_completion / stream_completion
+    """
+    blocks = [{"type": "text", "text": static_text, "cache_control": {"type": "ephemeral"}}]
+    if dynamic_text:
+        blocks.append({"type": "text", "text": dynamic_text})
+    return blocks
+
 class ClaudeClient:
     """
     Helper class to interact with Claude API for the NVIDIA Sales Agent
     """
     
-    def __init__(self, model="claude-3-sonnet-20240229"):
+    def __init__(self, model="claude-3-sonnet-20240229", http_pool: Optional[SharedHTTPPool] = None,
+                 cache: Optional[CompletionCache] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 rate_limiter: Optional[LLMRateLimiter] = None,
+                 backend: Optional[httpx.AsyncBaseTransport] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 hedge_policy: Optional[HedgePolicy] = None):
         """
         Initialize the Claude client
         
         Args:
             model: The Claude model to use
+            http_pool: Optional connection pool (defaults to the process-wide pool)
+            cache: Optional completion cache consulted before calling the API
+            retry_policy: Optional retry policy (defaults to RetryPolicy())
+            circuit_breaker: Optional circuit breaker (defaults to the shared breaker for the endpoint)
+            rate_limiter: Optional rate limiter (defaults to the process-wide limiter)
+            backend: Optional httpx transport standing in for the network, such as a
+                     CassetteRecorder or CassetteReplayer (defaults to the shared CLAUDE_CASSETTE backend, if set)
+            single_flight: Optional request coalescer (defaults to the process-wide one)
+            hedge_policy: Optional policy for hedging slow non-streaming requests (off by default)
         """
         self.api_key = os.environ.get("ANTHROPIC_API_KEY")
         self.model = model
-        self.base_url = "https://api.anthropic.com/v1"
+        self.backend = backend or get_shared_backend()
+        if self.backend is not None:
+            self.http_pool = get_transport_pool(self.backend)
+        else:
+            self.http_pool = http_pool or get_shared_pool()
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        # ANTHROPIC_BASE_URL lets the client target a local stand-in such as mock_server
+        self.base_url = os.environ.get("ANTHROPIC_BASE_URL", "https://api.anthropic.com").rstrip("/") + "/v1"
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(f"{self.base_url}/messages")
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.single_flight = single_flight or get_shared_single_flight()
+        self.hedge_policy = hedge_policy
+        self.call_observers: List[Callable[[Dict[str, Any]], None]] = []
         self.headers = {
-            "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01",
             "content-type": "application/json"
         }
+        if self.api_key:
+            self.headers["x-api-key"] = self.api_key
         
     async def get_completion(self, prompt: str, 
-                            system_prompt: Optional[str] = None,
+                            system_prompt: Optional[SystemPrompt] = None,
                             temperature: float = 0.7,
-                            max_tokens: int = 1000) -> str:
+                            max_tokens: int = 1000,
+                            model: Optional[str] = None) -> str:
         """
         Get a completion from Claude
         
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt, as text or as blocks from cacheable_system_prompt()
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            model: Optional model overriding the client default for this call
+            
+        Returns:
+            str: Claude's completion
+        """
+        model = model or self.model
+        cache_key = make_cache_key(model, system_prompt, prompt, temperature, max_tokens)
+        
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call_info = self._new_call_info(model)
+                call_info["cached"] = True
+                self._report_call(call_info)
+                return cached
+                
+        self._check_api_key()
+        
+        # Identical requests already in flight (from any session on this loop) are joined, not repeated.
+        # The shared request runs outside every caller's context; it reports its call record in the
+        # context of the caller that started it, even if that caller stops waiting.
+        caller = contextvars.copy_context()
+        completion, shared = await self.single_flight.do(
+            f"{self.base_url}|{cache_key}",
+            lambda deadline: self._request_completion(prompt, system_prompt, temperature, max_tokens, model,
+                                                      cache_key, deadline, caller)
+        )
+        
+        if shared:
+            call_info = self._new_call_info(model)
+            call_info["status"] = "success"
+            call_info["coalesced"] = True
+            self._report_call(call_info)
+            
+        return completion
+        
+    async def _request_completion(self, prompt: str, system_prompt: Optional[SystemPrompt],
+                                  temperature: float, max_tokens: int, model: str, cache_key: str,
+                                  deadline: Optional[Deadline], caller: contextvars.Context) -> str:
+        """
+        Call the Messages API for one completion under the rate limiter and retry policy
+        
         Args:
             prompt: The user prompt
             system_prompt: Optional system prompt
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            model: Model to call
+            cache_key: Key under which the completion is cached
+            deadline: Deadline bounding the request and its retries
+            caller: Context the call record is reported in (usage tracker and stage)
             
         Returns:
             str: Claude's completion
         """
-        if not self.api_key:
+        call_info = self._new_call_info(model)
+        request_body = self._build_request_body(prompt, system_prompt, temperature, max_tokens, model)
+        estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt) + max_tokens
+            
+        try:
+            async with self.rate_limiter.acquire(estimated_tokens) as permit:
+                call_info["queue_wait_ms"] = permit.queue_wait * 1000
+                started = time.monotonic()
+                response = await self._send_hedged(request_body, model, call_info, deadline)
+                response_data = response.json()
+                call_info["latency_ms"] = (time.monotonic() - started) * 1000
+                self._record_usage(call_info, response_data.get("usage"))
+                permit.actual_tokens = self._billed_tokens(call_info)
+            
+            completion = response_data["content"][0]["text"]
+            
+            if self.cache is not None:
+                self.cache.set(cache_key, completion)
+                
+            call_info["status"] = "success"
+            return completion
+                
+        except Exception as e:
+            print(f"Error calling Claude API: {e}")
+            raise
+            
+        finally:
+            caller.run(self._report_call, call_info)
+            
+    async def stream_completion(self, prompt: str,
+                                system_prompt: Optional[SystemPrompt] = None,
+                                temperature: float = 0.7,
+                                max_tokens: int = 1000,
+                                model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a completion from Claude as it is generated
+        
+        Consumes the Messages API server-sent event stream and yields each text
+        delta as soon as it arrives. A cache hit is yielded as a single chunk.
+        
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt, as text or as blocks from cacheable_system_prompt()
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            model: Optional model overriding the client default for this call
+            
+        Yields:
+            str: Successive pieces of Claude's completion
+        """
+        model = model or self.model
+        call_info = self._new_call_info(model)
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(model, system_prompt, prompt, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call_info["cached"] = True
+                self._report_call(call_info)
+                yield cached
+                return
+                
+        self._check_api_key()
+            
+        request_body = self._build_request_body(prompt, system_prompt, temperature, max_tokens, model)
+        request_body["stream"] = True
+        estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt) + max_tokens
+        
+        chunks = []
+        try:
+            async with self.rate_limiter.acquire(estimated_tokens) as permit:
+                call_info["queue_wait_ms"] = permit.queue_wait * 1000
+                started = time.monotonic()
+                
+                # Retries only cover opening the stream; once tokens flow a failure is raised
+                response = await self._send_with_retry(request_body, stream=True)
+                try:
+                    async for event in self._iter_sse_events(response):
+                        event_type = event.get("type")
+                        if event_type == "content_block_delta":
+                            delta = event.get("delta", {})
+                            if delta.get("type") == "text_delta":
+                                if not chunks:
+                                    call_info["first_token_ms"] = (time.monotonic() - started) * 1000
+                                chunks.append(delta["text"])
+                                yield delta["text"]
+                        elif event_type == "message_start":
+                            self._record_usage(call_info, event.get("message", {}).get("usage"))
+                        elif event_type == "message_delta":
+                            self._record_usage(call_info, event.get("usage"))
+                        elif event_type == "error":
+                            raise ClaudeAPIError(f"API stream error: {event.get('error')}")
+                finally:
+                    await response.aclose()
+                    
+                call_info["latency_ms"] = (time.monotonic() - started) * 1000
+                permit.actual_tokens = self._billed_tokens(call_info)
+                        
+        except Exception as e:
+            print(f"Error streaming from Claude API: {e}")
+            self._report_call(call_info)
+            raise
+            
+        call_info["status"] = "success"
+        self._report_call(call_info)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(chunks))
+            
+    def _check_api_key(self):
+        """Require an API key unless the backend answers requests without one"""
+        if not self.api_key and getattr(self.backend, "requires_api_key", True):
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
             
+    def add_call_observer(self, observer: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback invoked with the call record of every completion
+        
+        Args:
+            observer: Function receiving the call record dictionary
+        """
+        self.call_observers.append(observer)
+        
+    def _new_call_info(self, model: str) -> Dict[str, Any]:
+        """Create the record describing one completion call to a model"""
+        return {
+            "model": model,
+            "status": "error",
+            "cached": False,
+            "coalesced": False,
+            "hedged": False,
+            "queue_wait_ms": 0.0,
+            "latency_ms": 0.0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0
+        }
+        
+    def _record_usage(self, call_info: Dict[str, Any], usage: Optional[Dict[str, Any]]):
+        """Copy token counts from an API usage block into a call record"""
+        if not usage:
+            return
+        for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            if usage.get(key) is not None:
+                call_info[key] = usage[key]
+                
+    def _billed_tokens(self, call_info: Dict[str, Any]) -> int:
+        """Tokens a call counts against rate limits (cache reads are excluded)"""
+        return call_info["input_tokens"] + call_info["cache_creation_input_tokens"] + call_info["output_tokens"]
+        
+    def _report_call(self, call_info: Dict[str, Any]):
+        """Tag a finished call record for usage accounting and pass it to every registered observer"""
+        record_call(call_info)
+        for observer in self.call_observers:
+            try:
+                observer(call_info)
+            except Exception as e:
+                print(f"Error in call observer: {e}")
+                
+    async def _send_with_retry(self, request_body: Dict[str, Any], stream: bool = False,
+                               deadline: Optional[Deadline] = None) -> httpx.Response:
+        """
+        Send a /v1/messages request under the retry policy and circuit breaker
+        
+        Args:
+            request_body: The JSON request body
+            stream: Return the response unread so the caller can consume the event stream
+            deadline: Deadline bounding the attempts (defaults to the current query's)
+            
+        Returns:
+            httpx.Response: A 200 response (the caller must close it when streaming)
+            
+        Raises:
+            ClaudeAPIError: When the request fails and is not (or no longer) retried
+            DeadlineExceededError: When the deadline runs out
+        """
+        deadline = deadline or current_deadline()
+        attempt = 0
+        while True:
+            # Each attempt may only use the time left before the query's deadline
+            timeout = deadline.timeout(30) if deadline is not None else 30
+            self.circuit_breaker.before_request()
+            outcome_recorded = False
+            try:
+                try:
+                    client = self.http_pool.get_client()
+                    request = client.build_request(
+                        "POST",
+                        f"{self.base_url}/messages",
+                        headers=self.headers,
+                        json=request_body,
+                        timeout=timeout
+                    )
+                    response = await asyncio.wait_for(client.send(request, stream=stream), timeout)
+                except asyncio.TimeoutError:
+                    if deadline is not None and deadline.expired():
+                        raise DeadlineExceededError(f"Deadline of {deadline.budget:.2f}s exceeded")
+                    error = ClaudeAPIError(f"API request timed out after {timeout:.1f}s")
+                except httpx.TransportError as e:
+                    error = ClaudeAPIError(f"API request failed: {e!r}")
+                else:
+                    if response.status_code == 200:
+                        self.circuit_breaker.record_success()
+                        outcome_recorded = True
+                        return response
+                    if stream:
+                        await response.aread()
+                        await response.aclose()
+                    error = ClaudeAPIError.from_response(response)
+                    
+                # Only upstream trouble counts against the breaker, not bad requests
+                if error.status_code is None or error.status_code in self.retry_policy.retry_statuses:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                outcome_recorded = True
+            finally:
+                if not outcome_recorded:
+                    self.circuit_breaker.release_probe()
+                
+            attempt += 1
+            if not self.retry_policy.should_retry(error, attempt):
+                print(error)
+                raise error
+                
+            delay = self.retry_policy.compute_delay(attempt, error.retry_after)
+            if deadline is not None and delay >= deadline.remaining():
+                print(f"{error}; no time left before the deadline to retry")
+                raise error
+            print(f"{error}; retrying in {delay:.2f}s "
+                  f"(attempt {attempt + 1}/{self.retry_policy.max_attempts})")
+            await asyncio.sleep(delay)
+            
+    async def _send_hedged(self, request_body: Dict[str, Any], model: str,
+                           call_info: Dict[str, Any], deadline: Optional[Deadline] = None) -> httpx.Response:
+        """
+        Send a non-streaming request, duplicating it if it runs past the hedge delay
+        
+        The first copy to succeed wins and the other is cancelled. The hedge
+        shares the caller's rate limiter permit; the policy's hedge rate cap
+        bounds the extra load.
+        
+        Args:
+            request_body: The JSON request body
+            model: Model the request is sent to (selects the latency histogram)
+            call_info: Call record, marked as hedged when a duplicate is sent
+            deadline: Deadline bounding both copies (defaults to the current query's)
+            
+        Returns:
+            httpx.Response: The winning 200 response
+        """
+        if self.hedge_policy is None:
+            return await self._send_with_retry(request_body, deadline=deadline)
+            
+        started = time.monotonic()
+        delay = self.hedge_policy.hedge_delay(model)
+        primary = asyncio.ensure_future(self._send_with_retry(request_body, deadline=deadline))
+        tasks = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.hedge_policy.try_acquire_hedge():
+                    call_info["hedged"] = True
+                    tasks.add(asyncio.ensure_future(self._send_with_retry(request_body, deadline=deadline)))
+                    
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both copies finish together
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        self.hedge_policy.record(model, time.monotonic() - started,
+                                                 hedge_won=task is not primary)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+                
+    async def _iter_sse_events(self, response) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse a server-sent event stream into JSON event payloads
+        
+        Args:
+            response: A streaming httpx response
+            
+        Yields:
+            dict: The decoded 'data' payload of each event
+        """
+        data_lines = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+            elif not line and data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data and data != "[DONE]":
+                    yield json.loads(data)
+        if data_lines:
+            yield json.loads("\n".join(data_lines))
+            
+    def _build_request_body(self, prompt: str, system_prompt: Optional[SystemPrompt],
+                            temperature: float, max_tokens: int, model: str) -> Dict[str, Any]:
+        """Build the JSON body for a /v1/messages request"""
         request_body = {
-            "model": self.model,
+            "model": model,
             "messages": [
                 {"role": "user", "content": prompt}
             ],
@@ -67,24 +487,18 @@ class ClaudeClient:
         if system_prompt:
             request_body["system"] = system_prompt
             
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers=self.headers,
-                    json=request_body,
-                    timeout=30
-                )
-                
-                response_data = response.json()
-                
-                if response.status_code != 200:
-                    error_message = f"API request failed with status {response.status_code}: {response.text}"
-                    print(error_message)
-                    raise Exception(error_message)
-                    
-                return response_data["content"][0]["text"]
-                
-        except Exception as e:
-            print(f"Error calling Claude API: {e}")
-            raise 
\ No newline at end of file
+        return request_body
+        
+    async def aclose(self):
+        """
+        Release the pooled connections used by this client on the running event loop.
+        
+        The pool is shared, so other clients on the same loop simply reconnect on their next call.
+        """
+        await self.http_pool.aclose()
+        
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose() 
\ No newline at end of file
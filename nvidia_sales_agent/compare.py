@@ -0,0 +1,294 @@
+import re
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .specs import SpecTable, get_shared_spec_table
+
+# Domains whose products are GPUs with comparable specs
+COMPARABLE_DOMAINS = ("GeForce Gaming GPUs", "RTX Professional GPUs", "NVIDIA Data Center Solutions")
+
+# Product categories a query may name instead of products ("gaming GPUs"); a bare
+# "gaming" or "GeForce" qualifies a product rather than naming the whole line
+_LINEUP = r"\s+(?:gpus?|cards?|graphics cards?|lineup|line-?up|products)\b"
+CATEGORIES = [
+    (re.compile(r"\b(?:gaming|geforce|consumer)" + _LINEUP), "GeForce Gaming GPUs"),
+    (re.compile(r"\b(?:professional|workstation|rtx pro)" + _LINEUP), "RTX Professional GPUs"),
+    (re.compile(r"\b(?:data ?cent(?:er|re)|server)" + _LINEUP), "NVIDIA Data Center Solutions"),
+]
+
+# Metrics derived from the spec columns: (metric, label, pattern matching a question about it)
+METRICS = [
+    ("fp32_tflops", "FP32 TFLOPS (est.)", r"t?flops|compute|fastest|performance"),
+    ("perf_per_watt", "GFLOPS/W", r"perf(?:ormance)? per watt|perf/w|efficien\w*"),
+    ("cores_per_watt", "CUDA cores/W", r"cores per watt|cores/w"),
+    ("memory_per_dollar", "GB per $1k", r"(?:memory|gb|vram) per dollar|per dollar|value|bang for"),
+]
+
+# Footnotes for tables showing estimated or price-based columns
+NOTES = [
+    (("fp32_tflops", "perf_per_watt"), "FP32 throughput is estimated as 2 x CUDA cores x boost clock."),
+    (("launch_price_usd", "memory_per_dollar"), "Prices are US launch MSRPs."),
+]
+
+# Questions the comparison engine answers
+COMPARISON = re.compile(
+    r"\b(?:compare\w*|comparison|versus|vs|differences?|rank\w*|efficien\w*|per watt|per dollar)\b")
+
+# Columns shown when a comparison does not ask for particular specs
+DEFAULT_COLUMNS = ["cuda_cores", "memory_gb", "memory_bandwidth_gbs", "tdp_w", "launch_price_usd",
+                   "perf_per_watt", "cores_per_watt", "memory_per_dollar"]
+
+# Share of the shown columns every compared product needs a value in, or the
+# table says too little to stand in for the agents
+MIN_ROW_COVERAGE = 0.5
+
+# Weights of the normalized columns ranking products when no spec is asked for
+DEFAULT_WEIGHTS = {"cuda_cores": 1.0, "memory_gb": 1.0}
+
+# Columns where less is better; every other column ranks descending
+LOWER_IS_BETTER = frozenset(["tdp_w", "psu_w", "launch_price_usd"])
+
+_METRIC_PATTERNS = [(metric, re.compile(r"\b(?:" + pattern + r")")) for metric, _, pattern in METRICS]
+
+
+def derive_metrics(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Compute the derived metrics from the spec columns, for all products at once.
+
+    FP32 throughput is estimated as two operations per CUDA core per boost
+    clock cycle. A metric is NaN wherever one of its inputs is missing.
+
+    Args:
+        columns: Spec columns of a SpecTable
+
+    Returns:
+        dict: Metric name to float64 array, aligned with the table rows
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fp32_tflops = 2 * columns["cuda_cores"] * columns["boost_clock_ghz"] / 1000
+        return {
+            "fp32_tflops": fp32_tflops,
+            "perf_per_watt": fp32_tflops * 1000 / columns["tdp_w"],
+            "cores_per_watt": columns["cuda_cores"] / columns["tdp_w"],
+            "memory_per_dollar": columns["memory_gb"] * 1000 / columns["launch_price_usd"],
+        }
+
+
+class ComparisonEngine:
+    """
+    Filter, rank and tabulate products over the spec table.
+
+    Every operation works on whole columns: a set of products is an array of
+    row indexes into the table, and filters, sorts and scores are NumPy
+    expressions over the columns at those rows.
+    """
+
+    def __init__(self, table: Optional[SpecTable] = None, domains: Iterable[str] = COMPARABLE_DOMAINS):
+        """
+        Initialize the engine.
+
+        Args:
+            table: Spec table to compare products from (default: the shared one)
+            domains: Domains whose products may be compared
+        """
+        table = table if table is not None else get_shared_spec_table()
+        self.table = table
+        self.domains = [domain for domain in domains if domain in table.domains]
+        self.eligible = np.flatnonzero(np.isin(np.array(table.domains, dtype=object), self.domains))
+        self.values: Dict[str, np.ndarray] = dict(table.columns)
+        self.values.update(derive_metrics(table.columns))
+        self.labels = {column: self._label(column) for column in table.columns}
+        self.labels.update({metric: label for metric, label, _ in METRICS})
+
+    def _label(self, column: str) -> str:
+        """Column header with its unit"""
+        unit = self.table.units[column]
+        label = self.table.labels[column]
+        if unit is None:
+            return label
+        return f"{label} ($)" if unit == "USD" else f"{label} ({unit})"
+
+    def products(self, query: str) -> np.ndarray:
+        """
+        Rows of the products a query is about.
+
+        Args:
+            query: The user query
+
+        Returns:
+            np.ndarray: Row indexes of the named products, then of every product in
+                        the named categories ("gaming GPUs", "data center")
+        """
+        named = [row for row in self.table.rows_for(query, first_per_mention=True) if row in self.eligible]
+        text = query.lower()
+        domains = [domain for pattern, domain in CATEGORIES if domain in self.domains and pattern.search(text)]
+        in_category = self.eligible[np.isin(np.array(self.table.domains, dtype=object)[self.eligible], domains)]
+        return np.array(list(dict.fromkeys(named + in_category.tolist())), dtype=np.intp)
+
+    def filter(self, rows: np.ndarray, bounds: Dict[str, Tuple[Optional[float], Optional[float]]]) -> np.ndarray:
+        """
+        Keep the products within bounds on any number of columns.
+
+        Args:
+            rows: Row indexes
+            bounds: Column or metric to (minimum, maximum), either None for no bound
+
+        Returns:
+            np.ndarray: The rows meeting every bound; a missing value fails its bound
+        """
+        keep = np.ones(len(rows), dtype=bool)
+        for column, (low, high) in bounds.items():
+            values = self.values[column][rows]
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+        return rows[keep]
+
+    def rank(self, rows: np.ndarray, by: str) -> np.ndarray:
+        """
+        Sort products best first by a column, missing values last.
+
+        Args:
+            rows: Row indexes
+            by: Column or metric; LOWER_IS_BETTER columns sort ascending
+
+        Returns:
+            np.ndarray: The rows in rank order (stable for ties)
+        """
+        values = self.values[by][rows]
+        keys = values if by in LOWER_IS_BETTER else -values
+        return rows[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")]
+
+    def normalize(self, rows: np.ndarray, columns: List[str]) -> np.ndarray:
+        """
+        Scale columns to [0, 1] across the given products, 1 being best.
+
+        Args:
+            rows: Row indexes
+            columns: Columns or metrics
+
+        Returns:
+            np.ndarray: Matrix of shape (len(rows), len(columns)); NaN where a value is
+                        missing, 1 where all products have the same value
+        """
+        matrix = np.array([self.values[column][rows] for column in columns], dtype=np.float64).reshape(
+            len(columns), len(rows)).T
+        missing = np.isnan(matrix)
+        with np.errstate(invalid="ignore"):
+            # Missing values are left out of each column's range
+            low = np.where(missing, np.inf, matrix).min(axis=0, initial=np.inf)
+            high = np.where(missing, -np.inf, matrix).max(axis=0, initial=-np.inf)
+            span = high - low
+            scaled = np.where(span > 0, (matrix - low) / np.where(span > 0, span, 1), 1.0)
+        lower_better = np.array([column in LOWER_IS_BETTER for column in columns], dtype=bool)
+        return np.where(missing, np.nan, np.where(lower_better, 1 - scaled, scaled))
+
+    def score(self, rows: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Weighted sum of normalized columns; missing values count as 0.
+
+        Args:
+            rows: Row indexes
+            weights: Column or metric to weight
+
+        Returns:
+            np.ndarray: One score per row
+        """
+        columns = list(weights)
+        normalized = np.nan_to_num(self.normalize(rows, columns), nan=0.0)
+        return normalized @ np.array([weights[column] for column in columns], dtype=np.float64)
+
+    def format_table(self, rows: np.ndarray, columns: List[str]) -> str:
+        """
+        Render products as a markdown table, leaving out columns no product has.
+
+        Args:
+            rows: Row indexes, in display order
+            columns: Columns or metrics
+
+        Returns:
+            str: The table
+        """
+        columns = self._shown(rows, columns)
+        lines = ["| Product | " + " | ".join(self.labels[column] for column in columns) + " |",
+                 "|---" * (len(columns) + 1) + "|"]
+        for row in rows:
+            cells = [self._format_value(self.values[column][row]) for column in columns]
+            lines.append(f"| {self.table.names[row]} | " + " | ".join(cells) + " |")
+        return "\n".join(lines)
+
+    def _shown(self, rows: np.ndarray, columns: List[str]) -> List[str]:
+        """The columns some of the products have a value in"""
+        return [column for column in columns if not np.isnan(self.values[column][rows]).all()]
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """A table cell: whole numbers with separators, others to two significant decimals"""
+        if np.isnan(value):
+            return "-"
+        if value == int(value) or value >= 100:
+            return f"{value:,.0f}"
+        return f"{value:.2f}" if value < 10 else f"{value:.1f}"
+
+    def requested(self, query: str) -> List[str]:
+        """
+        Columns and metrics a query asks about, metrics first.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Numeric columns and metrics in the order they should be shown
+        """
+        text = query.lower()
+        metrics = [metric for metric, pattern in _METRIC_PATTERNS if pattern.search(text)]
+        columns = [column for column in self.table.columns_for(query) if column in self.table.columns]
+        return list(dict.fromkeys(metrics + columns))
+
+    def compare(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Build the comparison table for a comparison question.
+
+        Args:
+            query: The user query
+
+        Returns:
+            dict: 'table' (markdown), 'rows', 'columns', 'domains' of the compared products
+                  and 'direct' (True when the query asks for specific specs or metrics and
+                  the table has all of them, so it answers the query as is), or None if
+                  the query does not compare at least two products the table describes
+                  well (see MIN_ROW_COVERAGE)
+        """
+        if not COMPARISON.search(query.lower()):
+            return None
+        rows = self.products(query)
+        if len(rows) < 2:
+            return None
+
+        requested = self.requested(query)
+        direct = bool(requested) and not np.isnan(
+            np.array([self.values[column][rows] for column in requested])).any()
+        # Without every requested value, synthesis gets the overview columns as well
+        columns = requested if direct else list(dict.fromkeys(requested + DEFAULT_COLUMNS))
+        shown = self._shown(rows, columns)
+        coverage = (~np.isnan(np.array([self.values[column][rows] for column in shown]))).mean(axis=0)
+        if (coverage < MIN_ROW_COVERAGE).any():
+            return None
+
+        if requested:
+            rows = self.rank(rows, requested[0])
+        else:
+            rows = rows[np.argsort(-self.score(rows, DEFAULT_WEIGHTS), kind="stable")]
+        table = self.format_table(rows, columns)
+        notes = [note for note_columns, note in NOTES if set(note_columns) & set(shown)]
+        if notes:
+            table += "\n\n" + " ".join(notes)
+        return {
+            "table": table,
+            "rows": rows.tolist(),
+            "columns": columns,
+            "domains": sorted({self.table.domains[row] for row in rows}),
+            "direct": direct,
+        }
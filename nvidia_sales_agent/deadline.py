@@ -0,0 +1,87 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional, Union
+
+from .errors import DeadlineExceededError
+
+# Deadline of the query whose code is currently running. asyncio tasks copy
+# the context when created, so agent tasks in a fan-out inherit it.
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """
+    Point in time by which a query must be answered.
+    """
+
+    def __init__(self, budget: float):
+        """
+        Start the clock on a latency budget.
+
+        Args:
+            budget: Seconds the query may take from now
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (negative once it has passed)"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed"""
+        return self.remaining() <= 0
+
+    def timeout(self, default: float) -> float:
+        """
+        Return the timeout for one operation: the default, capped by the time left.
+
+        Args:
+            default: Timeout used when the deadline is further away
+
+        Returns:
+            float: Seconds the operation may take
+
+        Raises:
+            DeadlineExceededError: If the deadline has already passed
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline of {self.budget:.2f}s exceeded")
+        return min(default, remaining)
+
+
+def as_deadline(deadline: Union[Deadline, float, None]) -> Optional[Deadline]:
+    """
+    Accept a Deadline or a budget in seconds.
+
+    Args:
+        deadline: Deadline, budget in seconds, or None
+
+    Returns:
+        Deadline: The deadline, or None if there is none
+    """
+    if deadline is None or isinstance(deadline, Deadline):
+        return deadline
+    return Deadline(float(deadline))
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the running query, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """
+    Make a deadline apply to every Claude call made inside the block.
+
+    Args:
+        deadline: Deadline for the block, or None to leave calls unbounded
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,344 @@
+import re
+import threading
+from collections import deque
+from typing import Dict, Any, List
+
+import numpy as np
+
+from .knowledge import DOMAIN_KNOWLEDGE
+from .knowledge_index import get_knowledge_index
+
+# List blocks under these labels describe attributes or prose, not named products
+NON_ENTITY_BLOCKS = frozenset(["Specifications", "Key Features", "Features", "Applications"])
+
+# Trailing words dropped to form shorter aliases ("BlueField-3 DPU" -> "BlueField-3")
+GENERIC_SUFFIXES = frozenset([
+    "ada", "dpu", "dpus", "framework", "generation", "membership", "platform",
+    "series", "smartnics", "software", "switch", "systems", "toolkit", "tools",
+])
+
+# Aliases that are also everyday words and would match unrelated queries
+GENERIC_ALIASES = frozenset(["ai", "air", "dent", "drive", "now", "nvidia", "rtx"])
+
+# Characters of normalized text, the input symbols of the automaton
+ALPHABET = " 0123456789abcdefghijklmnopqrstuvwxyz"
+_SYMBOLS = {char: symbol for symbol, char in enumerate(ALPHABET)}
+
+_LIST_ITEM = re.compile(r"^\s*-\s+([^:]{2,40}):")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_LETTER_DIGIT_SPACE = re.compile(r"(?<=[a-z]) (?=[0-9])")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase text and collapse punctuation and whitespace to single spaces.
+
+    "BlueField-3", "bluefield 3" and "BLUEFIELD_3" all normalize to "bluefield 3".
+
+    Args:
+        text: Entity name or query
+
+    Returns:
+        str: Normalized text padded with one space on each side
+    """
+    return " " + _NON_ALNUM.sub(" ", text.lower()).strip() + " "
+
+
+def _is_distinctive(alias: str) -> bool:
+    """Whether a shortened alias is specific enough to stand alone"""
+    words = alias.split()
+    if not words or alias.lower() in GENERIC_ALIASES or len(alias) < 3:
+        return False
+    if len(words) > 1:
+        return True
+    # Single words must look like product names: digits, hyphens, inner or all capitals
+    word = words[0]
+    return any(c.isdigit() for c in word) or "-" in word or any(c.isupper() for c in word[1:])
+
+
+def _aliases(name: str) -> List[str]:
+    """Derive the aliases an entity may be mentioned by"""
+    candidates = []
+    for part in name.split("/"):
+        part = part.strip()
+        candidates.append(part)
+        words = part.split()
+        for prefix in ("NVIDIA", "GeForce"):
+            if words and words[0] == prefix and len(words) > 1:
+                words = words[1:]
+                candidates.append(" ".join(words))
+        # A bare model number is a name on its own ("RTX 4070 Ti" -> "4070 Ti")
+        for i, word in enumerate(words[1:], 1):
+            if word.isdigit() and len(word) >= 4:
+                candidates.append(" ".join(words[i:]))
+                break
+        # So is a leading model token ("H100 NVL" -> "H100")
+        if len(words) > 1 and any(c.isdigit() for c in words[0]) and any(c.isalpha() for c in words[0]):
+            candidates.append(words[0])
+        while len(words) > 1 and words[-1].lower() in GENERIC_SUFFIXES:
+            words = words[:-1]
+            candidates.append(" ".join(words))
+
+    aliases = []
+    for i, alias in enumerate(candidates):
+        # The full name always counts; shortened forms only if distinctive
+        if (i == 0 or _is_distinctive(alias)) and alias.lower() not in GENERIC_ALIASES:
+            if alias not in aliases:
+                aliases.append(alias)
+    return aliases
+
+
+def extract_entities(domain: str, knowledge: str) -> List[Dict[str, Any]]:
+    """
+    Find the named products in a knowledge base.
+
+    Every '## ' heading is an entity, and so is every item of a named list
+    ("Product Line:", "Components:", ...) below it; both belong to the
+    section of the enclosing heading.
+
+    Args:
+        domain: Agent id owning the knowledge base
+        knowledge: Knowledge base text
+
+    Returns:
+        list: Entities as dicts with 'name', 'aliases', 'domain' and 'section'
+    """
+    entities = []
+    section = None
+    block = None
+    for line in knowledge.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("## "):
+            section = stripped[3:].strip()
+            block = None
+            entities.append({"name": section, "aliases": _aliases(section),
+                             "domain": domain, "section": section})
+        elif stripped.startswith("#"):
+            section = None
+            block = None
+        elif stripped.endswith(":") and not stripped.startswith("-"):
+            block = stripped[:-1]
+        elif section and block is not None and block not in NON_ENTITY_BLOCKS:
+            match = _LIST_ITEM.match(line)
+            if match:
+                name = match.group(1).strip()
+                entities.append({"name": name, "aliases": _aliases(name),
+                                 "domain": domain, "section": section})
+    return entities
+
+
+class ProductEntityRecognizer:
+    """
+    Aho-Corasick automaton over every product name and alias in the knowledge bases.
+
+    Matching is one pass over the normalized query, independent of the number
+    of entities, and returns which domains and sections the query names. The
+    automaton is compiled to a DFA held in flat int32 arrays (transitions and
+    outputs), so it can be stored in and matched straight from the knowledge index.
+    """
+
+    def __init__(self, knowledge: Dict[str, str]):
+        """
+        Extract the entities and compile the automaton.
+
+        Args:
+            knowledge: Domain (agent id) to knowledge base text
+        """
+        self.entities: List[Dict[str, Any]] = []
+        for domain, text in knowledge.items():
+            self.entities.extend(extract_entities(domain, text))
+
+        # Normalized pattern -> indexes of the entities it names
+        patterns: Dict[str, List[int]] = {}
+        for index, entity in enumerate(self.entities):
+            for alias in entity["aliases"]:
+                key = normalize(alias).strip()
+                # "rtx 4090" is also written "rtx4090"
+                for variant in {key, _LETTER_DIGIT_SPACE.sub("", key)}:
+                    owners = patterns.setdefault(variant, [])
+                    if index not in owners:
+                        owners.append(index)
+        self.patterns = patterns
+        self._keys = list(patterns)
+        self._build(patterns)
+
+    def _build(self, patterns: Dict[str, List[int]]):
+        """Compile the patterns into the transition and output tables"""
+        symbol_of = _SYMBOLS
+        goto: List[Dict[int, int]] = [{}]
+        own: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                next_node = goto[node].get(symbol_of[char])
+                if next_node is None:
+                    next_node = len(goto)
+                    goto[node][symbol_of[char]] = next_node
+                    goto.append({})
+                    own.append([])
+                node = next_node
+            own[node].append(pattern_id)
+
+        # Breadth first, so a node's failure target (always shallower) is complete
+        # before the node copies its transitions and outputs
+        rows: List[List[int]] = [[0] * len(ALPHABET) for _ in goto]
+        fail = [0] * len(goto)
+        outputs: List[List[int]] = [[] for _ in goto]
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            row = rows[node]
+            if node:
+                row[:] = rows[fail[node]]
+                outputs[node] = own[node] + outputs[fail[node]]
+            for symbol, child in goto[node].items():
+                fail[child] = rows[fail[node]][symbol] if node else 0
+                row[symbol] = child
+                queue.append(child)
+
+        self.transitions = np.array(rows, dtype=np.int32).reshape(-1)
+        self.output_offsets = np.cumsum([0] + [len(ids) for ids in outputs], dtype=np.int32)
+        self.outputs = np.array([i for ids in outputs for i in ids], dtype=np.int32)
+
+    def to_index(self, writer, name: str):
+        """
+        Store the recognizer in a knowledge index.
+
+        Args:
+            writer: knowledge_index.IndexWriter
+            name: Prefix of the stored entries
+        """
+        writer.add_json(name, {"entities": self.entities, "patterns": list(self.patterns.items())})
+        writer.add_array(f"{name}.transitions", self.transitions)
+        writer.add_array(f"{name}.output_offsets", self.output_offsets)
+        writer.add_array(f"{name}.outputs", self.outputs)
+
+    @classmethod
+    def from_index(cls, index, name: str) -> "ProductEntityRecognizer":
+        """
+        Load a recognizer from a knowledge index, matching on the mapped arrays.
+
+        Args:
+            index: knowledge_index.KnowledgeIndex
+            name: Prefix the recognizer was stored under
+
+        Returns:
+            ProductEntityRecognizer: The recognizer
+        """
+        recognizer = cls.__new__(cls)
+        document = index.document(name)
+        recognizer.entities = document["entities"]
+        recognizer.patterns = dict(document["patterns"])
+        recognizer._keys = list(recognizer.patterns)
+        recognizer.transitions = index.array(f"{name}.transitions")
+        recognizer.output_offsets = index.array(f"{name}.output_offsets")
+        recognizer.outputs = index.array(f"{name}.outputs")
+        return recognizer
+
+    def match(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Find the product mentions in a query.
+
+        Overlapping mentions resolve to the longest one ("RTX 4070 Ti" rather
+        than "RTX 4070"), and a mention must start and end on word boundaries.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Mentions in query order, as dicts with 'alias', 'start', 'end'
+                  (offsets in the normalized query) and 'entities' (matching entity dicts)
+        """
+        text = normalize(query)
+        # Memoryviews index to plain ints much faster than NumPy arrays
+        transitions = memoryview(self.transitions)
+        offsets = memoryview(self.output_offsets)
+        outputs = memoryview(self.outputs)
+        keys = self._keys
+        width = len(ALPHABET)
+        found = []
+        node = 0
+        for position, char in enumerate(text):
+            node = transitions[node * width + _SYMBOLS[char]]
+            k = offsets[node]
+            end = offsets[node + 1]
+            while k < end:
+                pattern = keys[outputs[k]]
+                k += 1
+                start = position - len(pattern) + 1
+                if text[start - 1] == " " and text[position + 1] == " ":
+                    found.append((start, position + 1, pattern))
+
+        mentions = []
+        last_end = -1
+        for start, end, pattern in sorted(found, key=lambda item: (item[0], -(item[1] - item[0]))):
+            if start < last_end:
+                continue
+            last_end = end
+            mentions.append({
+                "alias": pattern,
+                "start": start,
+                "end": end,
+                "entities": [self.entities[i] for i in self.patterns[pattern]],
+            })
+        return mentions
+
+    def domains(self, query: str) -> List[str]:
+        """
+        Domains owning the products a query names, in order of first mention.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Agent ids (empty if no product is named)
+        """
+        domains = []
+        for mention in self.match(query):
+            for entity in mention["entities"]:
+                if entity["domain"] not in domains:
+                    domains.append(entity["domain"])
+        return domains
+
+    def sections(self, query: str) -> Dict[str, List[str]]:
+        """
+        Knowledge base sections describing the products a query names.
+
+        Args:
+            query: The user query
+
+        Returns:
+            dict: Agent id to section headings, in order of first mention
+        """
+        sections: Dict[str, List[str]] = {}
+        for mention in self.match(query):
+            for entity in mention["entities"]:
+                domain_sections = sections.setdefault(entity["domain"], [])
+                if entity["section"] not in domain_sections:
+                    domain_sections.append(entity["section"])
+        return sections
+
+
+_shared_recognizer = None
+_shared_recognizer_lock = threading.Lock()
+
+
+def get_shared_entity_recognizer() -> ProductEntityRecognizer:
+    """
+    Return the process-wide recognizer over DOMAIN_KNOWLEDGE, creating it on first use.
+
+    It is loaded from the knowledge index when there is an up-to-date one and
+    compiled from the knowledge bases otherwise.
+
+    Returns:
+        ProductEntityRecognizer: The shared recognizer
+    """
+    global _shared_recognizer
+    with _shared_recognizer_lock:
+        if _shared_recognizer is None:
+            index = get_knowledge_index()
+            if index is not None:
+                _shared_recognizer = ProductEntityRecognizer.from_index(index, "entities")
+            else:
+                _shared_recognizer = ProductEntityRecognizer(DOMAIN_KNOWLEDGE)
+        return _shared_recognizer
@@ -0,0 +1,75 @@
+import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class ClaudeAPIError(Exception):
+    """
+    Raised when a request to the Claude Messages API fails.
+
+    Subclasses Exception so existing broad handlers in the orchestrator and
+    agents keep falling back exactly as before.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None):
+        """
+        Initialize the error.
+
+        Args:
+            message: Human readable description
+            status_code: HTTP status code, or None for transport failures
+            retry_after: Seconds the server asked us to wait, if given
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, response) -> "ClaudeAPIError":
+        """
+        Build an error from a non-200 httpx response.
+
+        Args:
+            response: The httpx response (body already read)
+
+        Returns:
+            ClaudeAPIError: The error describing the response
+        """
+        message = f"API request failed with status {response.status_code}: {response.text}"
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        return cls(message, status_code=response.status_code, retry_after=retry_after)
+
+
+class CircuitOpenError(ClaudeAPIError):
+    """Raised without calling the API while the endpoint's circuit breaker is open"""
+
+
+class DeadlineExceededError(ClaudeAPIError):
+    """Raised instead of calling (or retrying) the API once the query's deadline has passed"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a retry-after header given either as seconds or as an HTTP date.
+
+    Args:
+        value: The raw header value
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (when - now).total_seconds())
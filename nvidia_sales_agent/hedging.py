@@ -0,0 +1,156 @@
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class LatencyHistogram:
+    """
+    Rolling window of recent request latencies with percentile lookup.
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the histogram.
+
+        Args:
+            window: Number of most recent samples kept
+        """
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        """
+        Add one latency sample.
+
+        Args:
+            latency: Observed latency in seconds
+        """
+        with self._lock:
+            self.samples.append(latency)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Return the nearest-rank percentile of the window.
+
+        Args:
+            fraction: Percentile as a fraction (0.95 for p95)
+
+        Returns:
+            float: Latency in seconds, or None without samples
+        """
+        with self._lock:
+            values = sorted(self.samples)
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+        return values[index]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class HedgePolicy:
+    """
+    Decides when a slow request gets a duplicate ("hedge") sent alongside it.
+
+    A request that has not finished after the configured percentile of recent
+    latencies for its model is hedged, and whichever copy finishes first wins.
+    Hedges are capped at max_hedge_rate of all requests so that a general
+    slowdown cannot double the load on the API.
+    """
+
+    def __init__(self, percentile: float = 0.95, max_hedge_rate: float = 0.05,
+                 min_samples: int = 20, min_delay: float = 0.05, window: int = 200):
+        """
+        Initialize the policy.
+
+        Args:
+            percentile: Latency percentile after which a request is hedged
+            max_hedge_rate: Maximum fraction of requests that may be hedged
+            min_samples: Samples a model needs before its requests are hedged
+            min_delay: Lower bound on the hedge delay in seconds
+            window: Samples kept per model histogram
+        """
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def histogram(self, model: str) -> LatencyHistogram:
+        """Return the latency histogram for a model, creating it if needed"""
+        with self._lock:
+            histogram = self.histograms.get(model)
+            if histogram is None:
+                histogram = self.histograms[model] = LatencyHistogram(self.window)
+            return histogram
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """
+        Count a new request and return how long to wait before hedging it.
+
+        Args:
+            model: Model the request is sent to
+
+        Returns:
+            float: Delay in seconds, or None if the model has too few samples to hedge
+        """
+        with self._lock:
+            self.requests += 1
+        histogram = self.histogram(model)
+        if len(histogram) < self.min_samples:
+            return None
+        return max(self.min_delay, histogram.percentile(self.percentile))
+
+    def try_acquire_hedge(self) -> bool:
+        """
+        Reserve a hedge if the hedge rate budget allows one.
+
+        Returns:
+            bool: True if the caller may send the duplicate request
+        """
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_rate * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def record(self, model: str, latency: float, hedge_won: bool = False):
+        """
+        Record the latency the caller observed for a finished request.
+
+        Args:
+            model: Model the request was sent to
+            latency: Seconds from the first send to the winning response
+            hedge_won: Whether the duplicate finished first
+        """
+        self.histogram(model).record(latency)
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hedging counters and the current hedge delay per model.
+
+        Returns:
+            dict: Request, hedge and win counts, hedge rate and per-model thresholds
+        """
+        with self._lock:
+            stats = {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            }
+            histograms = dict(self.histograms)
+        stats["thresholds"] = {
+            model: histogram.percentile(self.percentile) if len(histogram) >= self.min_samples else None
+            for model, histogram in histograms.items()
+        }
+        return stats
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional
+
+import httpx
+
+# HTTP/2 support in httpx requires the optional 'h2' package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+DEFAULT_POOL_CONFIG = {
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+    "connect_timeout": 10.0,
+    "http2": True,
+}
+
+
+class SharedHTTPPool:
+    """
+    Long-lived connection pool shared by every ClaudeClient in the process.
+
+    httpx.AsyncClient connections are bound to the event loop that opened them,
+    so the pool keeps one client per running loop. Code that runs on a single
+    loop (the CLI scripts, the web UI worker loop) therefore reuses the same
+    keep-alive / HTTP/2 connections for every call.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            config: Optional overrides for DEFAULT_POOL_CONFIG
+            transport: Optional custom transport (e.g. a cassette backend) used instead of the network
+        """
+        self.config = dict(DEFAULT_POOL_CONFIG)
+        if config:
+            self.config.update(config)
+        self.transport = transport
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def http2(self) -> bool:
+        """Whether HTTP/2 is requested and the h2 package is installed"""
+        return bool(self.config["http2"]) and HTTP2_AVAILABLE
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled client for the running event loop, creating it if needed.
+
+        Returns:
+            httpx.AsyncClient: The shared client for this loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._create_client()
+                self._clients[loop] = client
+            return client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build a new AsyncClient from the pool configuration"""
+        limits = httpx.Limits(
+            max_connections=self.config["max_connections"],
+            max_keepalive_connections=self.config["max_keepalive_connections"],
+            keepalive_expiry=self.config["keepalive_expiry"]
+        )
+        # Per-request timeouts are passed on each call; this is only the default
+        timeout = httpx.Timeout(30.0, connect=self.config["connect_timeout"])
+        if self.transport is not None:
+            return httpx.AsyncClient(transport=self.transport, timeout=timeout)
+        return httpx.AsyncClient(http2=self.http2, limits=limits, timeout=timeout)
+
+    async def aclose(self):
+        """
+        Close the client owned by the running event loop.
+
+        A later get_client() call on the same loop transparently opens a new one.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool() -> SharedHTTPPool:
+    """
+    Return the process-wide HTTP pool, creating it with default limits if needed.
+
+    Returns:
+        SharedHTTPPool: The shared pool
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = SharedHTTPPool()
+        return _shared_pool
+
+
+_transport_pools = weakref.WeakKeyDictionary()
+
+
+def get_transport_pool(transport: httpx.AsyncBaseTransport) -> SharedHTTPPool:
+    """
+    Return the process-wide pool over a custom transport, creating it if needed.
+
+    Clients sharing a transport (such as the cassette backend) thereby share
+    its pooled AsyncClient as well.
+
+    Args:
+        transport: The transport, e.g. from backends.get_shared_backend()
+
+    Returns:
+        SharedHTTPPool: The pool using that transport
+    """
+    with _shared_pool_lock:
+        pool = _transport_pools.get(transport)
+        if pool is None:
+            pool = SharedHTTPPool(transport=transport)
+            _transport_pools[transport] = pool
+        return pool
+
+
+def configure_shared_pool(**config) -> SharedHTTPPool:
+    """
+    Replace the process-wide pool with one using the given limits.
+
+    Call this once at startup, before any ClaudeClient is created.
+
+    Args:
+        **config: Keys from DEFAULT_POOL_CONFIG to override
+
+    Returns:
+        SharedHTTPPool: The new shared pool
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        _shared_pool = SharedHTTPPool(config)
+        return _shared_pool
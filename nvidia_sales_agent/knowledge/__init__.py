@@ -1,3 +1,24 @@
 """
 Knowledge base files for different NVIDIA product domains
-""" 
\ No newline at end of file
+"""
+
+from .geforce import GEFORCE_KNOWLEDGE
+from .rtx_professional import RTX_PROFESSIONAL_KNOWLEDGE
+from .datacenter import DATACENTER_KNOWLEDGE
+from .cuda import CUDA_KNOWLEDGE
+from .ai_platforms import AI_KNOWLEDGE
+from .networking import NETWORKING_KNOWLEDGE
+from .automotive import AUTOMOTIVE_KNOWLEDGE
+from .cloud_gaming import CLOUD_GAMING_KNOWLEDGE
+
+# Knowledge base of each product domain, keyed by the agent id used throughout the app
+DOMAIN_KNOWLEDGE = {
+    "GeForce Gaming GPUs": GEFORCE_KNOWLEDGE,
+    "RTX Professional GPUs": RTX_PROFESSIONAL_KNOWLEDGE,
+    "NVIDIA Data Center Solutions": DATACENTER_KNOWLEDGE,
+    "CUDA & Developer Tools": CUDA_KNOWLEDGE,
+    "AI & Deep Learning Platforms": AI_KNOWLEDGE,
+    "Networking & DPUs": NETWORKING_KNOWLEDGE,
+    "Automotive & Self-Driving Tech": AUTOMOTIVE_KNOWLEDGE,
+    "Cloud Gaming Services": CLOUD_GAMING_KNOWLEDGE,
+}
@@ -18,6 +18,7 @@ Specifications:
 - Memory Interface: 384-bit
 - TDP: 450W
 - Recommended PSU: 850W
+- Launch Price: $1,599
 
 ## GeForce RTX 4080
 
@@ -30,6 +31,7 @@ Specifications:
 - Memory Interface: 256-bit
 - TDP: 320W
 - Recommended PSU: 750W
+- Launch Price: $1,199
 
 ## GeForce RTX 4070 Ti
 
@@ -42,6 +44,7 @@ Specifications:
 - Memory Interface: 192-bit
 - TDP: 285W
 - Recommended PSU: 700W
+- Launch Price: $799
 
 ## GeForce RTX 4070
 
@@ -54,6 +57,7 @@ Specifications:
 - Memory Interface: 192-bit
 - TDP: 200W
 - Recommended PSU: 650W
+- Launch Price: $599
 
 ## GeForce RTX 4060 Ti
 
@@ -66,6 +70,7 @@ Specifications:
 - Memory Interface: 128-bit
 - TDP: 160W
 - Recommended PSU: 550W
+- Launch Price: $399 (8GB) or $499 (16GB)
 
 ## GeForce RTX 4060
 
@@ -78,6 +83,7 @@ Specifications:
 - Memory Interface: 128-bit
 - TDP: 115W
 - Recommended PSU: 550W
+- Launch Price: $299
 
 # Key Gaming GPU Technologies
 
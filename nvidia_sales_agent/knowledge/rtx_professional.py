@@ -20,6 +20,7 @@ Specifications:
 - Power: 300W
 - Form Factor: Full-height, full-length, dual slot
 - Display Connectors: 4x DisplayPort 1.4
+- Launch Price: $6,800
 
 ## RTX 5000 Ada Generation
 
@@ -34,6 +35,7 @@ Specifications:
 - Power: 230W
 - Form Factor: Full-height, full-length, dual slot
 - Display Connectors: 4x DisplayPort 1.4
+- Launch Price: $4,000
 
 ## RTX 4000 Ada Generation
 
@@ -48,6 +50,7 @@ Specifications:
 - Power: 140W
 - Form Factor: Full-height, full-length, single slot
 - Display Connectors: 4x DisplayPort 1.4
+- Launch Price: $1,250
 
 ## RTX 4500 Ada Generation
 
@@ -62,6 +65,7 @@ Specifications:
 - Power: 170W
 - Form Factor: Full-height, full-length, dual slot
 - Display Connectors: 4x DisplayPort 1.4
+- Launch Price: $2,250
 
 ## L40/L40S
 
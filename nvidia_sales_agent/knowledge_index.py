@@ -0,0 +1,278 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from .knowledge import DOMAIN_KNOWLEDGE
+
+# Bump whenever the file layout or anything stored in it (tokenizer, BM25 weights,
+# automaton, spec parsing) changes, so older index files are ignored
+INDEX_VERSION = 2
+INDEX_MAGIC = b"NVSAKIDX"
+INDEX_FILENAME = "knowledge.idx"
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), INDEX_FILENAME)
+
+# Magic, format version and length of the JSON table of contents that follows
+_HEADER = struct.Struct("<8sII")
+# Arrays start on cache-line boundaries so they can be used in place
+_ALIGNMENT = 64
+
+
+def knowledge_fingerprint(knowledge: Dict[str, str]) -> str:
+    """
+    Hash the knowledge bases an index is built from, domain order included.
+
+    Args:
+        knowledge: Domain (agent id) to knowledge base text
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(json.dumps(list(knowledge.items())).encode("utf-8")).hexdigest()
+
+
+def is_bundled(knowledge: Dict[str, str]) -> bool:
+    """Whether knowledge is exactly DOMAIN_KNOWLEDGE, in the same order"""
+    return list(knowledge.items()) == list(DOMAIN_KNOWLEDGE.items())
+
+
+class IndexWriter:
+    """
+    Collects named arrays and JSON documents and writes them as one index file.
+
+    Layout: header, JSON table of contents (fingerprint and the offset, dtype and
+    shape of every array, offset and length of every JSON document), then the
+    payloads, arrays aligned to _ALIGNMENT bytes.
+    """
+
+    def __init__(self):
+        """Start an empty index"""
+        self._payloads = []
+        self._arrays: Dict[str, Dict[str, Any]] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+
+    def add_array(self, name: str, array: np.ndarray):
+        """Add a NumPy array, stored little-endian and C-contiguous"""
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        self._arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        self._payloads.append((self._arrays[name], array.tobytes()))
+
+    def add_json(self, name: str, document: Any):
+        """Add a JSON-serializable document"""
+        self._documents[name] = {}
+        self._payloads.append((self._documents[name], json.dumps(document).encode("utf-8")))
+
+    def write(self, path: str, fingerprint: str):
+        """
+        Write the index, replacing any existing file atomically.
+
+        Args:
+            path: Output file
+            fingerprint: knowledge_fingerprint of the indexed knowledge bases
+        """
+        # Offsets depend on the size of the table of contents that lists them, so
+        # lay out the payloads after a table of contents padded to a fixed size
+        contents = {"fingerprint": fingerprint, "arrays": self._arrays, "documents": self._documents}
+        for entry, _ in self._payloads:
+            entry["offset"] = 0
+            entry["length"] = 0
+        reserved = len(json.dumps(contents)) + 32 * len(self._payloads) + 256
+        offset = _HEADER.size + reserved
+        for entry, payload in self._payloads:
+            offset += -offset % _ALIGNMENT
+            entry["offset"] = offset
+            entry["length"] = len(payload)
+            offset += len(payload)
+        table = json.dumps(contents).encode("utf-8")
+        if len(table) > reserved:
+            raise ValueError(f"Index table of contents needs {len(table)} bytes, {reserved} reserved")
+        table = table.ljust(reserved)
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, reserved))
+            file.write(table)
+            for entry, payload in self._payloads:
+                file.write(b"\0" * (entry["offset"] - file.tell()))
+                file.write(payload)
+        os.replace(temporary, path)
+
+
+class KnowledgeIndex:
+    """
+    Read-only, memory-mapped view of an index file.
+
+    Arrays are zero-copy views of the mapping, so worker processes loading
+    the same file share its pages through the OS page cache. JSON documents
+    are parsed on first use.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map an index file and read its table of contents.
+
+        Args:
+            path: Index file
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If it is not an index file of INDEX_VERSION
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{path} is not a knowledge index")
+        magic, version, length = _HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a knowledge index")
+        if version != INDEX_VERSION:
+            raise ValueError(f"{path} has index format {version}, expected {INDEX_VERSION}")
+        contents = json.loads(self._map[_HEADER.size:_HEADER.size + length])
+        self.fingerprint = contents["fingerprint"]
+        self._arrays = contents["arrays"]
+        self._documents = contents["documents"]
+        self._parsed: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays or name in self._documents
+
+    def array(self, name: str) -> np.ndarray:
+        """
+        Return a stored array as a read-only view of the mapping.
+
+        Args:
+            name: Array name
+
+        Returns:
+            np.ndarray: The array
+        """
+        entry = self._arrays[name]
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=entry["offset"]).reshape(entry["shape"])
+
+    def document(self, name: str) -> Any:
+        """
+        Return a stored JSON document, parsing it on first use.
+
+        Args:
+            name: Document name
+
+        Returns:
+            The document
+        """
+        with self._lock:
+            if name not in self._parsed:
+                entry = self._documents[name]
+                self._parsed[name] = json.loads(self._map[entry["offset"]:entry["offset"] + entry["length"]])
+            return self._parsed[name]
+
+
+def load_index(path: str, knowledge: Dict[str, str]) -> Optional[KnowledgeIndex]:
+    """
+    Open an index file if it was built from the given knowledge bases.
+
+    Args:
+        path: Index file
+        knowledge: Knowledge bases the index must match
+
+    Returns:
+        KnowledgeIndex: The index, or None if the file is missing, unreadable,
+                        of another format version or built from other knowledge
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        index = KnowledgeIndex(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring knowledge index: {e}")
+        return None
+    if index.fingerprint != knowledge_fingerprint(knowledge):
+        print(f"Ignoring knowledge index {path}: built from different knowledge bases")
+        return None
+    return index
+
+
+_shared_index = None
+_shared_index_loaded = False
+_shared_index_lock = threading.Lock()
+
+
+def get_knowledge_index() -> Optional[KnowledgeIndex]:
+    """
+    Return the process-wide index of DOMAIN_KNOWLEDGE, opening it on first use.
+
+    The file is KNOWLEDGE_INDEX_PATH if set, else knowledge.idx next to this
+    module (written by the install-time build).
+
+    Returns:
+        KnowledgeIndex: The index, or None if there is no up-to-date one; callers
+                        then build what they need from the knowledge bases
+    """
+    global _shared_index, _shared_index_loaded
+    with _shared_index_lock:
+        if not _shared_index_loaded:
+            path = os.environ.get("KNOWLEDGE_INDEX_PATH") or DEFAULT_INDEX_PATH
+            _shared_index = load_index(path, DOMAIN_KNOWLEDGE)
+            _shared_index_loaded = True
+        return _shared_index
+
+
+def build_index(path: str = DEFAULT_INDEX_PATH, knowledge: Optional[Dict[str, str]] = None) -> str:
+    """
+    Compile knowledge bases into an index file.
+
+    Stores the domain router, the product entity automaton, the section index
+    of every knowledge base and the spec table.
+
+    Args:
+        path: Output file
+        knowledge: Knowledge bases to index (default DOMAIN_KNOWLEDGE)
+
+    Returns:
+        str: The path written
+    """
+    # Imported here: these modules load their shared instances from this one
+    from .entities import ProductEntityRecognizer
+    from .retrieval import SectionIndex
+    from .router import LexicalRouter
+    from .specs import SpecTable
+
+    knowledge = DOMAIN_KNOWLEDGE if knowledge is None else knowledge
+    writer = IndexWriter()
+    LexicalRouter(knowledge).to_index(writer, "router")
+    recognizer = ProductEntityRecognizer(knowledge)
+    recognizer.to_index(writer, "entities")
+    for domain, text in knowledge.items():
+        SectionIndex(text, recognizer=recognizer, domain=domain).to_index(writer, f"sections/{domain}")
+    SpecTable(knowledge, recognizer=recognizer).to_index(writer, "specs")
+    writer.write(path, knowledge_fingerprint(knowledge))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the knowledge bases into a memory-mappable index")
+    parser.add_argument("--output", default=DEFAULT_INDEX_PATH, help="Index file to write")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report whether the index file is present and up to date")
+    args = parser.parse_args()
+
+    if args.check:
+        index = load_index(args.output, DOMAIN_KNOWLEDGE)
+        print(f"{args.output}: {'up to date' if index else 'missing or stale'}")
+        raise SystemExit(0 if index else 1)
+    path = build_index(args.output)
+    print(f"Wrote knowledge index {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves POST /v1/messages with deterministic canned answers, including SSE
+streaming, configurable latency and injected 429/500 errors, so the example
+scripts and load tests can run offline:
+
+    python -m nvidia_sales_agent.mock_server --port 8765 --latency 0.5 --rate-429 0.05
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock python example.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from .backends import message_to_sse_events, format_sse_event
+
+
+class MockConfig:
+    """
+    Behaviour of the mock server.
+    """
+
+    def __init__(self, latency: float = 0.2, token_delay: float = 0.01,
+                 rate_429: float = 0.0, rate_500: float = 0.0,
+                 retry_after: float = 1.0, seed: Optional[int] = None):
+        """
+        Initialize the configuration.
+
+        Args:
+            latency: Seconds before the response (or the first streamed token)
+            token_delay: Seconds between streamed chunks
+            rate_429: Fraction of requests answered with 429 rate_limit_error
+            rate_500: Fraction of requests answered with 500 api_error
+            retry_after: retry-after header value sent with injected 429s
+            seed: Seed for the error injection random generator
+        """
+        self.latency = latency
+        self.token_delay = token_delay
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+
+def build_mock_message(request_body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Produce a deterministic response for a request.
+
+    Prompts from the orchestrator that expect JSON get well-formed JSON so the
+    full pipeline can run; everything else gets a short canned answer.
+
+    Args:
+        request_body: The /v1/messages request body
+
+    Returns:
+        dict: A /v1/messages response body
+    """
+    prompt = _text_of(request_body["messages"][-1]["content"])
+    # Instructions may live in the system prompt; search it after the user prompt
+    instructions = prompt + "\n" + _text_of(request_body.get("system", ""))
+
+    if "'selected_domains'" in instructions:
+        text = json.dumps({"selected_domains": _pick_domains(instructions)})
+    elif "<<<ASSESSMENT>>>" in instructions:
+        # Fused synthesis: an answer followed by the orchestrator's assessment marker
+        query = re.search(r'"(.*?)"', prompt)
+        subject = query.group(1) if query else prompt[:80]
+        text = (f"This is a mock answer about \"{subject}\". NVIDIA offers several products "
+                f"relevant to this question; see the product documentation for full details.\n"
+                f"<<<ASSESSMENT>>>\n" + json.dumps({"is_sufficient": True, "missing_information": ""}))
+    elif '"is_sufficient"' in instructions:
+        text = json.dumps({"is_sufficient": True, "missing_information": ""})
+    else:
+        query = re.search(r'"(.*?)"', prompt)
+        subject = query.group(1) if query else prompt[:80]
+        text = (f"This is a mock answer about \"{subject}\". NVIDIA offers several products "
+                f"relevant to this question; see the product documentation for full details.")
+
+    digest = hashlib.sha256(json.dumps(request_body, sort_keys=True).encode("utf-8")).hexdigest()
+    return {
+        "id": f"msg_mock_{digest[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request_body.get("model", "mock"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": len(json.dumps(request_body)) // 4,
+            "output_tokens": len(text) // 4 + 1
+        }
+    }
+
+
+def _text_of(content: Any) -> str:
+    """Flatten a string or a list of text blocks into plain text"""
+    if isinstance(content, list):
+        return "\n".join(block.get("text", "") for block in content)
+    return content or ""
+
+
+def _pick_domains(prompt: str) -> list:
+    """Choose agents from a routing prompt by word overlap with the query"""
+    query_match = re.search(r'"(.*?)"', prompt)
+    query_words = set(re.findall(r"[a-z0-9]+", (query_match.group(1) if query_match else "").lower()))
+    agents_match = re.search(r"agents[^:\n]*:\n(.+)", prompt)
+    agents = [a.strip() for a in agents_match.group(1).split(",")] if agents_match else []
+    scored = []
+    for agent in agents:
+        overlap = len(query_words & set(re.findall(r"[a-z0-9]+", agent.lower())))
+        if overlap:
+            scored.append((overlap, agent))
+    scored.sort(key=lambda item: -item[0])
+    return [agent for _, agent in scored[:3]] or agents[:1]
+
+
+class MockMessagesHandler(BaseHTTPRequestHandler):
+    """
+    Request handler implementing POST /v1/messages.
+    """
+
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        try:
+            self._handle_messages()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on the request (e.g. a cancelled hedge)
+            self.close_connection = True
+
+    def _handle_messages(self):
+        length = int(self.headers.get("content-length", 0))
+        body = self.rfile.read(length)
+        if not self.path.rstrip("/").endswith("/v1/messages"):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+
+        request_body = json.loads(body)
+        with self.config.lock:
+            roll = self.config.random.random()
+        if roll < self.config.rate_429:
+            self._send_json(429, {"type": "error", "error": {"type": "rate_limit_error", "message": "Injected 429"}},
+                            {"retry-after": str(self.config.retry_after)})
+            return
+        if roll < self.config.rate_429 + self.config.rate_500:
+            self._send_json(500, {"type": "error", "error": {"type": "api_error", "message": "Injected 500"}})
+            return
+
+        message = build_mock_message(request_body)
+        time.sleep(self.config.latency)
+
+        if not request_body.get("stream"):
+            self._send_json(200, message)
+            return
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+        for event in message_to_sse_events(message):
+            if event["type"] == "content_block_delta":
+                time.sleep(self.config.token_delay)
+            self._write_chunk(format_sse_event(event))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        content = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0,
+                      config: Optional[MockConfig] = None) -> ThreadingHTTPServer:
+    """
+    Start the mock server in a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one; see server.server_port)
+        config: Optional behaviour configuration
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() to stop it)
+    """
+    handler = type("ConfiguredMockMessagesHandler", (MockMessagesHandler,),
+                   {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first byte")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after sent with 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for error injection")
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, token_delay=args.token_delay,
+                        rate_429=args.rate_429, rate_500=args.rate_500,
+                        retry_after=args.retry_after, seed=args.seed)
+    handler = type("ConfiguredMockMessagesHandler", (MockMessagesHandler,), {"config": config})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Mock Messages API listening on http://{args.host}:{args.port}/v1/messages")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
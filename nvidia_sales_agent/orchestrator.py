@@ -1,8 +1,77 @@
 import asyncio
 import datetime
 import json
-from typing import Dict, List, Any
-from .claude_helper import ClaudeClient
+from collections import Counter, deque
+from typing import Dict, List, Any, Optional, Union
+from .claude_helper import ClaudeClient, cacheable_system_prompt
+from .usage import UsageTracker, track_usage, usage_stage, get_stage_latency_stats
+from .deadline import Deadline, as_deadline, current_deadline, deadline_scope
+from .router import LexicalRouter, get_shared_router, tokenize
+from .entities import ProductEntityRecognizer, get_shared_entity_recognizer
+from .knowledge_index import is_bundled
+from .knowledge import DOMAIN_KNOWLEDGE
+from .pipeline import StageGraph, StageNode
+from .sufficiency import LocalSufficiencyChecker
+from .specs import SpecTable, get_shared_spec_table
+from .compare import ComparisonEngine, COMPARABLE_DOMAINS
+from .recommend import GPU_QUERY, Recommender
+
+# Model used for each pipeline stage. The JSON-only routing and assessment
+# decisions sit on the critical path and run on the fast small model; domain
+# agents use the mid tier and the user-facing synthesis the strongest model.
+DEFAULT_STAGE_MODELS = {
+    "select": "claude-3-haiku-20240307",
+    "assess": "claude-3-haiku-20240307",
+    "select_additional": "claude-3-haiku-20240307",
+    "agent": "claude-3-sonnet-20240229",
+    "combine": "claude-3-5-sonnet-20241022",
+}
+
+# Share of a query's latency budget that must still be left when each stage
+# ends, so the stages after it can run. Synthesis always keeps 30%.
+DEADLINE_RESERVES = {
+    "select": 0.75,
+    "agents": 0.3,
+    "assess": 0.3,
+    "select_additional": 0.3,
+    "additional_agents": 0.3,
+    "combine": 0.0,
+}
+
+# Stages whose share of the budget falls below this are skipped outright
+MIN_STAGE_SHARE = 0.05
+
+# Agent ids of the structured answers standing in for the agents' answers
+COMPARISON_AGENT = "Product Comparison"
+RECOMMENDATION_AGENT = "Product Recommendation"
+
+# Separates the answer from the sufficiency verdict in fused synthesis output
+ASSESSMENT_MARKER = "<<<ASSESSMENT>>>"
+
+# Named stage graphs (see OrchestratorAgent.build_pipeline):
+#   default:  select -> agents -> assess -> [select_additional -> additional_agents] -> combine
+#   fused:    select -> agents -> draft (combine + assess) -> [expand] -> combine only if expanded
+#   fast:     select -> agents -> combine, without any sufficiency check
+#   degraded: local routing -> agents -> concatenation, with no Claude calls outside the agents
+#   incremental: select -> lead agent -> draft, while the other agents finish -> refine if novel
+PIPELINES = ("default", "fused", "fast", "degraded", "incremental")
+
+
+def novelty(text: str, reference: str) -> float:
+    """
+    Fraction of the distinct terms of a text that do not occur in a reference.
+    
+    Args:
+        text: Candidate new material
+        reference: What has already been said
+        
+    Returns:
+        float: 0.0 when everything is covered, up to 1.0 when nothing is
+    """
+    terms = set(tokenize(text))
+    if not terms:
+        return 0.0
+    return len(terms - set(tokenize(reference))) / len(terms)
 
 class OrchestratorAgent:
     """
@@ -10,17 +79,79 @@ class OrchestratorAgent:
     and combines responses from multiple ProductCatalogAgents.
     """
     
-    def __init__(self, ui_notifier, claude_client=None):
+    def __init__(self, ui_notifier, claude_client=None, session_id: Optional[str] = None,
+                 stage_models: Optional[Dict[str, str]] = None,
+                 router: Optional[LexicalRouter] = None,
+                 entity_recognizer: Optional[ProductEntityRecognizer] = None,
+                 speculative: bool = False, speculation_threshold: float = 0.5,
+                 max_speculative: int = 2, fused_synthesis: bool = False,
+                 pipeline: Union[str, StageGraph, None] = None, novelty_threshold: float = 0.3,
+                 high_confidence: float = 0.75, low_confidence: float = 0.3):
         """
         Initialize the OrchestratorAgent with a UI notifier for real-time feedback.
         
         Args:
             ui_notifier: An object that handles UI notifications
             claude_client: Optional Claude client for API calls
+            session_id: Optional session identifier used to tag usage records
+            stage_models: Optional overrides for DEFAULT_STAGE_MODELS
+            router: Optional local router (by default one is built over the registered
+                    agents' entries in DOMAIN_KNOWLEDGE)
+            entity_recognizer: Optional product name matcher (built the same way by default)
+            speculative: Start the likeliest agents while Claude is still routing an ambiguous query
+            speculation_threshold: Minimum router score, relative to the best, for an agent to be speculated on
+            max_speculative: Maximum agents started speculatively per query
+            fused_synthesis: Assess sufficiency in the synthesis call instead of a separate one
+                             (shorthand for pipeline='fused')
+            pipeline: Stage graph to run, or the name of one in PIPELINES
+                      (default 'fused' or 'default' depending on fused_synthesis)
+            novelty_threshold: In the incremental pipeline, the share of new terms the
+                               later agents must bring for the draft to be refined
+            high_confidence: Agent confidence at or above which the sufficiency
+                             assessment and follow-up round are skipped
+            low_confidence: Agent confidence below which a response is left out of synthesis
         """
         self.ui_notifier = ui_notifier
         self.agents = {}
         self.claude_client = claude_client or ClaudeClient()
+        self.session_id = session_id
+        self.last_usage = None
+        self.stage_models = dict(DEFAULT_STAGE_MODELS)
+        if stage_models:
+            self.stage_models.update(stage_models)
+        self.router = router
+        self._owns_router = router is None
+        self.entity_recognizer = entity_recognizer
+        self._owns_entity_recognizer = entity_recognizer is None
+        self.routing_stats = {"entity": 0, "local": 0, "llm": 0}
+        self.speculative = speculative
+        self.speculation_threshold = speculation_threshold
+        self.max_speculative = max_speculative
+        self.speculation_stats = {"queries": 0, "started": 0, "used": 0, "cancelled": 0, "completed_unused": 0}
+        # Agents Claude picked for recent ambiguous queries, the prior when the router has no signal
+        self._recent_selections = deque(maxlen=20)
+        self.fused_synthesis = fused_synthesis
+        self.pipeline = pipeline or ("fused" if fused_synthesis else "default")
+        if isinstance(self.pipeline, str) and self.pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline '{self.pipeline}', expected one of {', '.join(PIPELINES)}")
+        self._pipelines: Dict[str, StageGraph] = {}
+        self.novelty_threshold = novelty_threshold
+        self.incremental_stats = {"drafts": 0, "refined": 0}
+        self.high_confidence = high_confidence
+        self.low_confidence = low_confidence
+        self.confidence_stats = {"responses_dropped": 0}
+        # How each sufficiency assessment was decided: confident agents, local check or Claude
+        self.assessment_stats = {"confident": 0, "local_sufficient": 0, "local_insufficient": 0, "llm": 0}
+        self._sufficiency_checker = None
+        # Queries answered from the spec table without a synthesis call
+        self.spec_answers = 0
+        self._comparison_engine = None
+        # Comparison tables returned as the answer or handed to synthesis instead of agent answers
+        self.comparison_stats = {"direct": 0, "synthesized": 0}
+        self._recommender = None
+        # Recommendation questions solved over the catalog, and those no product satisfied
+        self.recommendation_stats = {"shortlists": 0, "infeasible": 0}
+        self.last_trace = None
         
     def register_agent(self, agent_id: str, agent):
         """
@@ -30,74 +161,692 @@ class OrchestratorAgent:
             agent_id: Unique identifier for the agent
             agent: The ProductCatalogAgent instance
         """
+        # Agents without an explicit model run on the agent tier
+        if getattr(agent, "model", "") is None:
+            agent.model = self.stage_models["agent"]
         self.agents[agent_id] = agent
+        # Rebuild the default router and recognizer lazily so they cover the new agent
+        if self._owns_router:
+            self.router = None
+        if self._owns_entity_recognizer:
+            self.entity_recognizer = None
+            self._sufficiency_checker = None
+        self._comparison_engine = None
+        self._recommender = None
         
-    async def process_query(self, query: str) -> str:
+    async def process_query(self, query: str, include_usage: bool = False,
+                            deadline: Union[Deadline, float, None] = None) -> Union[str, Dict[str, Any]]:
         """
         Process a user query by selecting appropriate agents and combining responses.
         
+        Args:
+            query: The user's query string
+            include_usage: Also return token, cost and latency accounting for the query
+            deadline: Optional latency budget in seconds (or a Deadline). Every Claude
+                      call is bounded by the time left; stages that cannot fit are
+                      skipped or degraded and straggling agents are cancelled.
+            
+        Returns:
+            str: The combined response from all relevant agents, or, when include_usage
+                 is set, a dict with 'response' and 'usage' (see UsageTracker.summary)
+        """
+        tracker = UsageTracker(self.session_id)
+        with track_usage(tracker), deadline_scope(as_deadline(deadline)):
+            response = await self._run_pipeline(query)
+            
+        self.last_usage = tracker.summary()
+        self.last_usage["pipeline"] = self.last_trace
+        get_stage_latency_stats().record_calls(tracker.calls)
+        
+        if include_usage:
+            return {"response": response, "usage": self.last_usage}
+        return response
+        
+    def build_pipeline(self, name: str) -> StageGraph:
+        """
+        Build one of the named stage graphs (see PIPELINES).
+        
+        Args:
+            name: One of PIPELINES
+            
+        Returns:
+            StageGraph: The pipeline, bound to this orchestrator
+            
+        Raises:
+            ValueError: If the name is unknown
+        """
+        select = StageNode("select", self._stage_select, timeout=self._deadline_timeout("select"),
+                           fallback=lambda context: self._default_agents())
+        agents = StageNode("agents", self._stage_agents, ["select"], fallback=[])
+        expand = [
+            StageNode("select_additional", self._stage_select_additional,
+                      ["draft" if name == "fused" else "assess"],
+                      timeout=self._deadline_timeout("select_additional"), fallback=[],
+                      when=self._needs_follow_up),
+            StageNode("additional_agents", self._stage_additional_agents, ["select_additional"],
+                      fallback=[], when=lambda context: bool(context["select_additional"])),
+        ]
+        
+        if name == "default":
+            nodes = [select, agents,
+                     StageNode("assess", self._stage_assess, ["agents"],
+                               timeout=self._deadline_timeout("assess"), fallback=(True, "")),
+                     *expand,
+                     StageNode("combine", self._stage_combine, ["agents", "additional_agents"],
+                               timeout=self._deadline_timeout("combine"), fallback=self._combine_fallback)]
+        elif name == "fused":
+            nodes = [select, agents,
+                     StageNode("draft", self._stage_draft, ["agents"],
+                               timeout=self._deadline_timeout("combine"), fallback=(None, True, "")),
+                     *expand,
+                     StageNode("combine", self._stage_combine, ["draft", "additional_agents"],
+                               timeout=self._deadline_timeout("combine"), fallback=self._combine_fallback)]
+        elif name == "fast":
+            nodes = [select, agents,
+                     StageNode("combine", self._stage_combine, ["agents"],
+                               timeout=self._deadline_timeout("combine"), fallback=self._combine_fallback)]
+        elif name == "incremental":
+            nodes = [select,
+                     StageNode("lead", self._stage_lead, ["select"], fallback=None),
+                     StageNode("draft", self._stage_lead_draft, ["lead"],
+                               timeout=self._deadline_timeout("combine"), fallback=None),
+                     StageNode("agents", self._stage_remaining_agents, ["lead"], fallback=[]),
+                     StageNode("combine", self._stage_refine, ["draft", "agents"],
+                               timeout=self._deadline_timeout("combine"), fallback=self._combine_fallback)]
+        elif name == "degraded":
+            nodes = [StageNode("select", self._stage_select_local, fallback=lambda context: self._default_agents()),
+                     agents,
+                     StageNode("combine", self._stage_concatenate, ["agents"], fallback=self._combine_fallback)]
+        else:
+            raise ValueError(f"Unknown pipeline '{name}', expected one of {', '.join(PIPELINES)}")
+        return StageGraph(name, nodes)
+        
+    async def _run_pipeline(self, query: str) -> str:
+        """
+        Run the orchestrator's stage graph for a query.
+        
         Args:
             query: The user's query string
             
         Returns:
             str: The combined response from all relevant agents
         """
+        graph = self.pipeline
+        if not isinstance(graph, StageGraph):
+            graph = self._pipelines.get(graph)
+            if graph is None:
+                graph = self._pipelines[self.pipeline] = self.build_pipeline(self.pipeline)
+                
         # Notify UI that orchestrator is analyzing query
         self._notify_orchestrator_thinking("Analyzing query to determine relevant product domains...")
         
-        # Select agents based on query content using Claude
-        selected_agent_ids = await self._select_agents_with_claude(query)
+        # Agents started speculatively while Claude routes, by agent id
+        context = {"query": query, "speculation": {}}
+        try:
+            trace = await graph.run(context, self._observe_stage)
+        finally:
+            self._discard_speculation(context["speculation"])
+            for task in context.get("agent_tasks", []):
+                task.cancel()
+        self.last_trace = {"pipeline": graph.name, "stages": trace}
+        if self._direct_answer([r for r in context.get("agents", []) if r["status"] == "success"]):
+            self.spec_answers += 1
+        return context["combine"]
+        
+    async def _stage_select(self, context: Dict[str, Any]) -> List[str]:
+        """Select agents for the query, starting speculative agents if enabled"""
+        if self._structured_response(context) is not None:
+            return [self._structured_response(context)["agent_id"]]
+        return await self._select_agents(context["query"], context["speculation"])
+        
+    async def _stage_select_local(self, context: Dict[str, Any]) -> List[str]:
+        """Select agents without Claude: named products, then the router, then the defaults"""
+        query = context["query"]
+        if self._structured_response(context) is not None:
+            return [self._structured_response(context)["agent_id"]]
+        return (self._get_entity_recognizer().domains(query)[:3]
+                or self._get_router().route(query)
+                or self._default_agents())
+        
+    def _adopt_speculation(self, context: Dict[str, Any]) -> Dict[str, asyncio.Task]:
+        """Announce the selection, keeping the speculative agents it chose and cancelling the rest"""
+        selected_agent_ids = context["select"]
         
         # Notify about agent selection
         agent_list = ", ".join(selected_agent_ids)
         self._notify_orchestrator_thinking(f"Selected agents: {agent_list}")
         
-        # Invoke selected agents in parallel
+        # Keep the speculative agents routing chose and cancel the rest right away
+        speculation = context["speculation"]
+        adopted = {agent_id: speculation.pop(agent_id) for agent_id in selected_agent_ids if agent_id in speculation}
+        self._discard_speculation(speculation)
+        return adopted
+        
+    async def _stage_agents(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Invoke the selected agents in parallel, reusing any already started"""
+        adopted = self._adopt_speculation(context)
+        if self._structured_response(context) is not None:
+            return [self._structured_response(context)]
+        return await self._invoke_agents("agents", context["select"], context["query"], adopted)
+        
+    async def _stage_lead(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Start every selected agent and return as soon as the lead one has answered.
+        
+        Selections are ranked best first, so the lead is the highest-ranked agent
+        that succeeds. The agent tasks keep running for the 'agents' stage.
+        """
+        adopted = self._adopt_speculation(context)
+        if self._structured_response(context) is not None:
+            return self._structured_response(context)
+        tasks = self._start_agents(context["select"], context["query"], adopted)
+        context["agent_tasks"] = tasks
+        
+        timeout = self._stage_timeout("agents")
+        wait_until = None if timeout is None else asyncio.get_running_loop().time() + timeout
+        for task in tasks:
+            remaining = None if wait_until is None else max(0.0, wait_until - asyncio.get_running_loop().time())
+            try:
+                # Shielded so that giving up on the lead leaves the agent running
+                response = await asyncio.wait_for(asyncio.shield(task), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if response["status"] == "success" and response["confidence"] >= self.low_confidence:
+                return response
+        return None
+        
+    async def _stage_lead_draft(self, context: Dict[str, Any]) -> Optional[str]:
+        """Synthesize and stream a draft answer from the lead agent alone"""
+        lead = context["lead"]
+        if lead is None:
+            return None
+        self.incremental_stats["drafts"] += 1
+        return await self._combine_responses_with_claude(context["query"], [lead])
+        
+    async def _stage_remaining_agents(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Wait for the agents that were still running when the lead answered"""
+        if self._structured_response(context) is not None:
+            return [self._structured_response(context)]
+        return await self._collect_agents("agents", context["select"], context.get("agent_tasks", []))
+        
+    async def _stage_refine(self, context: Dict[str, Any]) -> str:
+        """Keep the draft unless the other agents add material it does not cover"""
+        draft_response = context["draft"]
+        responses = context["agents"]
+        lead = context["lead"]
+        if draft_response is None:
+            # A draft cut short part way through streaming has already reset the UI
+            return await self._combine_responses_with_claude(context["query"], responses)
+            
+        others = [r for r in responses if r["status"] == "success" and r["agent_id"] != lead["agent_id"]]
+        reference = draft_response + "\n" + lead["response"]
+        novel = [r for r in others if novelty(r["response"], reference) >= self.novelty_threshold]
+        if not novel:
+            return draft_response
+            
+        agent_list = ", ".join(r["agent_id"] for r in novel)
+        self._notify_orchestrator_thinking(f"Refining the answer with new information from: {agent_list}")
+        self.incremental_stats["refined"] += 1
+        
+        # Discard the streamed draft before regenerating it with the new information
+        self._notify_response_reset()
+        return await self._combine_responses_with_claude(context["query"], [lead] + novel)
+        
+    async def _stage_assess(self, context: Dict[str, Any]) -> tuple:
+        """
+        Assess if the information is sufficient.
+        
+        Confident agents and clear local coverage results decide without Claude;
+        only borderline cases get the LLM assessment.
+        """
+        if self._all_confident(context["agents"]):
+            self.assessment_stats["confident"] += 1
+            return True, ""
+            
+        verdict, coverage, missing = self._get_sufficiency_checker().check(context["query"], context["agents"])
+        if verdict == "sufficient":
+            self.assessment_stats["local_sufficient"] += 1
+            return True, ""
+        if verdict == "insufficient":
+            self.assessment_stats["local_insufficient"] += 1
+            return False, "No information on " + ", ".join(missing)
+            
+        self.assessment_stats["llm"] += 1
+        return await self._assess_response_sufficiency(context["query"], context["agents"])
+        
+    async def _stage_draft(self, context: Dict[str, Any]) -> tuple:
+        """Answer and assess in one call; the answer stands unless it is insufficient"""
+        return await self._combine_and_assess_with_claude(context["query"], context["agents"])
+        
+    def _verdict(self, context: Dict[str, Any]) -> tuple:
+        """(is_sufficient, missing_information) from the assess or draft stage"""
+        if "assess" in context:
+            return context["assess"]
+        return context["draft"][1:]
+        
+    def _all_confident(self, responses: List[Dict]) -> bool:
+        """Whether some agent succeeded and every successful one reached high_confidence"""
+        successful = [r for r in responses if r["status"] == "success"]
+        return bool(successful) and all(r["confidence"] >= self.high_confidence for r in successful)
+        
+    def _needs_follow_up(self, context: Dict[str, Any]) -> bool:
+        """Whether to consult additional agents: the answer is insufficient and not every agent was confident"""
+        return not self._verdict(context)[0] and not self._all_confident(context["agents"])
+        
+    async def _stage_select_additional(self, context: Dict[str, Any]) -> List[str]:
+        """Determine additional agents to query"""
+        missing_info = self._verdict(context)[1]
+        
+        # Notify UI about insufficient information
+        self._notify_orchestrator_thinking(f"The current information is insufficient: {missing_info}. Consulting additional agents...")
+        
+        return await self._select_additional_agents(
+            context["query"], context["agents"], context["select"], missing_info)
+        
+    async def _stage_additional_agents(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Invoke the additional agents"""
+        additional_agents = context["select_additional"]
+        
+        # Notify about additional agents
+        agent_list = ", ".join(additional_agents)
+        self._notify_orchestrator_thinking(f"Consulting additional agents: {agent_list}")
+        
+        return await self._invoke_agents("additional_agents", additional_agents, context["query"])
+        
+    async def _stage_combine(self, context: Dict[str, Any]) -> str:
+        """Combine responses using Claude, keeping a fused draft when nothing was added"""
+        responses = context["agents"] + context.get("additional_agents", [])
+        if "draft" in context:
+            draft_response = context["draft"][0]
+            if draft_response is None:
+                return self._concatenate_responses(responses)
+            if not context.get("additional_agents"):
+                return draft_response
+            # Discard the streamed draft before regenerating it with the new information
+            self._notify_response_reset()
+        
+        combined_response = await self._combine_responses_with_claude(context["query"], responses)
+        return combined_response or self._combine_fallback(context)
+        
+    async def _stage_concatenate(self, context: Dict[str, Any]) -> str:
+        """Combine responses without Claude"""
+        valid_responses = [r for r in context["agents"] if r["status"] == "success"]
+        return self._direct_answer(valid_responses) or self._concatenate_responses(context["agents"])
+        
+    def _combine_fallback(self, context: Dict[str, Any]) -> str:
+        """Answer used when synthesis is skipped or fails: the draft or the concatenated responses"""
+        draft = context.get("draft")
+        if isinstance(draft, str):
+            return draft
+        if draft and draft[0] is not None:
+            return draft[0]
+        return self._concatenate_responses(context.get("agents", []) + context.get("additional_agents", []))
+        
+    def _structured_response(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        A comparison table or recommendation standing in for the agents' answers.
+        
+        Comparisons and "best GPU for X" questions about products of the comparable
+        domains are answered from the spec table, provided the query names nothing
+        outside those domains. A recommendation also needs the query to be about
+        GPUs: either it says so, or the domains it names or routes to are all
+        comparable ("best networking for AI clusters" is left to the agents).
+        Computed once per query.
+        
+        Returns:
+            dict: A response as from _invoke_agent, or None if the agents must answer
+        """
+        if "structured" not in context:
+            query = context["query"]
+            response = None
+            named = self._get_entity_recognizer().domains(query)
+            if all(domain in COMPARABLE_DOMAINS for domain in named):
+                response = self._comparison_response(query)
+                if response is None and self._asks_for_gpu(query, named):
+                    response = self._recommendation_response(query)
+            context["structured"] = response
+        return context["structured"]
+        
+    def _asks_for_gpu(self, query: str, named: List[str]) -> bool:
+        """Whether a query names GPUs or only comparable domains (by entity, else by routing)"""
+        if GPU_QUERY.search(query.lower()):
+            return True
+        domains = named or self._get_router().route(query) or []
+        return bool(domains) and all(domain in COMPARABLE_DOMAINS for domain in domains)
+        
+    def _comparison_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """The comparison table for a comparison query, as a response"""
+        comparison = self._get_comparison_engine().compare(query)
+        if comparison is None:
+            return None
+        self.comparison_stats["direct" if comparison["direct"] else "synthesized"] += 1
+        self._notify_orchestrator_thinking(
+            f"Comparing {len(comparison['rows'])} products from the spec table instead of consulting agents")
+        return {
+            "agent_id": COMPARISON_AGENT,
+            "response": comparison["table"],
+            "confidence": 1.0,
+            # A table with every value asked for is the answer; otherwise synthesis phrases it
+            "source": "spec_table" if comparison["direct"] else "comparison",
+            "status": "success"
+        }
+        
+    def _recommendation_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """The solved shortlist for a recommendation query, as a response for synthesis to phrase"""
+        recommendation = self._get_recommender().recommend(query)
+        if recommendation is None:
+            return None
+        self.recommendation_stats["shortlists" if recommendation["shortlist"] else "infeasible"] += 1
+        self._notify_orchestrator_thinking(
+            f"Recommending from {recommendation['candidates']} {recommendation['use_case']} candidates "
+            "in the spec table instead of consulting agents")
+        return {
+            "agent_id": RECOMMENDATION_AGENT,
+            "response": recommendation["table"],
+            "confidence": 1.0,
+            "source": "recommendation",
+            "status": "success"
+        }
+        
+    def _observe_stage(self, event: str, stage: str, info: Dict[str, Any]):
+        """Report deadline skips, timeouts and failures of pipeline stages to the UI"""
+        if event == "no_time":
+            self._notify_orchestrator_thinking(f"Skipping {stage} to stay within the time budget")
+        elif event == "timeout":
+            self._notify_orchestrator_thinking(f"{stage} ran out of time; continuing without it")
+        elif event == "error":
+            print(f"Error in pipeline stage {stage}: {info.get('error')}")
+        
+    async def _select_agents(self, query: str, speculation: Optional[Dict[str, asyncio.Task]] = None) -> List[str]:
+        """
+        Select agents locally, asking Claude only when the query is ambiguous.
+        
+        Products named in the query decide first; otherwise the lexical router
+        ranks the domains. In speculative mode the likeliest agents are started
+        before the Claude routing call and recorded in speculation.
+        
+        Args:
+            query: The user query
+            speculation: Dict receiving the speculatively started agent tasks
+            
+        Returns:
+            list: List of agent IDs to invoke
+        """
+        named = self._get_entity_recognizer().domains(query)
+        if named:
+            self.routing_stats["entity"] += 1
+            # A spec question goes only to the agents that can answer it from their spec table
+            answerable = [agent_id for agent_id in named if self._answers_from_specs(agent_id, query)]
+            return (answerable or named)[:3]
+            
+        selected = self._get_router().route(query)
+        if selected:
+            self.routing_stats["local"] += 1
+            return selected
+            
+        self.routing_stats["llm"] += 1
+        if self.speculative and speculation is not None:
+            self._start_speculation(query, speculation)
+        selected = await self._select_agents_with_claude(query)
+        self._recent_selections.append(selected)
+        return selected
+        
+    def _answers_from_specs(self, agent_id: str, query: str) -> bool:
+        """Whether an agent would answer a query from its spec table"""
+        agent = self.agents[agent_id]
+        spec_table = getattr(agent, "spec_table", None)
+        return (getattr(agent, "spec_lookup", False) and spec_table is not None
+                and spec_table.lookup(query, domain=agent_id) is not None)
+        
+    def _speculation_candidates(self, query: str) -> List[str]:
+        """
+        Agents likely to be chosen for an ambiguous query.
+        
+        Uses the router's ranking when it has any signal, otherwise the agents
+        Claude chose most often for recent ambiguous queries.
+        
+        Args:
+            query: The user query
+            
+        Returns:
+            list: Up to max_speculative agent IDs
+        """
+        ranked = self._get_router().rank(query)
+        if ranked and ranked[0][1] > 0:
+            cutoff = ranked[0][1] * self.speculation_threshold
+            return [agent_id for agent_id, score in ranked if score >= cutoff][:self.max_speculative]
+        counts = Counter(agent_id for selection in self._recent_selections for agent_id in selection)
+        return [agent_id for agent_id, _ in counts.most_common(self.max_speculative)]
+        
+    def _start_speculation(self, query: str, speculation: Dict[str, asyncio.Task]):
+        """Start the candidate agents before routing has decided"""
+        candidates = self._speculation_candidates(query)
+        if not candidates:
+            return
+        self.speculation_stats["queries"] += 1
+        self._notify_orchestrator_thinking(f"Speculatively consulting: {', '.join(candidates)}")
+        for agent_id in candidates:
+            self._notify_agent_invocation(agent_id)
+            speculation[agent_id] = asyncio.ensure_future(self._invoke_agent(agent_id, self.agents[agent_id], query))
+            self.speculation_stats["started"] += 1
+            
+    def _discard_speculation(self, speculation: Dict[str, asyncio.Task]):
+        """Cancel speculative agents that routing did not choose, counting the wasted work"""
+        for agent_id, task in speculation.items():
+            if task.done():
+                # The agent's Claude call ran to completion for nothing
+                self.speculation_stats["completed_unused"] += 1
+            else:
+                task.cancel()
+                self.speculation_stats["cancelled"] += 1
+                self._notify_agent_completion(agent_id, "cancelled")
+        speculation.clear()
+        
+    def _get_router(self) -> LexicalRouter:
+        """Return the router, indexing the registered agents' knowledge on first use"""
+        if self.router is None:
+            knowledge = self._agent_knowledge()
+            self.router = get_shared_router() if is_bundled(knowledge) else LexicalRouter(knowledge)
+        return self.router
+        
+    def _get_entity_recognizer(self) -> ProductEntityRecognizer:
+        """Return the product name matcher, compiling it on first use"""
+        if self.entity_recognizer is None:
+            knowledge = self._agent_knowledge()
+            self.entity_recognizer = (get_shared_entity_recognizer() if is_bundled(knowledge)
+                                      else ProductEntityRecognizer(knowledge))
+        return self.entity_recognizer
+        
+    def _get_sufficiency_checker(self) -> LocalSufficiencyChecker:
+        """Return the local sufficiency checker, sharing the product name matcher"""
+        if self._sufficiency_checker is None:
+            self._sufficiency_checker = LocalSufficiencyChecker(self._get_entity_recognizer())
+        return self._sufficiency_checker
+        
+    def _get_comparison_engine(self) -> ComparisonEngine:
+        """Return the comparison engine over the registered agents' spec tables, building it on first use"""
+        if self._comparison_engine is None:
+            knowledge = self._agent_knowledge()
+            # The bundled table is parsed already; custom knowledge bases need their own
+            bundled = all(DOMAIN_KNOWLEDGE.get(agent_id) == text for agent_id, text in knowledge.items())
+            table = get_shared_spec_table() if bundled else SpecTable(knowledge)
+            self._comparison_engine = ComparisonEngine(table, [d for d in COMPARABLE_DOMAINS if d in knowledge])
+        return self._comparison_engine
+        
+    def _get_recommender(self) -> Recommender:
+        """Return the recommender, sharing the comparison engine"""
+        if self._recommender is None:
+            self._recommender = Recommender(self._get_comparison_engine())
+        return self._recommender
+        
+    def _agent_knowledge(self) -> Dict[str, str]:
+        """Knowledge base text of each registered agent: its own, else DOMAIN_KNOWLEDGE's (empty if unknown)"""
+        return {agent_id: getattr(agent, "knowledge_base", None) or DOMAIN_KNOWLEDGE.get(agent_id, "")
+                for agent_id, agent in self.agents.items()}
+        
+    def _default_agents(self) -> List[str]:
+        """Agents consulted when routing fails or is skipped: up to the first three"""
+        return list(self.agents.keys())[:min(3, len(self.agents))]
+        
+    def _stage_timeout(self, stage: str) -> Optional[float]:
+        """
+        Seconds a stage may run under the current deadline.
+        
+        Args:
+            stage: Key of DEADLINE_RESERVES
+            
+        Returns:
+            float: The stage's timeout (may be <= 0), or None without a deadline
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return None
+        return deadline.remaining() - deadline.budget * DEADLINE_RESERVES[stage]
+        
+    def _deadline_timeout(self, stage: str):
+        """
+        Timeout function for a stage node under the current deadline.
+        
+        Args:
+            stage: Key of DEADLINE_RESERVES
+            
+        Returns:
+            Function returning the stage's timeout when it starts: None without a
+            deadline, 0 (skip) when less than MIN_STAGE_SHARE of the budget is left
+        """
+        def timeout() -> Optional[float]:
+            remaining = self._stage_timeout(stage)
+            if remaining is None:
+                return None
+            return remaining if remaining >= current_deadline().budget * MIN_STAGE_SHARE else 0.0
+        return timeout
+        
+    async def _invoke_agents(self, stage: str, agent_ids: List[str], query: str,
+                             started: Optional[Dict[str, asyncio.Task]] = None) -> List[Dict[str, Any]]:
+        """
+        Invoke agents in parallel, cancelling any still running when the stage's time is up.
+        
+        Args:
+            stage: Key of DEADLINE_RESERVES ('agents' or 'additional_agents')
+            agent_ids: Agents to invoke
+            query: The user query
+            started: Agent tasks already running (adopted from speculation)
+            
+        Returns:
+            list: One response per agent, in order; cancelled agents have status 'timeout'
+        """
+        tasks = self._start_agents(agent_ids, query, started)
+        return await self._collect_agents(stage, agent_ids, tasks)
+        
+    def _start_agents(self, agent_ids: List[str], query: str,
+                      started: Optional[Dict[str, asyncio.Task]] = None) -> List[asyncio.Task]:
+        """
+        Start a task per agent, adopting any already running.
+        
+        Args:
+            agent_ids: Agents to invoke
+            query: The user query
+            started: Agent tasks already running (adopted from speculation)
+            
+        Returns:
+            list: One task per agent, in order
+        """
         tasks = []
-        for agent_id in selected_agent_ids:
-            agent = self.agents[agent_id]
+        for agent_id in agent_ids:
+            if started and agent_id in started:
+                tasks.append(started.pop(agent_id))
+                self.speculation_stats["used"] += 1
+                continue
             # Notify UI about agent invocation
             self._notify_agent_invocation(agent_id)
             # Create task for each agent
-            tasks.append(self._invoke_agent(agent_id, agent, query))
+            tasks.append(asyncio.ensure_future(self._invoke_agent(agent_id, self.agents[agent_id], query)))
+        return tasks
+        
+    async def _collect_agents(self, stage: str, agent_ids: List[str],
+                              tasks: List[asyncio.Task]) -> List[Dict[str, Any]]:
+        """
+        Wait for started agents, cancelling any still running when the stage's time is up.
+        
+        Args:
+            stage: Key of DEADLINE_RESERVES ('agents' or 'additional_agents')
+            agent_ids: The agents, in the order of their tasks
+            tasks: Tasks from _start_agents
+            
+        Returns:
+            list: One response per agent, in order; cancelled agents have status 'timeout'
+        """
+        timeout = self._stage_timeout(stage)
+        if timeout is None:
+            return list(await asyncio.gather(*tasks))
+            
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=max(0.0, timeout)) if tasks else (set(), set())
+        finally:
+            for task in tasks:
+                task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
             
-        # Wait for all agent responses
-        agent_responses = await asyncio.gather(*tasks)
+        responses = []
+        for agent_id, task in zip(agent_ids, tasks):
+            if task in done:
+                responses.append(task.result())
+            else:
+                self._notify_agent_completion(agent_id, "timeout")
+                responses.append({
+                    "agent_id": agent_id,
+                    "response": "Error: no response within the time budget",
+                    "confidence": 0.0,
+                    "status": "timeout"
+                })
+        return responses
+        
+    def _synthesis_inputs(self, responses: List[Dict]) -> List[Dict]:
+        """
+        Successful responses worth synthesizing, without low-confidence ones.
         
-        # Assess if the information is sufficient
-        is_sufficient, missing_info = await self._assess_response_sufficiency(query, agent_responses)
+        Low-confidence responses are only dropped while a confident one remains.
         
-        if not is_sufficient:
-            # Notify UI about insufficient information
-            self._notify_orchestrator_thinking(f"The current information is insufficient: {missing_info}. Consulting additional agents...")
+        Args:
+            responses: List of agent responses
             
-            # Determine additional agents to query
-            additional_agents = await self._select_additional_agents(query, agent_responses, selected_agent_ids, missing_info)
+        Returns:
+            list: The responses to pass to Claude
+        """
+        valid_responses = [r for r in responses if r["status"] == "success"]
+        confident = [r for r in valid_responses if r["confidence"] >= self.low_confidence]
+        if not confident:
+            return valid_responses
+        self.confidence_stats["responses_dropped"] += len(valid_responses) - len(confident)
+        return confident
+        
+    def _direct_answer(self, responses: List[Dict]) -> Optional[str]:
+        """
+        Answer without synthesis when every response came straight from the spec table.
+        
+        Args:
+            responses: Responses that would be synthesized
             
-            if additional_agents:
-                # Notify about additional agents
-                agent_list = ", ".join(additional_agents)
-                self._notify_orchestrator_thinking(f"Consulting additional agents: {agent_list}")
-                
-                # Invoke additional agents
-                add_tasks = []
-                for agent_id in additional_agents:
-                    agent = self.agents[agent_id]
-                    # Notify UI about agent invocation
-                    self._notify_agent_invocation(agent_id)
-                    # Create task for each agent
-                    add_tasks.append(self._invoke_agent(agent_id, agent, query))
-                
-                # Wait for additional agent responses
-                additional_responses = await asyncio.gather(*add_tasks)
-                
-                # Add additional responses
-                agent_responses.extend(additional_responses)
+        Returns:
+            str: The spec answers joined, or None if synthesis is needed
+        """
+        if not responses or any(r.get("source") != "spec_table" for r in responses):
+            return None
+        return "\n\n".join(r["response"] for r in responses)
+        
+    def _concatenate_responses(self, responses: List[Dict]) -> str:
+        """Combine agent responses without Claude, used when synthesis fails or is skipped"""
+        valid_responses = [r for r in responses if r["status"] == "success"]
+        if not valid_responses:
+            return "I'm sorry, I couldn't find information to answer your question about NVIDIA products."
             
-        # Combine responses using Claude
-        combined_response = await self._combine_responses_with_claude(query, agent_responses)
+        responses_text = "Here's what I know about NVIDIA products related to your query:\n\n"
         
-        return combined_response
+        for resp in valid_responses:
+            responses_text += f"From {resp['agent_id']}:\n{resp['response']}\n\n"
+            
+        return responses_text
         
     async def _invoke_agent(self, agent_id: str, agent, query: str) -> Dict[str, Any]:
         """
@@ -113,16 +862,19 @@ class OrchestratorAgent:
         """
         try:
             # Get response from agent
-            response = await agent.process_query(query)
+            with usage_stage(f"agent:{agent_id}"):
+                response = await agent.process_query(query)
             
-            # Notify UI about successful completion
-            self._notify_agent_completion(agent_id, "completed")
+            # Agents report failures they recovered from with status 'error'
+            status = response.get("status", "success")
+            self._notify_agent_completion(agent_id, "completed" if status == "success" else "failed")
             
             return {
                 "agent_id": agent_id,
                 "response": response["response"],
                 "confidence": response["confidence"],
-                "status": "success"
+                "source": response.get("source", "claude"),
+                "status": status
             }
         except Exception as e:
             # Notify UI about failure
@@ -149,27 +901,30 @@ class OrchestratorAgent:
             # Get available agent IDs
             available_agents = list(self.agents.keys())
             
-            # Use Claude to analyze which agents would be appropriate for this query
-            system_prompt = """You are an NVIDIA product advisor.
+            # Use Claude to analyze which agents would be appropriate for this query.
+            # Everything except the query is static, so it is sent as a cacheable system prefix.
+            system_prompt = cacheable_system_prompt(f"""You are an NVIDIA product advisor.
 Your job is to determine which specialized NVIDIA product domain agents should be consulted to answer a query.
-Select only the agents that are directly relevant to the query."""
-            
-            prompt = f"""Here is a user query about NVIDIA products:
-"{query}"
+Select only the agents that are directly relevant to the query.
 
 Available product domain agents:
 {', '.join(available_agents)}
 
-Task: Select 1-3 most relevant product domain agents to answer this query.
-Return a JSON object with a 'selected_domains' key containing an array of domain names.
+Task: Select 1-3 most relevant product domain agents to answer the user's query.
+Return a JSON object with a 'selected_domains' key containing an array of domain names.""")
+            
+            prompt = f"""Here is a user query about NVIDIA products:
+"{query}"
 """
             
-            response_text = await self.claude_client.get_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.2,
-                max_tokens=1024
-            )
+            with usage_stage("select"):
+                response_text = await self.claude_client.get_completion(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.2,
+                    max_tokens=256,
+                    model=self.stage_models["select"]
+                )
             
             # Extract the JSON response
             try:
@@ -228,32 +983,34 @@ Return a JSON object with a 'selected_domains' key containing an array of domain
                 responses_text += resp["response"] + "\n\n"
                 
             # Use Claude to assess if information is sufficient
-            system_prompt = """You are an NVIDIA product information specialist.
+            system_prompt = cacheable_system_prompt("""You are an NVIDIA product information specialist.
 Your task is to assess if the provided information is sufficient to answer a user's query.
-Be critical and identify specific missing information that would be needed to provide a complete answer."""
-
-            prompt = f"""User query about NVIDIA products: "{query}"
-
-Information gathered from NVIDIA product domain agents:
-{responses_text}
+Be critical and identify specific missing information that would be needed to provide a complete answer.
 
-Task: Assess if this information is sufficient to answer the user's query.
+Task: Assess if the information gathered from NVIDIA product domain agents is sufficient to answer the user's query.
 Return a JSON object with the following format:
-{{
+{
   "is_sufficient": true/false,
   "missing_information": "Description of what information is missing (if any)"
-}}
+}
 
 Only return false if critical information needed to answer the query is missing.
-If the information is sufficient, even if not comprehensive, return true.
+If the information is sufficient, even if not comprehensive, return true.""")
+
+            prompt = f"""User query about NVIDIA products: "{query}"
+
+Information gathered from NVIDIA product domain agents:
+{responses_text}
 """
 
-            assessment_text = await self.claude_client.get_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.3,
-                max_tokens=800
-            )
+            with usage_stage("assess"):
+                assessment_text = await self.claude_client.get_completion(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.3,
+                    max_tokens=800,
+                    model=self.stage_models["assess"]
+                )
             
             # Extract the JSON response
             try:
@@ -307,8 +1064,12 @@ If the information is sufficient, even if not comprehensive, return true.
                 responses_text += resp["response"][:200] + "...\n\n"
                 
             # Use Claude to select additional agents
-            system_prompt = """You are an NVIDIA product advisor.
-Your job is to determine which additional product domain agents should be consulted to fill gaps in information."""
+            system_prompt = cacheable_system_prompt("""You are an NVIDIA product advisor.
+Your job is to determine which additional product domain agents should be consulted to fill gaps in information.
+
+Task: Select up to 2 of the remaining available agents that are most likely to provide the missing information.
+Return a JSON object with a 'selected_domains' key containing an array of domain names.
+If no additional agents would be helpful, return an empty array.""")
             
             prompt = f"""User query about NVIDIA products: "{query}"
 
@@ -319,18 +1080,16 @@ Missing information identified: {missing_info}
 
 Remaining available agents that haven't been consulted:
 {', '.join(remaining_agents)}
-
-Task: Select up to 2 additional agents that are most likely to provide the missing information.
-Return a JSON object with a 'selected_domains' key containing an array of domain names.
-If no additional agents would be helpful, return an empty array.
 """
             
-            response_text = await self.claude_client.get_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.2,
-                max_tokens=1024
-            )
+            with usage_stage("select_additional"):
+                response_text = await self.claude_client.get_completion(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=0.2,
+                    max_tokens=256,
+                    model=self.stage_models["select_additional"]
+                )
             
             # Extract the JSON response
             try:
@@ -372,12 +1131,16 @@ If no additional agents would be helpful, return an empty array.
             str: Combined response
         """
         try:
-            # Filter responses with unsuccessful status
-            valid_responses = [r for r in responses if r["status"] == "success"]
+            # Filter unsuccessful and low-confidence responses
+            valid_responses = self._synthesis_inputs(responses)
             
             if not valid_responses:
                 return "I'm sorry, I couldn't find information to answer your question about NVIDIA products."
                 
+            direct_answer = self._direct_answer(valid_responses)
+            if direct_answer is not None:
+                return direct_answer
+                
             # Format responses for Claude to combine
             responses_text = ""
             for i, resp in enumerate(valid_responses):
@@ -385,27 +1148,42 @@ If no additional agents would be helpful, return an empty array.
                 responses_text += resp["response"] + "\n\n"
                 
             # Use Claude to generate a combined response
-            system_prompt = """You are an NVIDIA product information specialist.
+            system_prompt = cacheable_system_prompt("""You are an NVIDIA product information specialist.
 Use ONLY the information provided to answer the query.
 Do NOT add any information beyond what's provided in the agent responses.
-Be honest about limitations if the provided information is insufficient."""
+Be honest about limitations if the provided information is insufficient.
+
+Task: Combine the information from the product domain agents into a single, coherent answer that directly addresses the user's query.
+Only use the information given - do not make up additional specifications or details.
+If the information provided doesn't fully answer the query, be upfront about these limitations.""")
 
             prompt = f"""User query about NVIDIA products: "{query}"
 
 Information from various product domain agents:
 {responses_text}
-
-Task: Combine this information into a single, coherent answer that directly addresses the user's query.
-Only use the information given - do not make up additional specifications or details.
-If the information provided doesn't fully answer the query, be upfront about these limitations.
 """
 
-            combined_response = await self.claude_client.get_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.3,
-                max_tokens=800
-            )
+            # Stream the synthesis so the UI can render the answer as it is generated
+            chunks = []
+            completed = False
+            try:
+                with usage_stage("combine"):
+                    async for text in self.claude_client.stream_completion(
+                        prompt=prompt,
+                        system_prompt=system_prompt,
+                        temperature=0.3,
+                        max_tokens=800,
+                        model=self.stage_models["combine"]
+                    ):
+                        chunks.append(text)
+                        self._notify_response_delta(text)
+                completed = True
+            finally:
+                # A stream cut short by an error or the stage timeout is replaced by a fallback
+                if chunks and not completed:
+                    self._notify_response_reset()
+            
+            combined_response = "".join(chunks)
             
             return combined_response
             
@@ -413,12 +1191,111 @@ If the information provided doesn't fully answer the query, be upfront about the
             print(f"Error in combining responses with Claude: {e}")
             
             # Fall back to concatenating responses
-            responses_text = "Here's what I know about NVIDIA products related to your query:\n\n"
+            return self._concatenate_responses(responses)
+    
+    async def _combine_and_assess_with_claude(self, query: str, responses: List[Dict]) -> tuple:
+        """
+        Combine agent responses and assess their sufficiency in a single Claude call.
+        
+        The answer is streamed to the UI as it is generated; the verdict that
+        follows ASSESSMENT_MARKER is held back and parsed.
+        
+        Args:
+            query: The original query
+            responses: List of agent responses
+            
+        Returns:
+            tuple: (combined_response, is_sufficient, missing_information)
+        """
+        try:
+            # Filter unsuccessful and low-confidence responses
+            valid_responses = self._synthesis_inputs(responses)
             
+            if not valid_responses:
+                return ("I'm sorry, I couldn't find information to answer your question about NVIDIA products.",
+                        False, "No valid agent responses received")
+                
+            direct_answer = self._direct_answer(valid_responses)
+            if direct_answer is not None:
+                return direct_answer, True, ""
+                
+            # Format responses for Claude to combine
+            responses_text = ""
             for resp in valid_responses:
-                responses_text += f"From {resp['agent_id']}:\n{resp['response']}\n\n"
+                responses_text += f"\n--- Information from {resp['agent_id']} ---\n"
+                responses_text += resp["response"] + "\n\n"
                 
-            return responses_text
+            system_prompt = cacheable_system_prompt(f"""You are an NVIDIA product information specialist.
+Use ONLY the information provided to answer the query.
+Do NOT add any information beyond what's provided in the agent responses.
+Be honest about limitations if the provided information is insufficient.
+
+Task: Combine the information from the product domain agents into a single, coherent answer that directly addresses the user's query.
+Only use the information given - do not make up additional specifications or details.
+
+After the answer, write {ASSESSMENT_MARKER} on its own line followed by a JSON object assessing whether the information was sufficient:
+{{
+  "is_sufficient": true/false,
+  "missing_information": "Description of what information is missing (if any)"
+}}
+
+Only return false if critical information needed to answer the query is missing.
+If the information is sufficient, even if not comprehensive, return true.""")
+
+            prompt = f"""User query about NVIDIA products: "{query}"
+
+Information from various product domain agents:
+{responses_text}
+"""
+
+            # Stream the answer, holding back text that could be the start of the marker
+            output = ""
+            emitted = 0
+            completed = False
+            try:
+                with usage_stage("combine"):
+                    async for text in self.claude_client.stream_completion(
+                        prompt=prompt,
+                        system_prompt=system_prompt,
+                        temperature=0.3,
+                        max_tokens=900,
+                        model=self.stage_models["combine"]
+                    ):
+                        output += text
+                        marker_at = output.find(ASSESSMENT_MARKER)
+                        safe_end = marker_at if marker_at != -1 else max(emitted, len(output) - len(ASSESSMENT_MARKER) + 1)
+                        if safe_end > emitted:
+                            self._notify_response_delta(output[emitted:safe_end])
+                            emitted = safe_end
+                completed = True
+            finally:
+                # A stream cut short by an error or the stage timeout is replaced by a fallback
+                if emitted and not completed:
+                    self._notify_response_reset()
+                        
+            answer, _, verdict = output.partition(ASSESSMENT_MARKER)
+            if not verdict:
+                # No verdict: keep the answer and treat it as sufficient
+                if len(output) > emitted:
+                    self._notify_response_delta(output[emitted:])
+                return output.strip(), True, ""
+                
+            is_sufficient, missing_info = True, ""
+            try:
+                json_start = verdict.find('{')
+                json_end = verdict.rfind('}')
+                if json_start != -1 and json_end != -1:
+                    assessment = json.loads(verdict[json_start:json_end+1])
+                    is_sufficient = bool(assessment.get("is_sufficient", True))
+                    missing_info = assessment.get("missing_information", "")
+            except json.JSONDecodeError:
+                pass
+                
+            return answer.strip(), is_sufficient, missing_info
+            
+        except Exception as e:
+            print(f"Error in fused synthesis with Claude: {e}")
+            return self._concatenate_responses(responses), True, ""
     
     def _notify_agent_invocation(self, agent_id: str):
         """Notify UI about agent invocation"""
@@ -439,6 +1316,21 @@ If the information provided doesn't fully answer the query, be upfront about the
             "timestamp": datetime.datetime.now().isoformat()
         })
     
+    def _notify_response_delta(self, text: str):
+        """Notify UI about a newly generated piece of the final response"""
+        self.ui_notifier.notify({
+            "type": "response_delta",
+            "delta": text,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+    
+    def _notify_response_reset(self):
+        """Notify UI that the streamed response will be regenerated from scratch"""
+        self.ui_notifier.notify({
+            "type": "response_reset",
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+    
     def _notify_orchestrator_thinking(self, message: str):
         """Notify UI about orchestrator's thinking process"""
         self.ui_notifier.notify({
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+# Timeouts are a number of seconds, or a function returning one (or None) when the node starts
+Timeout = Union[float, Callable[[], Optional[float]], None]
+
+
+class StageNode:
+    """
+    One stage of a pipeline graph.
+
+    A node runs once every node it depends on has finished. Its coroutine
+    receives the shared context dict, in which the query and the result of
+    every finished node (by node name) are stored.
+    """
+
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Iterable[str] = (), timeout: Timeout = None, retries: int = 0,
+                 fallback: Any = None, when: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        """
+        Declare a stage.
+
+        Args:
+            name: Unique node name, also the context key of its result
+            run: Coroutine function taking the context and returning the node's result
+            depends_on: Names of the nodes that must finish first
+            timeout: Seconds the node may run, or a function computing them at start;
+                     None means no limit and a value <= 0 skips the node
+            retries: Extra attempts after the node raises an exception
+            fallback: Result used when the node is skipped, times out or fails; a
+                      callable is called with the context to compute it
+            when: Predicate on the context; the node is skipped when it returns False
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.timeout = timeout
+        self.retries = retries
+        self.fallback = fallback
+        self.when = when
+
+    def fallback_result(self, context: Dict[str, Any]) -> Any:
+        """Return the fallback result for the given context"""
+        return self.fallback(context) if callable(self.fallback) else self.fallback
+
+    def resolve_timeout(self) -> Optional[float]:
+        """Return the node's timeout as of now"""
+        return self.timeout() if callable(self.timeout) else self.timeout
+
+
+class StageGraph:
+    """
+    Directed acyclic graph of pipeline stages, run as a dataflow.
+
+    Every node starts as soon as its dependencies have finished, so
+    independent stages run concurrently. Nodes never fail the graph: a node
+    that is skipped, times out or raises after its retries yields its
+    fallback, and the graph carries on.
+
+    Each run reports to an optional observer, called as
+    observer(event, node_name, info) with event one of 'start', 'finish',
+    'skip' (predicate false), 'no_time' (timeout <= 0), 'timeout', 'retry'
+    and 'error'.
+    """
+
+    def __init__(self, name: str, nodes: List[StageNode]):
+        """
+        Build and validate a graph.
+
+        Args:
+            name: Graph name, for reporting
+            nodes: The stages; dependencies must name other nodes and form no cycle
+
+        Raises:
+            ValueError: If node names repeat, a dependency is unknown or there is a cycle
+        """
+        self.name = name
+        self.nodes: Dict[str, StageNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate stage '{node.name}' in pipeline '{name}'")
+            self.nodes[node.name] = node
+        for node in nodes:
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Stage '{node.name}' depends on unknown stage '{dependency}'")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Node names with every node after its dependencies"""
+        order = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Pipeline '{self.name}' has a cycle through stage '{name}'")
+            state[name] = 1
+            for dependency in self.nodes[name].depends_on:
+                visit(dependency)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    async def run(self, context: Dict[str, Any],
+                  observer: Optional[Callable[[str, str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run every node of the graph.
+
+        Args:
+            context: Inputs of the run; node results are added to it by name
+            observer: Optional instrumentation hook, see the class docstring
+
+        Returns:
+            dict: Trace of the run: node name to 'status' ('ok', 'skipped', 'no_time',
+                  'timeout' or 'error'), 'attempts', 'started_ms' and 'elapsed_ms'
+                  (relative to the start of the run)
+        """
+        notify = observer or (lambda event, name, info: None)
+        started_at = time.monotonic()
+        trace: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_node(node: StageNode):
+            if node.depends_on:
+                await asyncio.gather(*(tasks[dependency] for dependency in node.depends_on))
+            start = time.monotonic()
+            entry = trace[node.name] = {"status": "ok", "attempts": 0,
+                                        "started_ms": round((start - started_at) * 1000, 1)}
+            try:
+                if node.when is not None and not node.when(context):
+                    entry["status"] = "skipped"
+                    notify("skip", node.name, entry)
+                    context[node.name] = node.fallback_result(context)
+                    return
+                timeout = node.resolve_timeout()
+                if timeout is not None and timeout <= 0:
+                    entry["status"] = "no_time"
+                    notify("no_time", node.name, entry)
+                    context[node.name] = node.fallback_result(context)
+                    return
+                notify("start", node.name, entry)
+                context[node.name] = await self._attempt(node, context, timeout, entry, notify)
+            finally:
+                entry["elapsed_ms"] = round((time.monotonic() - start) * 1000, 1)
+            notify("finish", node.name, entry)
+
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(run_node(self.nodes[name]))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return trace
+
+    async def _attempt(self, node: StageNode, context: Dict[str, Any], timeout: Optional[float],
+                       entry: Dict[str, Any], notify) -> Any:
+        """Run a node with its timeout and retries, returning its result or fallback"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            entry["attempts"] += 1
+            try:
+                if deadline is None:
+                    return await node.run(context)
+                return await asyncio.wait_for(node.run(context), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                entry["status"] = "timeout"
+                notify("timeout", node.name, entry)
+                return node.fallback_result(context)
+            except Exception as e:
+                if entry["attempts"] <= node.retries and (deadline is None or time.monotonic() < deadline):
+                    notify("retry", node.name, dict(entry, error=str(e)))
+                    continue
+                entry["status"] = "error"
+                entry["error"] = str(e)
+                notify("error", node.name, entry)
+                return node.fallback_result(context)
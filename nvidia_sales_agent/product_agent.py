@@ -1,23 +1,80 @@
 import os
-from .claude_helper import ClaudeClient
-from typing import Dict, Any
+import re
+from .claude_helper import ClaudeClient, cacheable_system_prompt
+from .router import tokenize
+from .knowledge import DOMAIN_KNOWLEDGE
+from .retrieval import format_sections, get_section_index
+from .specs import SpecTable, get_shared_spec_table
+from typing import Dict, Any, Optional
+
+# Phrases with which an answer admits it lacks the information asked for
+HEDGE_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?:do not|don't|does not|doesn't) (?:have|include|contain|mention|specify|provide)"
+    r"|(?:no|limited|insufficient) (?:specific |detailed |further )?(?:information|details|data)"
+    r"|not (?:mentioned|provided|specified|included|available|covered)"
+    r"|(?:cannot|can't|unable to|not able to) (?:provide|answer|say|confirm|determine|compare)"
+    r"|beyond (?:the|my) (?:information|knowledge)"
+    r"|i apologize|unfortunately|i'm not sure|i am not sure"
+    r")\b",
+    re.IGNORECASE)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+# Weight of knowledge base coverage in the confidence score; the rest is the absence of hedging
+COVERAGE_WEIGHT = 0.5
+
+
+def hedge_fraction(text: str) -> float:
+    """
+    Fraction of the sentences of an answer that hedge or refuse.
+    
+    Args:
+        text: Generated answer
+        
+    Returns:
+        float: 0.0 for a plain answer, 1.0 when every sentence hedges
+    """
+    sentences = [sentence for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+    if not sentences:
+        return 1.0
+    return sum(1 for sentence in sentences if HEDGE_PATTERN.search(sentence)) / len(sentences)
 
 class ProductCatalogAgent:
     """
     Agent specialized in a specific NVIDIA product domain that answers queries
-    with just a brief description of the product line.
+    from a brief description of the product line and the knowledge base
+    sections most relevant to each query.
     """
     
-    def __init__(self, agent_id: str, claude_client=None):
+    def __init__(self, agent_id: str, knowledge_base: Optional[str] = None, claude_client=None,
+                 model: Optional[str] = None, top_k_sections: int = 3, section_token_budget: int = 1200,
+                 spec_lookup: bool = True):
         """
         Initialize a ProductCatalogAgent for a specific product domain.
         
         Args:
             agent_id: Unique identifier representing the product domain
+            knowledge_base: Knowledge base text (defaults to the domain's entry in DOMAIN_KNOWLEDGE)
             claude_client: Optional Claude client for API calls
+            model: Optional model for this agent (the orchestrator assigns its agent tier if unset)
+            top_k_sections: Maximum knowledge base sections added to a prompt
+            section_token_budget: Maximum estimated tokens of those sections
+            spec_lookup: Answer direct spec questions from the spec table without Claude
         """
         self.agent_id = agent_id
+        self.knowledge_base = knowledge_base if knowledge_base is not None else DOMAIN_KNOWLEDGE.get(agent_id, "")
         self.claude_client = claude_client or ClaudeClient()
+        self.model = model
+        self.top_k_sections = top_k_sections
+        self.section_token_budget = section_token_budget
+        self.spec_lookup = spec_lookup
+        # The shared table covers the bundled knowledge; custom knowledge gets its own
+        if self.knowledge_base == DOMAIN_KNOWLEDGE.get(agent_id):
+            self.spec_table = get_shared_spec_table()
+        else:
+            self.spec_table = SpecTable({agent_id: self.knowledge_base})
+        self._vocabulary = None
         
     async def process_query(self, query: str) -> Dict[str, Any]:
         """
@@ -27,55 +84,129 @@ class ProductCatalogAgent:
             query: The user's query string
             
         Returns:
-            dict: A dictionary containing the response
+            dict: A dictionary containing the response, its confidence (0-1), the
+                  'confidence_signals' the confidence was computed from, its
+                  'source' ('spec_table' or 'claude') and its 'status' ('success',
+                  or 'error' with confidence 0 when generation failed)
         """
+        # Direct spec questions are answered from the parsed spec table
+        if self.spec_lookup:
+            answer = self.spec_table.lookup(query, domain=self.agent_id)
+            if answer is not None:
+                return {
+                    "agent_id": self.agent_id,
+                    "response": answer,
+                    "confidence": 1.0,
+                    "confidence_signals": {"coverage": 1.0, "hedging": 0.0},
+                    "source": "spec_table",
+                    "status": "success"
+                }
+                
         # Generate response with Claude using simple product knowledge
-        response = await self._generate_response_with_claude(query)
+        try:
+            response = await self._generate_response_with_claude(query)
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return {
+                "agent_id": self.agent_id,
+                "response": f"I apologize, I encountered an error while trying to provide information about {self.agent_id}.",
+                "confidence": 0.0,
+                "confidence_signals": {},
+                "source": "claude",
+                "status": "error"
+            }
         
-        # All agents have equal confidence
-        confidence = 0.5
+        signals = {
+            "coverage": self._knowledge_coverage(query),
+            "hedging": hedge_fraction(response),
+        }
+        confidence = COVERAGE_WEIGHT * signals["coverage"] + (1 - COVERAGE_WEIGHT) * (1 - signals["hedging"])
         
         return {
             "agent_id": self.agent_id,
             "response": response,
-            "confidence": confidence
+            "confidence": round(confidence, 3),
+            "confidence_signals": signals,
+            "source": "claude",
+            "status": "success"
         }
+        
+    def _knowledge_coverage(self, query: str) -> float:
+        """
+        Fraction of the query's terms that occur in this agent's knowledge.
+        
+        Args:
+            query: The user's query
+            
+        Returns:
+            float: Coverage between 0 and 1 (1 for queries without content terms)
+        """
+        if self._vocabulary is None:
+            knowledge = self._get_domain_system_prompt() + "\n" + self.knowledge_base
+            self._vocabulary = set(tokenize(knowledge))
+        terms = set(tokenize(query))
+        if not terms:
+            return 1.0
+        return round(len(terms & self._vocabulary) / len(terms), 3)
     
     async def _generate_response_with_claude(self, query: str) -> str:
         """
-        Generate a response to the query using Claude with minimal product information.
+        Generate a response to the query using Claude with the relevant product information.
         
         Args:
             query: The user's query
             
         Returns:
             str: The generated response
-        """
-        try:
-            # Create simple domain-specific system prompt
-            system_prompt = self._get_domain_system_prompt()
             
-            # Build the user prompt
-            prompt = f"""User query: "{query}"
-
-Please use ONLY the information in your system prompt about NVIDIA {self.agent_id} to answer this query.
+        Raises:
+            Exception: If the Claude call fails
+        """
+        # Create simple domain-specific system prompt; it never changes, so mark it cacheable
+        system_prompt = cacheable_system_prompt(self._get_domain_system_prompt())
+        
+        # Build the user prompt with the knowledge base sections relevant to this query;
+        # they go here rather than in the system prompt so that prompt stays cacheable
+        reference = self._retrieve_sections(query)
+        prompt = f"""User query: "{query}"
+"""
+        if reference:
+            prompt += f"""
+Product information:
+{reference}
+"""
+        prompt += f"""
+Please use ONLY this product information and the information in your system prompt about NVIDIA {self.agent_id} to answer this query.
 Do not make up any specifications or details that weren't provided to you. 
 If you don't have enough information to answer fully, be honest about your limitations."""
 
-            # Get Claude's response
-            response = await self.claude_client.get_completion(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=0.3,
-                max_tokens=600
-            )
-            
-            return response
-            
-        except Exception as e:
-            print(f"Error generating response: {e}")
-            return f"I apologize, I encountered an error while trying to provide information about {self.agent_id}."
+        # Get Claude's response
+        response = await self.claude_client.get_completion(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=0.3,
+            max_tokens=600,
+            model=self.model
+        )
+        
+        return response
     
+    def _retrieve_sections(self, query: str) -> Optional[str]:
+        """
+        Knowledge base sections relevant to a query, within the section token budget.
+        
+        Args:
+            query: The user's query
+            
+        Returns:
+            str: The sections as prompt text, or None if none match
+        """
+        if not self.knowledge_base:
+            return None
+        sections = get_section_index(self.knowledge_base).retrieve(
+            query, self.top_k_sections, self.section_token_budget)
+        return format_sections(sections)
+        
     def _get_domain_system_prompt(self) -> str:
         """
         Return a simple domain-specific system prompt with just a few sentences.
@@ -84,7 +215,7 @@ If you don't have enough information to answer fully, be honest about your limit
             str: The domain-specific system prompt
         """
         # Base system prompt template with minimal instruction
-        system_prompt = f"""You are answering questions about NVIDIA {self.agent_id}. You only know the following few sentences about this product domain:
+        system_prompt = f"""You are answering questions about NVIDIA {self.agent_id}. Apart from the product information given with a query, you only know the following few sentences about this product domain:
 
 """
 
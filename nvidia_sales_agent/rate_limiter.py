@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    reserve() deducts immediately and may drive the balance negative; the
+    returned wait is how long until the reservation is covered. Callers are
+    therefore served in the order they reserved, without polling.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum burst size (defaults to one minute's worth)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            amount: Tokens needed (clamped to the bucket capacity)
+
+        Returns:
+            float: Seconds to wait before the reservation is honoured
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """
+        Return unused tokens, e.g. when a request used fewer than estimated.
+
+        Args:
+            amount: Tokens to give back
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def _refill(self):
+        """Add tokens for the time elapsed since the last update (lock held)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class ConcurrencyGate:
+    """
+    FIFO semaphore that can be shared by coroutines on different event loops.
+
+    The web UI and CLI may run sessions on separate loops, so asyncio.Semaphore
+    (which is bound to one loop) cannot be used for a process-wide limit.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize the gate.
+
+        Args:
+            limit: Maximum number of concurrent holders
+        """
+        self.limit = limit
+        self.active = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Wait until a slot is free and take it"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # The slot was handed over just before we were cancelled; give it back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Free a slot, handing it directly to the next waiter if there is one"""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # The waiter's loop has been closed
+                    continue
+            self.active -= 1
+
+    def _grant(self, future: asyncio.Future):
+        """Complete a waiter's future on its own loop"""
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(True)
+
+    @property
+    def waiting(self) -> int:
+        """Number of callers queued for a slot"""
+        with self._lock:
+            return len(self._waiters)
+
+
+class RateLimitPermit:
+    """
+    Permission to make one LLM call, returned by LLMRateLimiter.acquire().
+
+    Use as an async context manager; set actual_tokens before leaving it so
+    unused token reservations are refunded.
+    """
+
+    def __init__(self, limiter: "LLMRateLimiter", estimated_tokens: float):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens = None
+        self.queue_wait = 0.0
+
+    async def __aenter__(self):
+        self.queue_wait = await self.limiter._acquire(self.estimated_tokens)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter._release(self.estimated_tokens, self.actual_tokens)
+
+
+class LLMRateLimiter:
+    """
+    Process-wide governor for Claude API calls.
+
+    Combines a requests-per-minute bucket, a tokens-per-minute bucket and a
+    maximum number of in-flight requests. Queuing locally is much cheaper than
+    being rejected with 429 by the API.
+    """
+
+    def __init__(self, requests_per_minute: float = 50, tokens_per_minute: float = 80000,
+                 max_concurrency: int = 8):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Sustained request rate
+            tokens_per_minute: Sustained input + output token rate
+            max_concurrency: Maximum in-flight requests
+        """
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.gate = ConcurrencyGate(max_concurrency)
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "queued_calls": 0,
+            "total_queue_wait": 0.0,
+            "max_queue_wait": 0.0,
+        }
+
+    def acquire(self, estimated_tokens: float) -> RateLimitPermit:
+        """
+        Return a permit for one call; entering it waits for capacity.
+
+        Args:
+            estimated_tokens: Expected input + output tokens for the call
+
+        Returns:
+            RateLimitPermit: Async context manager holding the slot
+        """
+        return RateLimitPermit(self, estimated_tokens)
+
+    async def _acquire(self, estimated_tokens: float) -> float:
+        """Wait for rate and concurrency capacity; returns the queue wait in seconds"""
+        start = time.monotonic()
+        wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimated_tokens))
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self.gate.acquire()
+        except asyncio.CancelledError:
+            self.request_bucket.refund(1)
+            self.token_bucket.refund(estimated_tokens)
+            raise
+
+        queue_wait = time.monotonic() - start
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["total_queue_wait"] += queue_wait
+            self._counters["max_queue_wait"] = max(self._counters["max_queue_wait"], queue_wait)
+            if queue_wait > 0.001:
+                self._counters["queued_calls"] += 1
+        return queue_wait
+
+    def _release(self, estimated_tokens: float, actual_tokens: Optional[float]):
+        """Free the concurrency slot and refund over-estimated tokens"""
+        self.gate.release()
+        if actual_tokens is not None and actual_tokens < estimated_tokens:
+            self.token_bucket.refund(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return queueing statistics.
+
+        Returns:
+            dict: Call counts, queue wait totals and current occupancy
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats["in_flight"] = self.gate.active
+        stats["waiting"] = self.gate.waiting
+        stats["mean_queue_wait"] = stats["total_queue_wait"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+def estimate_tokens(text: Any) -> int:
+    """
+    Roughly estimate the token count of a prompt (about four characters per token).
+
+    Args:
+        text: Prompt text, or any JSON-like structure of text blocks
+
+    Returns:
+        int: Estimated token count
+    """
+    return len(str(text)) // 4 + 1
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> LLMRateLimiter:
+    """
+    Return the process-wide rate limiter, creating it with default limits if needed.
+
+    Returns:
+        LLMRateLimiter: The shared limiter
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = LLMRateLimiter()
+        return _shared_limiter
+
+
+def configure_shared_rate_limiter(**config) -> LLMRateLimiter:
+    """
+    Replace the process-wide rate limiter with one using the given limits.
+
+    Call this once at startup, before any ClaudeClient is created.
+
+    Args:
+        **config: LLMRateLimiter constructor arguments
+
+    Returns:
+        LLMRateLimiter: The new shared limiter
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        _shared_limiter = LLMRateLimiter(**config)
+        return _shared_limiter
@@ -0,0 +1,239 @@
+import re
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .compare import ComparisonEngine
+
+# Use cases: (name, pattern detecting it, domains to recommend from, weights of the
+# normalized columns ranking the candidates). Earlier entries win, so patterns only
+# take explicit terms: "GPU models for gaming" is a gaming question.
+USE_CASES = [
+    ("data center", re.compile(r"\b(?:data ?cent(?:er|re)s?|servers?|clusters?|hyperscale\w*)\b"),
+     ("NVIDIA Data Center Solutions",), {"memory_gb": 1.0, "memory_bandwidth_gbs": 0.5}),
+    ("machine learning", re.compile(
+        r"\b(?:machine learning|ml|deep learning|ai (?:training|inference|workloads?|models?|development)|for ai\b|"
+        r"train(?:ing)?(?: models?)?|inference|llms?|(?:language|ai|ml) models?|neural net\w*|pytorch|tensorflow)\b"),
+     ("GeForce Gaming GPUs", "RTX Professional GPUs", "NVIDIA Data Center Solutions"),
+     {"memory_gb": 1.0, "cuda_cores": 0.5}),
+    ("professional", re.compile(
+        r"\b(?:workstations?|professional|cad|render\w*|3d|design|content creation|creators?|video editing)\b"),
+     ("RTX Professional GPUs", "GeForce Gaming GPUs"), {"cuda_cores": 1.0, "memory_gb": 1.0}),
+    ("gaming", re.compile(r"\b(?:gaming|games?|gamers?|esports|1080p|1440p|4k|fps)\b"),
+     ("GeForce Gaming GPUs",), {"fp32_tflops": 1.0, "memory_gb": 0.25}),
+]
+
+# Constraints a query may state: (column, bound, label, pattern capturing the number and
+# an optional 'k' multiplier). 'max' bounds the column from above, 'min' from below.
+CONSTRAINTS = [
+    ("launch_price_usd", "max", "budget",
+     re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k)?\b|\b(\d[\d,]*(?:\.\d+)?)\s*(k)?\s*(?:dollars|usd)\b")),
+    ("psu_w", "max", "power supply",
+     re.compile(r"\b(\d{3,4})\s*w(?:atts?)?\s*(?:psu|power supply)|\b(?:psu|power supply)\D{0,20}?(\d{3,4})\s*w")),
+    ("tdp_w", "max", "power draw",
+     re.compile(r"\b(?:under|below|less than|at most|max(?:imum)?|no more than|up to|<=?)\s*(\d{2,4})\s*w(?:atts?)?\b"
+                r"(?!\s*(?:psu|power supply))")),
+    ("memory_gb", "min", "memory",
+     re.compile(r"\b(?:at least|min(?:imum)?|more than|over|>=?)\s*(\d{1,3})\s*gb\b|\b(\d{1,3})\s*gb\+?\s*(?:of\s+)?"
+                r"(?:vram|memory|gpu memory)\b")),
+]
+
+# Questions asking for a recommendation
+RECOMMENDATION = re.compile(
+    r"\b(?:best|recommend\w*|suggest\w*|should i (?:buy|get|choose|pick)|which (?:gpu|card|graphics card)|"
+    r"what (?:gpu|card|graphics card)|good (?:gpu|card|graphics card)|ideal)\b")
+
+# Queries explicitly about GPUs, as opposed to "best networking" or "best cloud gaming service"
+GPU_QUERY = re.compile(r"\b(?:gpus?|graphics cards?|video cards?|cards?)\b")
+
+# Columns shown for every shortlisted product, besides the ranking and constrained ones
+SHORTLIST_COLUMNS = ["memory_gb", "tdp_w", "launch_price_usd"]
+
+
+class Recommender:
+    """
+    Constraint solver over the spec table for "best GPU for X" questions.
+
+    Constraints stated in the query (budget, power draw, PSU, memory) are hard
+    bounds; the use case picks the candidate domains and the weights ranking
+    what remains. A constraint is binding when relaxing it alone would change
+    the top recommendation.
+    """
+
+    def __init__(self, engine: ComparisonEngine, top_k: int = 3):
+        """
+        Initialize the recommender.
+
+        Args:
+            engine: Comparison engine providing the product columns
+            top_k: Length of the shortlist
+        """
+        self.engine = engine
+        self.top_k = top_k
+        # Rows each row's name matches, to spot a product listed under two domains
+        # ("L40/L40S" and "NVIDIA L40S")
+        table = engine.table
+        self._named = [set(table.rows_for(name)) for name in table.names]
+
+    def use_case(self, query: str) -> Optional[tuple]:
+        """
+        Detect the use case of a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            tuple: The USE_CASES entry, or None if no use case is named
+        """
+        text = query.lower()
+        for use_case in USE_CASES:
+            if use_case[1].search(text):
+                return use_case
+        return None
+
+    def constraints(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Extract the hard constraints stated in a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Constraints as dicts with 'column', 'bound' ('min' or 'max'), 'value' and 'label'
+        """
+        text = query.lower()
+        constraints = []
+        for column, bound, label, pattern in CONSTRAINTS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            groups = [group for group in match.groups()]
+            number = next(group for group in groups if group and group != "k")
+            value = float(number.replace(",", ""))
+            if "k" in groups:
+                value *= 1000
+            constraints.append({"column": column, "bound": bound, "value": value, "label": label})
+        return constraints
+
+    def _feasible(self, rows: np.ndarray, constraints: List[Dict[str, Any]]) -> np.ndarray:
+        """The rows meeting every constraint"""
+        bounds = {}
+        for constraint in constraints:
+            low, high = bounds.get(constraint["column"], (None, None))
+            if constraint["bound"] == "min":
+                low = constraint["value"]
+            else:
+                high = constraint["value"]
+            bounds[constraint["column"]] = (low, high)
+        return self.engine.filter(rows, bounds)
+
+    def _ranked(self, rows: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+        """The rows best first by weighted normalized score"""
+        if len(rows) == 0:
+            return rows
+        return rows[np.argsort(-self.engine.score(rows, weights), kind="stable")]
+
+    def candidates(self, domains) -> np.ndarray:
+        """
+        Rows of single-GPU products in the given domains.
+
+        Args:
+            domains: Domains to recommend from
+
+        Returns:
+            np.ndarray: Row indexes; multi-GPU systems (a 'gpus' count) and repeats of
+                        a product already listed under an earlier domain are left out
+        """
+        table = self.engine.table
+        rows = self.engine.eligible
+        in_domains = np.isin(np.array(table.domains, dtype=object)[rows], list(domains))
+        single_gpu = np.isnan(self.engine.values["gpus"][rows])
+        rows = rows[in_domains & single_gpu]
+        # Either name may be the one covering the other's aliases, so match both ways
+        return np.array([row for i, row in enumerate(rows)
+                         if not any(row in self._named[other] or other in self._named[row] for other in rows[:i])],
+                        dtype=np.intp)
+
+    def recommend(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Solve a recommendation question over the catalog.
+
+        Args:
+            query: The user query
+
+        Returns:
+            dict: 'use_case', 'constraints', 'shortlist' (rows, best first), 'binding'
+                  (constraints whose relaxation would change the top pick, each with the
+                  'relaxed_pick' it would give way to), 'conflicts' (when nothing is feasible,
+                  the constraints that each rule out every candidate), 'candidates' and
+                  'table'; or None if the query is not a recommendation question with a
+                  use case or a constraint
+        """
+        if not RECOMMENDATION.search(query.lower()):
+            return None
+        use_case = self.use_case(query)
+        constraints = self.constraints(query)
+        if use_case is None and not constraints:
+            return None
+        name, _, domains, weights = use_case or ("general", None, self.engine.domains, {"cuda_cores": 1.0,
+                                                                                      "memory_gb": 1.0})
+        candidates = self.candidates(domains)
+        if len(candidates) == 0:
+            return None
+
+        shortlist = self._ranked(self._feasible(candidates, constraints), weights)[:self.top_k]
+        binding = []
+        conflicts = []
+        for constraint in constraints:
+            others = [c for c in constraints if c is not constraint]
+            relaxed = self._ranked(self._feasible(candidates, others), weights)
+            if len(shortlist) and len(relaxed) and relaxed[0] != shortlist[0]:
+                binding.append(dict(constraint, relaxed_pick=self.engine.table.names[relaxed[0]]))
+            if not len(shortlist) and len(self._feasible(candidates, [constraint])) == 0:
+                conflicts.append(constraint)
+
+        columns = list(dict.fromkeys(list(weights) + [c["column"] for c in constraints] + SHORTLIST_COLUMNS))
+        result = {
+            "use_case": name,
+            "constraints": constraints,
+            "shortlist": shortlist.tolist(),
+            "binding": binding,
+            "conflicts": conflicts,
+            "candidates": len(candidates),
+            "columns": columns,
+        }
+        result["table"] = self.format(result)
+        return result
+
+    def format(self, result: Dict[str, Any]) -> str:
+        """
+        Render a recommendation as a compact block for synthesis.
+
+        Args:
+            result: Result of recommend (without 'table')
+
+        Returns:
+            str: Use case, constraints, binding constraints and the shortlist table
+        """
+        lines = [f"Use case: {result['use_case']}"]
+        if result["constraints"]:
+            lines.append("Constraints: " + "; ".join(_describe(c) for c in result["constraints"]))
+        for constraint in result["binding"]:
+            lines.append(f"Binding: {_describe(constraint)}; without it the pick would be {constraint['relaxed_pick']}")
+        if not result["shortlist"]:
+            lines.append(f"No product among {result['candidates']} candidates meets every constraint")
+            for constraint in result["conflicts"]:
+                lines.append(f"No candidate meets {_describe(constraint)} on its own")
+            return "\n".join(lines)
+
+        lines.append(f"Shortlist, best first ({len(result['shortlist'])} of {result['candidates']} candidates):")
+        lines.append(self.engine.format_table(np.array(result["shortlist"], dtype=np.intp), result["columns"]))
+        return "\n".join(lines)
+
+
+def _describe(constraint: Dict[str, Any]) -> str:
+    """A constraint in words ("budget at most $800")"""
+    value = constraint["value"]
+    amount = {"launch_price_usd": f"${value:,.0f}", "memory_gb": f"{value:g} GB"}.get(
+        constraint["column"], f"{value:g} W")
+    return f"{constraint['label']} {'at least' if constraint['bound'] == 'min' else 'at most'} {amount}"
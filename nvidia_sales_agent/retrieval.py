@@ -0,0 +1,198 @@
+import functools
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .entities import ProductEntityRecognizer, get_shared_entity_recognizer
+from .knowledge import DOMAIN_KNOWLEDGE
+from .knowledge_index import get_knowledge_index
+from .rate_limiter import estimate_tokens
+from .router import bm25_weights, tokenize, weighted_terms
+
+
+def chunk_sections(knowledge: str) -> List[Dict[str, Any]]:
+    """
+    Split a knowledge base into one chunk per '#' or '##' section.
+
+    Text before the first heading is dropped; deeper headings ('###') stay
+    inside their section.
+
+    Args:
+        knowledge: Knowledge base text
+
+    Returns:
+        list: Chunks as dicts with 'heading', 'parent' (the enclosing '#' heading,
+              or None for top-level sections) and 'text' (heading line included)
+    """
+    chunks = []
+    parent = None
+    current = None
+    for line in knowledge.splitlines():
+        stripped = line.strip()
+        level = len(stripped) - len(stripped.lstrip("#"))
+        if level in (1, 2) and stripped[level:level + 1] == " ":
+            heading = stripped[level:].strip()
+            current = {"heading": heading, "parent": parent if level == 2 else None, "lines": [stripped]}
+            if level == 1:
+                parent = heading
+            chunks.append(current)
+        elif current is not None:
+            current["lines"].append(line.rstrip())
+
+    sections = []
+    for chunk in chunks:
+        text = "\n".join(chunk.pop("lines")).strip()
+        # Skip headings without any content of their own
+        if "\n" in text:
+            chunk["text"] = text
+            sections.append(chunk)
+    return sections
+
+
+class SectionIndex:
+    """
+    BM25 index over the sections of one knowledge base.
+
+    Sections named by a product in the query come first; the rest are ranked
+    by BM25 with their heading weighted up, as in the domain router.
+    """
+
+    def __init__(self, knowledge: str, k1: float = 1.2, b: float = 0.75,
+                 recognizer: Optional[ProductEntityRecognizer] = None, domain: str = ""):
+        """
+        Chunk and index a knowledge base.
+
+        Args:
+            knowledge: Knowledge base text
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            recognizer: Product name matcher covering the knowledge base under
+                        domain; by default one is compiled for it alone
+            domain: Domain of the knowledge base in the recognizer
+        """
+        self.sections = chunk_sections(knowledge)
+        documents = [weighted_terms(section["heading"], section["text"]) for section in self.sections]
+        self.vocabulary, self.weights = bm25_weights(documents, k1, b)
+        self.recognizer = recognizer or ProductEntityRecognizer({domain: knowledge})
+        self.domain = domain
+        self._positions = {section["heading"]: i for i, section in enumerate(self.sections)}
+
+    def to_index(self, writer, name: str):
+        """
+        Store the section index in a knowledge index.
+
+        Args:
+            writer: knowledge_index.IndexWriter
+            name: Prefix of the stored entries
+        """
+        writer.add_json(name, {"sections": self.sections, "vocabulary": list(self.vocabulary)})
+        writer.add_array(f"{name}.weights", self.weights)
+
+    @classmethod
+    def from_index(cls, index, name: str, recognizer: ProductEntityRecognizer, domain: str) -> "SectionIndex":
+        """
+        Load a section index from a knowledge index, scoring on the mapped weights.
+
+        Args:
+            index: knowledge_index.KnowledgeIndex
+            name: Prefix the section index was stored under
+            recognizer: Product name matcher covering the knowledge base under domain
+            domain: Domain of the knowledge base
+
+        Returns:
+            SectionIndex: The section index
+        """
+        section_index = cls.__new__(cls)
+        document = index.document(name)
+        section_index.sections = document["sections"]
+        section_index.vocabulary = {term: i for i, term in enumerate(document["vocabulary"])}
+        section_index.weights = index.array(f"{name}.weights")
+        section_index.recognizer = recognizer
+        section_index.domain = domain
+        section_index._positions = {section["heading"]: i for i, section in enumerate(section_index.sections)}
+        return section_index
+
+    def rank(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Rank the sections relevant to a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Sections with a positive score (or named in the query), best first,
+                  each with its 'score'
+        """
+        ids = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        scores = self.weights[ids].sum(axis=0) if ids else np.zeros(len(self.sections), dtype=np.float32)
+
+        named = [self._positions[heading] for heading in self.recognizer.sections(query).get(self.domain, [])
+                 if heading in self._positions]
+        ranked = named + [int(i) for i in np.argsort(-scores, kind="stable")
+                          if scores[i] > 0 and int(i) not in named]
+        return [dict(self.sections[i], score=float(scores[i])) for i in ranked]
+
+    def retrieve(self, query: str, top_k: int = 3, token_budget: int = 1200) -> List[Dict[str, Any]]:
+        """
+        Select the sections to put in front of the model for a query.
+
+        Sections are taken in rank order while they fit the token budget; one
+        that does not fit is passed over for smaller ones further down.
+
+        Args:
+            query: The user query
+            top_k: Maximum number of sections
+            token_budget: Maximum estimated tokens of the selected sections
+
+        Returns:
+            list: Selected sections in rank order
+        """
+        selected = []
+        used = 0
+        for section in self.rank(query):
+            cost = estimate_tokens(section["text"])
+            if used + cost > token_budget:
+                continue
+            selected.append(section)
+            used += cost
+            if len(selected) == top_k:
+                break
+        return selected
+
+
+@functools.lru_cache(maxsize=32)
+def get_section_index(knowledge: str) -> SectionIndex:
+    """
+    Return the section index of a knowledge base, building it on first use.
+
+    Indexes are shared by every agent over the same knowledge base, so new
+    sessions do not re-index. Bundled knowledge bases load theirs from the
+    knowledge index when there is an up-to-date one.
+
+    Args:
+        knowledge: Knowledge base text
+
+    Returns:
+        SectionIndex: The shared index
+    """
+    index = get_knowledge_index()
+    if index is not None:
+        for domain, text in DOMAIN_KNOWLEDGE.items():
+            if text == knowledge and f"sections/{domain}" in index:
+                return SectionIndex.from_index(index, f"sections/{domain}", get_shared_entity_recognizer(), domain)
+    return SectionIndex(knowledge)
+
+
+def format_sections(sections: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Render retrieved sections for a prompt.
+
+    Args:
+        sections: Sections from SectionIndex.retrieve
+
+    Returns:
+        str: The sections under their headings, or None if there are none
+    """
+    if not sections:
+        return None
+    return "\n\n".join(section["text"] for section in sections)
@@ -0,0 +1,195 @@
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .errors import ClaudeAPIError, CircuitOpenError, DeadlineExceededError
+
+# 529 is Anthropic's "overloaded" status
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504, 529)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for failed Claude API calls.
+
+    Transport errors and the status codes in RETRYABLE_STATUS_CODES are retried.
+    When the server sends retry-after (typically on 429/529) that delay is used
+    instead of the computed backoff, capped at max_retry_after.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 20.0, jitter: bool = True,
+                 retry_statuses: Tuple[int, ...] = RETRYABLE_STATUS_CODES,
+                 max_retry_after: float = 60.0):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Total attempts including the first one (1 disables retries)
+            base_delay: Backoff for the first retry in seconds
+            max_delay: Upper bound for a computed backoff
+            jitter: Randomize delays to spread out retries from many callers
+            retry_statuses: HTTP status codes worth retrying
+            max_retry_after: Upper bound for a server supplied retry-after
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_statuses = tuple(retry_statuses)
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """
+        Decide whether a failed attempt should be retried.
+
+        Args:
+            error: The error raised by the attempt
+            attempt: Number of attempts made so far
+
+        Returns:
+            bool: True if another attempt should be made
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+            return False
+        if isinstance(error, ClaudeAPIError):
+            return error.status_code is None or error.status_code in self.retry_statuses
+        return False
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute how long to wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            float: Seconds to sleep
+        """
+        if retry_after is not None:
+            delay = min(retry_after, self.max_retry_after)
+            # Small jitter so callers told the same retry-after don't return in lockstep
+            return delay + (random.uniform(0, self.base_delay) if self.jitter else 0.0)
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After failure_threshold consecutive upstream failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once recovery_timeout has passed a
+    single probe request is let through (half-open); its outcome closes the
+    circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Endpoint the breaker protects (used in error messages)
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before allowing a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected_calls = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """
+        Check whether a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already running
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected_calls += 1
+            retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(
+            f"Circuit breaker for {self.name} is open; failing fast",
+            retry_after=retry_after
+        )
+
+    def record_success(self):
+        """Record a request that reached a healthy upstream"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record an upstream failure (transport error, 429, 5xx or 529)"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker for {self.name} opened after "
+                          f"{self.consecutive_failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Give back a half-open probe slot whose request never completed (e.g. cancelled)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the breaker's current state.
+
+        Returns:
+            dict: State, consecutive failures and rejected call count
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected_calls": self.rejected_calls,
+            }
+
+
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str, **config) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker for an endpoint, creating it if needed.
+
+    Args:
+        endpoint: URL of the endpoint
+        **config: CircuitBreaker options used when the breaker is first created
+
+    Returns:
+        CircuitBreaker: The shared breaker for the endpoint
+    """
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, **config)
+            _circuit_breakers[endpoint] = breaker
+        return breaker
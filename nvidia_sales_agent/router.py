@@ -0,0 +1,235 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .knowledge import DOMAIN_KNOWLEDGE
+from .knowledge_index import get_knowledge_index
+
+# Words that say nothing about which product domain a query is about
+STOPWORDS = frozenset("""
+a about all also an and any are as at be best between can compare did do does for from get
+give good has have how i if in is it its me more most my need nvidia of on or our product products
+should tell than that the their them there these they this to us use using vs want was we what when
+which who why will with would you your
+""".split())
+
+# How many times a heading line counts towards term frequencies
+HEADING_WEIGHT = 3
+
+# Score added for each query term that appears in a domain's own name. Names are
+# the most specific signal ("CUDA", "DPU") but their terms often occur in other
+# domains too, which would otherwise flatten them through the IDF.
+NAME_BONUS = 1.5
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase, lightly stemmed terms without stopwords.
+
+    Args:
+        text: Query or knowledge base text
+
+    Returns:
+        list: Terms in order of appearance
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Fold plurals ("gpus" -> "gpu") so queries match headings either way
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+def weighted_terms(title: str, text: str) -> List[str]:
+    """
+    Terms of a document, with its title and heading lines weighted up.
+
+    Args:
+        title: Document name (a domain or a section heading)
+        text: Document text
+
+    Returns:
+        list: Terms, repeated HEADING_WEIGHT times for heading lines
+    """
+    terms = tokenize(title)
+    for line in text.splitlines():
+        line_terms = tokenize(line)
+        terms.extend(line_terms * HEADING_WEIGHT if line.lstrip().startswith("#") else line_terms)
+    return terms
+
+
+def bm25_weights(documents: List[List[str]], k1: float = 1.2,
+                 b: float = 0.75) -> Tuple[Dict[str, int], np.ndarray]:
+    """
+    Precompute the BM25 weight of every (term, document) pair.
+
+    Args:
+        documents: Terms of each document
+        k1: BM25 term frequency saturation
+        b: BM25 length normalization
+
+    Returns:
+        tuple: (vocabulary, weights) with vocabulary mapping terms to rows of the
+               float32 weights matrix, which has one column per document
+    """
+    vocabulary: Dict[str, int] = {}
+    for terms in documents:
+        for term in terms:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    tf = np.zeros((len(vocabulary), len(documents)), dtype=np.float32)
+    for column, terms in enumerate(documents):
+        ids, counts = np.unique(np.array([vocabulary[term] for term in terms], dtype=np.intp),
+                                return_counts=True)
+        tf[ids, column] = counts
+
+    lengths = tf.sum(axis=0)
+    avg_length = lengths.mean() if len(documents) else 1.0
+    df = np.count_nonzero(tf, axis=1)
+    n = len(documents)
+    idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+    norm = k1 * (1.0 - b + b * lengths / max(avg_length, 1e-9))
+    weights = idf[:, None] * tf * (k1 + 1.0) / (tf + norm[None, :])
+    return vocabulary, weights.astype(np.float32)
+
+
+class LexicalRouter:
+    """
+    In-process BM25 router from a query to the product domains able to answer it.
+
+    Each domain's knowledge base is one document. The BM25 weight of every
+    (term, domain) pair, plus a bonus for terms of the domain's name, is
+    precomputed into a dense matrix, so scoring a query is one row gather
+    and sum in NumPy.
+    """
+
+    def __init__(self, knowledge: Dict[str, str], k1: float = 1.2, b: float = 0.75,
+                 min_score: float = 2.0, relative_cutoff: float = 0.5, max_domains: int = 3):
+        """
+        Build the index.
+
+        Args:
+            knowledge: Domain (agent id) to knowledge base text
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+            min_score: Top score below which a query is considered ambiguous
+            relative_cutoff: Domains scoring at least this fraction of the top score are selected
+            max_domains: Maximum domains to select; more candidates above the cutoff is ambiguous
+        """
+        self.domains = list(knowledge)
+        self.min_score = min_score
+        self.relative_cutoff = relative_cutoff
+        self.max_domains = max_domains
+
+        documents = [weighted_terms(domain, knowledge[domain]) for domain in self.domains]
+        self.vocabulary, self.weights = bm25_weights(documents, k1, b)
+        for column, domain in enumerate(self.domains):
+            for term in set(tokenize(domain)):
+                self.weights[self.vocabulary[term], column] += NAME_BONUS
+
+    def to_index(self, writer, name: str):
+        """
+        Store the router's index in a knowledge index.
+
+        Args:
+            writer: knowledge_index.IndexWriter
+            name: Prefix of the stored entries
+        """
+        writer.add_json(name, {"domains": self.domains, "vocabulary": list(self.vocabulary)})
+        writer.add_array(f"{name}.weights", self.weights)
+
+    @classmethod
+    def from_index(cls, index, name: str, min_score: float = 2.0, relative_cutoff: float = 0.5,
+                   max_domains: int = 3) -> "LexicalRouter":
+        """
+        Load a router from a knowledge index, scoring on the mapped weights.
+
+        Args:
+            index: knowledge_index.KnowledgeIndex
+            name: Prefix the router was stored under
+            min_score, relative_cutoff, max_domains: As for the constructor
+
+        Returns:
+            LexicalRouter: The router
+        """
+        router = cls.__new__(cls)
+        document = index.document(name)
+        router.domains = document["domains"]
+        router.min_score = min_score
+        router.relative_cutoff = relative_cutoff
+        router.max_domains = max_domains
+        router.vocabulary = {term: i for i, term in enumerate(document["vocabulary"])}
+        router.weights = index.array(f"{name}.weights")
+        return router
+
+    def rank(self, query: str) -> List[Tuple[str, float]]:
+        """
+        Score every domain for a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: (domain, score) pairs, best first
+        """
+        ids = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        if ids:
+            scores = self.weights[ids].sum(axis=0)
+        else:
+            scores = np.zeros(len(self.domains), dtype=np.float32)
+        order = np.argsort(-scores, kind="stable")
+        return [(self.domains[i], float(scores[i])) for i in order]
+
+    def route(self, query: str) -> Optional[List[str]]:
+        """
+        Select the domains for a query, or give up if the ranking is ambiguous.
+
+        A query is ambiguous when nothing scores at least min_score, or when
+        more than max_domains domains score within relative_cutoff of the top.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Selected domains, best first, or None if the caller should decide another way
+        """
+        ranked = self.rank(query)
+        if not ranked or ranked[0][1] < self.min_score:
+            return None
+        cutoff = ranked[0][1] * self.relative_cutoff
+        selected = [domain for domain, score in ranked if score >= cutoff]
+        if len(selected) > self.max_domains:
+            return None
+        return selected
+
+
+_shared_router = None
+_shared_router_lock = threading.Lock()
+
+
+def get_shared_router() -> LexicalRouter:
+    """
+    Return the process-wide router over DOMAIN_KNOWLEDGE, creating it on first use.
+
+    It is loaded from the knowledge index when there is an up-to-date one and
+    indexed from the knowledge bases otherwise.
+
+    Returns:
+        LexicalRouter: The shared router, with the default thresholds
+    """
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            index = get_knowledge_index()
+            if index is not None:
+                _shared_router = LexicalRouter.from_index(index, "router")
+            else:
+                _shared_router = LexicalRouter(DOMAIN_KNOWLEDGE)
+        return _shared_router
@@ -0,0 +1,128 @@
+import asyncio
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .deadline import Deadline, current_deadline
+from .errors import DeadlineExceededError
+
+
+class _Flight:
+    """One in-flight call, the number of callers waiting on it and the deadline it runs under"""
+
+    def __init__(self, deadline: Optional[Deadline]):
+        self.task = None
+        self.waiters = 0
+        # A copy, so joining waiters can extend it without touching the first caller's
+        self.deadline = Deadline(float("inf"))
+        if deadline is not None:
+            self.deadline.budget = deadline.budget
+            self.deadline.expires_at = deadline.expires_at
+
+    def join(self, deadline: Optional[Deadline]):
+        """Extend the flight's deadline to cover a waiter's (no deadline: unbounded)"""
+        if deadline is None:
+            self.deadline.expires_at = float("inf")
+        elif deadline.expires_at > self.deadline.expires_at:
+            self.deadline.budget = deadline.budget
+            self.deadline.expires_at = deadline.expires_at
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one.
+
+    The first caller for a key starts the work in its own task; callers that
+    arrive while it is running await the same task instead of starting a
+    duplicate. Each waiter is shielded from the others: cancelling one waiter
+    or reaching its deadline only detaches it, and the shared task is
+    cancelled only when every waiter has gone. Work is keyed per event loop
+    because tasks are loop-bound.
+
+    The shared task runs in an empty context rather than a copy of the first
+    caller's, so it carries no caller's deadline, usage tracker or stage.
+    Instead the factory is given the flight's deadline, the latest of its
+    waiters' (unbounded if one has none), which is extended as waiters join.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[Any, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced_calls = 0
+
+    async def do(self, key: str, factory: Callable[[Deadline], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run factory(deadline) for a key, or join the run already in flight.
+
+        Args:
+            key: Identity of the call (e.g. a completion cache key)
+            factory: Function taking the flight's deadline and returning the awaitable to run
+
+        Returns:
+            tuple: (result, shared) where shared is True if another caller did the work
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        deadline = current_deadline()
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            shared = flight is not None
+            if flight is None:
+                flight = _Flight(deadline)
+                # create_task copies the current context, which is empty inside run()
+                flight.task = contextvars.Context().run(loop.create_task, factory(flight.deadline))
+                self._flights[flight_key] = flight
+                flight.task.add_done_callback(lambda task: self._forget(flight_key, flight))
+            else:
+                flight.join(deadline)
+                self.coalesced_calls += 1
+            flight.waiters += 1
+
+        try:
+            if deadline is None:
+                result = await asyncio.shield(flight.task)
+            else:
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(flight.task), max(0.0, deadline.remaining()))
+                except asyncio.TimeoutError:
+                    if flight.task.done():
+                        raise
+                    raise DeadlineExceededError(f"Deadline of {deadline.budget:.2f}s exceeded") from None
+        except (asyncio.CancelledError, DeadlineExceededError):
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0
+            if abandoned and not flight.task.done():
+                flight.task.cancel()
+            raise
+        except BaseException:
+            with self._lock:
+                flight.waiters -= 1
+            raise
+        with self._lock:
+            flight.waiters -= 1
+        return result, shared
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._flights)
+
+    def _forget(self, flight_key: Tuple[Any, str], flight: _Flight):
+        """Drop a finished flight so later callers start fresh work"""
+        with self._lock:
+            if self._flights.get(flight_key) is flight:
+                del self._flights[flight_key]
+
+
+_shared_single_flight = SingleFlight()
+
+
+def get_shared_single_flight() -> SingleFlight:
+    """
+    Return the process-wide SingleFlight used by every ClaudeClient by default.
+
+    Returns:
+        SingleFlight: The shared instance
+    """
+    return _shared_single_flight
@@ -0,0 +1,322 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .entities import ProductEntityRecognizer, get_shared_entity_recognizer
+from .knowledge import DOMAIN_KNOWLEDGE
+from .knowledge_index import get_knowledge_index
+
+# Columns of the spec table: (column, label, unit, pattern matching a "Label: value"
+# bullet, pattern matching an unlabeled bullet, pattern matching a question about it).
+# Numeric columns are normalized to the unit given; a unit of None is a plain count
+# and "text" a column kept only as text. Order matters: the first matching column wins.
+SPEC_COLUMNS = [
+    ("tensor_cores", "Tensor Cores", None, r"tensor cores", None, r"tensor cores?"),
+    ("rt_cores", "RT Cores", None, r"rt cores", None, r"rt cores?|ray tracing cores?"),
+    ("cpu_cores", "CPU cores", None, r"cpu cores", r"(\d+) cpu cores", r"cpu cores?"),
+    ("cuda_cores", "CUDA Cores", None, r"cuda cores", None, r"(?:cuda )?cores?"),
+    ("sms", "Streaming multiprocessors", None, r"streaming multiprocessors",
+     r"(\d+) streaming multiprocessors", r"streaming multiprocessors|sms?"),
+    ("gpus", "GPUs", None, r"gpus", r"^(\d+)x .*\bgpus?\b", r"how many gpus|gpu count|number of gpus"),
+    ("boost_clock_ghz", "Boost Clock", "GHz", r"boost clock|clock", None, r"clock|ghz|frequency"),
+    ("memory_bandwidth_gbs", "Memory Bandwidth", "GB/s", r"memory bandwidth", None, r"bandwidth"),
+    ("memory_bus_bits", "Memory Interface", "bit", r"memory interface", None,
+     r"memory interface|memory bus|bus width"),
+    ("system_memory_gb", "System memory", "GB", r"system memory", r"([\d.]+\s*[gt]b)\b.*\bsystem memory",
+     r"system memory|system ram"),
+    ("memory_gb", "Memory", "GB", r"memory", r"([\d.]+\s*[gt]b)\b.*\bmemory", r"memory|vram|ram"),
+    ("psu_w", "Recommended PSU", "W", r"recommended psu|psu", None, r"psu|power supply"),
+    ("tdp_w", "TDP", "W", r"tdp|power", r"((?:\d+w,?\s*(?:and\s*)?)+)", r"tdp|power|watts?|wattage"),
+    ("ai_tops", "AI performance", "TOPS", r"ai performance|performance", r"([\d,.]+\s*tops)", r"tops"),
+    ("launch_price_usd", "Launch Price", "USD", r"launch price|price|msrp", None,
+     r"price[sd]?|pricing|costs?|msrp"),
+    ("form_factor", "Form Factor", "text", r"form factor", None, r"form factor|slots?|size"),
+    ("display_connectors", "Display Connectors", "text", r"display connectors", None,
+     r"display connectors?|display outputs?|displayport|ports"),
+]
+
+# Scale of each unit suffix to the column's unit
+UNIT_SCALES = {
+    "GB": {"gb": 1.0, "tb": 1000.0, "mb": 0.001},
+    "GB/s": {"gb/s": 1.0, "tb/s": 1000.0},
+    "GHz": {"ghz": 1.0, "mhz": 0.001},
+    "W": {"w": 1.0},
+    "bit": {"-bit": 1.0, "bit": 1.0},
+    "TOPS": {"tops": 1.0},
+    "USD": {"": 1.0},
+}
+
+_QUANTITY = re.compile(r"(?<![\w.])(\d[\d,]*(?:\.\d+)?)\s*(tb/s|gb/s|tb|gb|mb|ghz|mhz|tops|-bit|bit|w|x)?(?![a-z])")
+
+# Questions that ask for more than a spec value go to Claude
+OPEN_ENDED = re.compile(
+    r"\b(?:why|how does|how do|how is|recommend\w*|should|better|best|compare\w*|versus|vs|"
+    r"difference\w*|explain|worth|good for|which|what is the difference)\b")
+
+_COMPILED = [
+    (column, label, unit, re.compile(r"^(?:" + label_pattern + r")$"),
+     re.compile(value_pattern) if value_pattern else None,
+     re.compile(r"\b(?:" + query_pattern + r")\b"))
+    for column, label, unit, label_pattern, value_pattern, query_pattern in SPEC_COLUMNS
+]
+
+
+def parse_quantity(text: str, unit: Optional[str]) -> float:
+    """
+    Extract a number from a spec value, normalized to a unit.
+
+    Counts use the first number ("568 (4th Gen)" -> 568); quantities with a
+    unit use the largest one ("8GB or 16GB" -> 16).
+
+    Args:
+        text: Spec value
+        unit: Unit of the column (a key of UNIT_SCALES) or None for counts
+
+    Returns:
+        float: The value, or NaN if there is none
+    """
+    values = []
+    for number, suffix in _QUANTITY.findall(text.lower()):
+        value = float(number.replace(",", ""))
+        if unit is None:
+            return value
+        scale = UNIT_SCALES[unit].get(suffix)
+        if scale is not None:
+            values.append(value * scale)
+    return max(values) if values else float("nan")
+
+
+def parse_specifications(knowledge: str) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Read the 'Specifications:' block of every '## ' section of a knowledge base.
+
+    Args:
+        knowledge: Knowledge base text
+
+    Returns:
+        list: (section heading, {column: raw value text}) for sections with specs
+    """
+    products = []
+    section = None
+    in_specs = False
+    for line in knowledge.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            section = stripped[3:].strip() if stripped.startswith("## ") else None
+            in_specs = False
+            if section:
+                products.append((section, {}))
+        elif stripped.endswith(":") and not stripped.startswith("-"):
+            in_specs = section is not None and stripped[:-1].strip().lower() == "specifications"
+        elif in_specs and stripped.startswith("- "):
+            _parse_bullet(stripped[2:].strip(), products[-1][1])
+    return [(name, values) for name, values in products if values]
+
+
+def _parse_bullet(bullet: str, values: Dict[str, str]):
+    """Assign one spec bullet to the first column it matches"""
+    label, separator, value = bullet.partition(":")
+    lowered = bullet.lower()
+    for column, _, unit, label_pattern, value_pattern, _ in _COMPILED:
+        if column in values:
+            continue
+        if separator and label_pattern.match(label.strip().lower()):
+            values[column] = value.strip()
+            return
+        if not separator and value_pattern is not None:
+            match = value_pattern.search(lowered)
+            if match:
+                values[column] = bullet
+                return
+
+
+class SpecTable:
+    """
+    Columnar table of the products described by 'Specifications:' blocks.
+
+    Each numeric column is a float64 NumPy array (NaN where a product has no
+    value) in the column's normalized unit; the original text of every value
+    is kept alongside for answers.
+    """
+
+    def __init__(self, knowledge: Dict[str, str], recognizer: Optional[ProductEntityRecognizer] = None):
+        """
+        Parse the spec blocks of the knowledge bases.
+
+        Args:
+            knowledge: Domain (agent id) to knowledge base text
+            recognizer: Product name matcher over the same knowledge; by default
+                        one is compiled on first use
+        """
+        self.knowledge = knowledge
+        self.names: List[str] = []
+        self.domains: List[str] = []
+        raw: List[Dict[str, str]] = []
+        for domain, text in knowledge.items():
+            for name, values in parse_specifications(text):
+                self.names.append(name)
+                self.domains.append(domain)
+                raw.append(values)
+
+        self.text: Dict[str, List[Optional[str]]] = {
+            column: [values.get(column) for values in raw] for column, _, _, _, _, _ in SPEC_COLUMNS
+        }
+        self.columns: Dict[str, np.ndarray] = {
+            column: np.array([parse_quantity(value, unit) if value else np.nan
+                              for value in self.text[column]], dtype=np.float64)
+            for column, _, unit, _, _, _ in SPEC_COLUMNS if unit != "text"
+        }
+        self._setup(recognizer)
+
+    def _setup(self, recognizer: Optional[ProductEntityRecognizer]):
+        """Derive the lookup structures from the rows and columns"""
+        self.labels = {column: label for column, label, _, _, _, _ in SPEC_COLUMNS}
+        self.units = {column: unit for column, _, unit, _, _, _ in SPEC_COLUMNS}
+        self._rows = {(domain, name): i for i, (domain, name) in enumerate(zip(self.domains, self.names))}
+        self._recognizer = recognizer
+
+    def to_index(self, writer, name: str):
+        """
+        Store the table in a knowledge index.
+
+        Args:
+            writer: knowledge_index.IndexWriter
+            name: Prefix of the stored entries
+        """
+        writer.add_json(name, {"names": self.names, "domains": self.domains, "text": self.text,
+                               "columns": list(self.columns)})
+        for column, values in self.columns.items():
+            writer.add_array(f"{name}.{column}", values)
+
+    @classmethod
+    def from_index(cls, index, name: str, knowledge: Dict[str, str],
+                   recognizer: Optional[ProductEntityRecognizer] = None) -> "SpecTable":
+        """
+        Load a table from a knowledge index, with its columns mapped in place.
+
+        Args:
+            index: knowledge_index.KnowledgeIndex
+            name: Prefix the table was stored under
+            knowledge: The knowledge bases the table was built from
+            recognizer: Product name matcher over the same knowledge
+
+        Returns:
+            SpecTable: The table
+        """
+        table = cls.__new__(cls)
+        document = index.document(name)
+        table.knowledge = knowledge
+        table.names = document["names"]
+        table.domains = document["domains"]
+        table.text = document["text"]
+        table.columns = {column: index.array(f"{name}.{column}") for column in document["columns"]}
+        table._setup(recognizer)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def rows_for(self, query: str, domain: Optional[str] = None, first_per_mention: bool = False) -> List[int]:
+        """
+        Rows of the products a query names.
+
+        Args:
+            query: The user query
+            domain: Only return products of this domain
+            first_per_mention: Keep only the first product of a name several share
+                               ("L40S" is both a workstation and a data center entry)
+
+        Returns:
+            list: Row indexes in order of mention
+        """
+        if self._recognizer is None:
+            self._recognizer = ProductEntityRecognizer(self.knowledge)
+        rows = []
+        for mention in self._recognizer.match(query):
+            for entity in mention["entities"]:
+                row = self._rows.get((entity["domain"], entity["section"]))
+                if row is not None and row not in rows and (domain is None or entity["domain"] == domain):
+                    rows.append(row)
+                    if first_per_mention:
+                        break
+        return rows
+
+    def columns_for(self, query: str) -> List[str]:
+        """
+        Spec columns a query asks about.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Column names; more specific columns claim their words first
+                  ("tensor cores" is not also read as CUDA cores)
+        """
+        text = query.lower()
+        columns = []
+        for column, _, _, _, _, query_pattern in _COMPILED:
+            if query_pattern.search(text):
+                columns.append(column)
+                text = query_pattern.sub(" ", text)
+        return columns
+
+    def lookup(self, query: str, domain: Optional[str] = None) -> Optional[str]:
+        """
+        Answer a direct spec question from the table.
+
+        Only questions that name products and ask for specs the table has for
+        every one of them are answered; anything open-ended returns None.
+
+        Args:
+            query: The user query
+            domain: Only consider products of this domain
+
+        Returns:
+            str: The answer, or None if the question needs Claude
+        """
+        if OPEN_ENDED.search(query.lower()):
+            return None
+        rows = self.rows_for(query, domain)
+        columns = self.columns_for(query)
+        if not rows or not columns:
+            return None
+
+        lines = []
+        for row in rows:
+            values = [(self.labels[column], self.text[column][row]) for column in columns]
+            if any(value is None for _, value in values):
+                return None
+            if len(values) == 1:
+                lines.append(f"{self.names[row]} {values[0][0]}: {values[0][1]}")
+            else:
+                lines.append(f"{self.names[row]}:")
+                lines.extend(f"- {label}: {value}" for label, value in values)
+        return "\n".join(lines)
+
+
+_shared_table = None
+_shared_table_lock = threading.Lock()
+
+
+def get_shared_spec_table() -> SpecTable:
+    """
+    Return the process-wide spec table of DOMAIN_KNOWLEDGE, creating it on first use.
+
+    It is loaded from the knowledge index when there is an up-to-date one and
+    parsed from the knowledge bases otherwise.
+
+    Returns:
+        SpecTable: The shared table
+    """
+    global _shared_table
+    with _shared_table_lock:
+        if _shared_table is None:
+            index = get_knowledge_index()
+            recognizer = get_shared_entity_recognizer()
+            if index is not None:
+                _shared_table = SpecTable.from_index(index, "specs", DOMAIN_KNOWLEDGE, recognizer)
+            else:
+                _shared_table = SpecTable(DOMAIN_KNOWLEDGE, recognizer)
+        return _shared_table
@@ -0,0 +1,127 @@
+import re
+from typing import Dict, Any, List, Tuple
+
+from .entities import ProductEntityRecognizer, normalize
+
+# Attributes a query can ask about: (label, pattern detecting the question,
+# pattern detecting an answer). Answers must carry a value ("450 W", "24 GB"),
+# since an answer that merely names the attribute may be saying it is unknown.
+ATTRIBUTES = [
+    ("power", re.compile(r"\b(?:tdp|power draw|power consumption|watts?|wattage|psu)\b"),
+     re.compile(r"\b\d+\s*(?:w|watts?)\b")),
+    ("memory", re.compile(r"\b(?:memory|vram|gddr\w*|hbm\w*)\b"),
+     re.compile(r"\b\d+\s*(?:gb|tb)\b")),
+    ("price", re.compile(r"\b(?:price|prices|pricing|cost|costs|msrp|cheap\w*|afford\w*)\b"),
+     re.compile(r"\$\s*\d|\b\d[\d,.]*\s*(?:dollars|usd)\b")),
+    ("performance", re.compile(r"\b(?:t?flops|petaflops|tops|fps|benchmarks?|throughput)\b"),
+     re.compile(r"\b\d[\d,.]*\s*(?:[tp]flops|petaflops|tops|fps|x)\b")),
+    ("bandwidth", re.compile(r"\b(?:bandwidth|gbps|gb/s|tb/s)\b"),
+     re.compile(r"\b\d[\d,.]*\s*(?:gb/s|tb/s|gbps|tbps|gt/s)")),
+    ("cores", re.compile(r"\b(?:cores|core count|sms?)\b"),
+     re.compile(r"\b\d[\d,]*\s*(?:cuda |tensor |rt |arm )?cores\b")),
+    ("release date", re.compile(r"\b(?:release date|released|launch(?:ed)?|availability)\b"),
+     re.compile(r"\b(?:19|20)\d\d\b")),
+    ("comparison", re.compile(r"\b(?:compare|comparison|versus|vs|difference|differences|better)\b"),
+     re.compile(r"\b(?:whereas|while|compared|than|versus|vs|both|difference|unlike)\b")),
+]
+
+# Model numbers ("H100", "L40S", "4090ti") that no knowledge base heading names on its own.
+# A letter must adjoin the digits: bare numbers are quantities ("24 GB", "$700", "100
+# users"), and bare model numbers of known products ("4090") are entity aliases.
+_MODEL_NUMBER = re.compile(r"\b(?:[a-z]{1,3}\d{2,5}[a-z]{0,2}|\d{2,5}[a-z]{1,2})\b")
+_NOT_MODEL_NUMBER = re.compile(r"^(?:(?:19|20)\d\d|\d+(?:gb|tb|mb|w|k|p|x|s|nm))$")
+
+
+class LocalSufficiencyChecker:
+    """
+    In-process check that agent responses cover what a query asks for.
+
+    The requirements of a query are the products and model numbers it names and the attributes
+    it asks about (TDP, memory, price, a comparison, ...). Each requirement is
+    covered when some successful response names the product or states a value
+    for the attribute. Full coverage is sufficient and low coverage is
+    insufficient without asking Claude; anything in between, or a query with no
+    recognizable requirement, is borderline and left to the LLM assessment.
+    """
+
+    def __init__(self, recognizer: ProductEntityRecognizer, sufficient_coverage: float = 1.0,
+                 insufficient_coverage: float = 0.5):
+        """
+        Initialize the checker.
+
+        Args:
+            recognizer: Product name matcher over the knowledge bases
+            sufficient_coverage: Coverage at or above which responses are sufficient
+            insufficient_coverage: Coverage below which responses are insufficient
+        """
+        self.recognizer = recognizer
+        self.sufficient_coverage = sufficient_coverage
+        self.insufficient_coverage = insufficient_coverage
+
+    def requirements(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Extract what a query asks for.
+
+        Args:
+            query: The user query
+
+        Returns:
+            list: Requirements as dicts with 'kind' ('product' or 'attribute'), 'label'
+                  and, for products, the matched 'names' and 'alias'
+        """
+        requirements = []
+        for mention in self.recognizer.match(query):
+            requirements.append({
+                "kind": "product",
+                "label": mention["entities"][0]["name"],
+                "alias": mention["alias"],
+                "names": {entity["name"] for entity in mention["entities"]},
+            })
+        text = query.lower()
+        aliases = " ".join(requirement["alias"] for requirement in requirements).split()
+        for token in dict.fromkeys(_MODEL_NUMBER.findall(text)):
+            if not _NOT_MODEL_NUMBER.match(token) and token not in aliases:
+                requirements.append({"kind": "product", "label": token.upper(), "alias": token, "names": set()})
+        for label, asked, _ in ATTRIBUTES:
+            if asked.search(text):
+                requirements.append({"kind": "attribute", "label": label})
+        return requirements
+
+    def check(self, query: str, responses: List[Dict]) -> Tuple[str, float, List[str]]:
+        """
+        Judge whether the successful responses answer the query.
+
+        Args:
+            query: The user query
+            responses: Agent responses
+
+        Returns:
+            tuple: (verdict, coverage, missing) with verdict 'sufficient', 'insufficient'
+                   or 'borderline' and missing the labels of uncovered requirements
+        """
+        requirements = self.requirements(query)
+        texts = [r["response"] for r in responses if r["status"] == "success"]
+        if not requirements or not texts:
+            return "borderline", 0.0, []
+
+        text = "\n".join(texts)
+        lowered = text.lower()
+        normalized = normalize(text)
+        named = {entity["name"] for mention in self.recognizer.match(text) for entity in mention["entities"]}
+        answers = {label: answered for label, _, answered in ATTRIBUTES}
+
+        missing = []
+        for requirement in requirements:
+            if requirement["kind"] == "product":
+                covered = bool(requirement["names"] & named) or f" {requirement['alias']} " in normalized
+            else:
+                covered = bool(answers[requirement["label"]].search(lowered))
+            if not covered:
+                missing.append(requirement["label"])
+
+        coverage = 1 - len(missing) / len(requirements)
+        if coverage >= self.sufficient_coverage:
+            return "sufficient", coverage, missing
+        if coverage < self.insufficient_coverage:
+            return "insufficient", coverage, missing
+        return "borderline", coverage, missing
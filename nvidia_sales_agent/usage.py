@@ -0,0 +1,249 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+# USD per million tokens: (input, output). Cache writes bill at 1.25x input, cache reads at 0.1x.
+MODEL_PRICING = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-sonnet-20240229": (3.0, 15.0),
+    "claude-3-opus-20240229": (15.0, 75.0),
+    "claude-3-5-haiku-20241022": (0.8, 4.0),
+    "claude-3-5-sonnet-20240620": (3.0, 15.0),
+    "claude-3-5-sonnet-20241022": (3.0, 15.0),
+    "claude-3-7-sonnet-20250219": (3.0, 15.0),
+}
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+# Stage and tracker of the code currently awaiting Claude. asyncio tasks copy the
+# context when created, so each agent task in a fan-out keeps its own stage.
+_current_stage = contextvars.ContextVar("usage_stage", default=None)
+_current_tracker = contextvars.ContextVar("usage_tracker", default=None)
+
+
+def estimate_cost(call_info: Dict[str, Any]) -> float:
+    """
+    Estimate the USD cost of one call from its token counts.
+
+    Args:
+        call_info: Call record from ClaudeClient
+
+    Returns:
+        float: Estimated cost (0.0 for cache hits and unknown models)
+    """
+    pricing = MODEL_PRICING.get(call_info.get("model"))
+    if pricing is None or call_info.get("cached") or call_info.get("coalesced"):
+        return 0.0
+    input_price, output_price = pricing
+    return (
+        call_info.get("input_tokens", 0) * input_price
+        + call_info.get("cache_creation_input_tokens", 0) * input_price * 1.25
+        + call_info.get("cache_read_input_tokens", 0) * input_price * 0.1
+        + call_info.get("output_tokens", 0) * output_price
+    ) / 1_000_000
+
+
+class UsageTracker:
+    """
+    Collects the call records of one process_query invocation.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            session_id: Session the query belongs to
+        """
+        self.session_id = session_id
+        self.calls: List[Dict[str, Any]] = []
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    def record(self, call_info: Dict[str, Any]):
+        """
+        Add a call record.
+
+        Args:
+            call_info: Call record from ClaudeClient
+        """
+        self.calls.append(call_info)
+
+    def finish(self):
+        """Stop the wall-clock timer for the query"""
+        self.finished_at = time.monotonic()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate the recorded calls overall and per stage.
+
+        Returns:
+            dict: Token, cost and latency totals with a 'by_stage' breakdown
+        """
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        summary = self._aggregate(self.calls)
+        summary["session_id"] = self.session_id
+        summary["wall_clock_ms"] = round((end - self.started_at) * 1000, 1)
+
+        by_stage = {}
+        for call in self.calls:
+            by_stage.setdefault(call.get("stage") or "unknown", []).append(call)
+        summary["by_stage"] = {stage: self._aggregate(calls) for stage, calls in by_stage.items()}
+        return summary
+
+    def _aggregate(self, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum token counts, cost and timings over a list of call records"""
+        totals = {field: 0 for field in TOKEN_FIELDS}
+        totals.update({
+            "calls": len(calls),
+            "models": sorted({call["model"] for call in calls if call.get("model")}),
+            "cached_calls": 0,
+            "coalesced_calls": 0,
+            "hedged_calls": 0,
+            "failed_calls": 0,
+            "latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+            "queue_wait_ms": 0.0,
+            "cost_usd": 0.0,
+        })
+        for call in calls:
+            for field in TOKEN_FIELDS:
+                totals[field] += call.get(field, 0)
+            totals["cached_calls"] += 1 if call.get("cached") else 0
+            totals["coalesced_calls"] += 1 if call.get("coalesced") else 0
+            totals["hedged_calls"] += 1 if call.get("hedged") else 0
+            totals["failed_calls"] += 1 if call.get("status") != "success" else 0
+            totals["latency_ms"] += call.get("latency_ms", 0.0)
+            totals["max_latency_ms"] = max(totals["max_latency_ms"], call.get("latency_ms", 0.0))
+            totals["queue_wait_ms"] += call.get("queue_wait_ms", 0.0)
+            totals["cost_usd"] += estimate_cost(call)
+        for field in ("latency_ms", "max_latency_ms", "queue_wait_ms"):
+            totals[field] = round(totals[field], 1)
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+        return totals
+
+
+@contextmanager
+def usage_stage(stage: str):
+    """
+    Tag Claude calls made inside the block with a pipeline stage.
+
+    Args:
+        stage: Stage name, e.g. 'select', 'agent:<id>', 'assess', 'select_additional', 'combine'
+    """
+    token = _current_stage.set(stage)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+@contextmanager
+def track_usage(tracker: UsageTracker):
+    """
+    Send the records of Claude calls made inside the block to a tracker.
+
+    Args:
+        tracker: Tracker for the current query
+    """
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        tracker.finish()
+        _current_tracker.reset(token)
+
+
+def record_call(call_info: Dict[str, Any]):
+    """
+    Tag a call record with the current stage and session and store it in the active tracker.
+
+    Args:
+        call_info: Call record from ClaudeClient (modified in place)
+    """
+    tracker = _current_tracker.get()
+    call_info["stage"] = _current_stage.get()
+    call_info["session_id"] = tracker.session_id if tracker is not None else None
+    if tracker is not None:
+        tracker.record(call_info)
+
+
+class StageLatencyStats:
+    """
+    Rolling per-stage, per-model latency of Claude calls across queries.
+
+    Agent stages ('agent:<id>') are grouped under 'agent' so that model tiers
+    can be compared stage by stage. Cache hits and coalesced calls are skipped
+    because they say nothing about the model's latency.
+    """
+
+    def __init__(self, window: int = 500):
+        """
+        Initialize the collector.
+
+        Args:
+            window: Number of most recent calls kept per (stage, model)
+        """
+        self.window = window
+        self._samples: Dict[tuple, deque] = {}
+        self._lock = threading.Lock()
+
+    def record_calls(self, calls: List[Dict[str, Any]]):
+        """
+        Add the call records of one query.
+
+        Args:
+            calls: Call records from a UsageTracker
+        """
+        with self._lock:
+            for call in calls:
+                if call.get("cached") or call.get("coalesced") or call.get("status") != "success":
+                    continue
+                stage = (call.get("stage") or "unknown").split(":", 1)[0]
+                key = (stage, call.get("model"))
+                self._samples.setdefault(key, deque(maxlen=self.window)).append(
+                    (call.get("latency_ms", 0.0), call.get("first_token_ms")))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize the collected latencies.
+
+        Returns:
+            dict: Stage name to model name to count, mean/p50/p95 latency and mean time to first token
+        """
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+        result = {}
+        for (stage, model), values in sorted(samples.items(), key=lambda item: str(item[0])):
+            latencies = sorted(latency for latency, _ in values)
+            first_tokens = [first for _, first in values if first is not None]
+            result.setdefault(stage, {})[model] = {
+                "calls": len(latencies),
+                "mean_ms": round(sum(latencies) / len(latencies), 1),
+                "p50_ms": round(_percentile(latencies, 0.5), 1),
+                "p95_ms": round(_percentile(latencies, 0.95), 1),
+                "mean_first_token_ms": round(sum(first_tokens) / len(first_tokens), 1) if first_tokens else None,
+            }
+        return result
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+_shared_stage_stats = StageLatencyStats()
+
+
+def get_stage_latency_stats() -> StageLatencyStats:
+    """
+    Return the process-wide stage latency collector fed by every OrchestratorAgent.
+
+    Returns:
+        StageLatencyStats: The shared collector
+    """
+    return _shared_stage_stats
@@ -1,4 +1,25 @@
+import os
+import sys
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+
+class BuildPyWithIndex(build_py):
+    """Build the package and compile its knowledge index next to it"""
+
+    def run(self):
+        super().run()
+        # Index the package just built; numpy comes from build-system.requires in pyproject.toml
+        sys.path.insert(0, os.path.abspath(self.build_lib))
+        try:
+            from nvidia_sales_agent.knowledge_index import INDEX_FILENAME, build_index
+        finally:
+            sys.path.pop(0)
+        path = os.path.join(self.build_lib, "nvidia_sales_agent", INDEX_FILENAME)
+        build_index(path)
+        print(f"Wrote knowledge index {path}")
+
 
 setup(
     name="nvidia_sales_agent",
@@ -7,12 +28,15 @@ setup(
     install_requires=[
         "async-timeout>=4.0.3",
         "python-dotenv>=1.0.0",
+        "httpx[http2]>=0.25.0",
+        "numpy>=1.20.0",
     ],
     author="NVIDIA Sales Agent Team",
     author_email="example@example.com",
     description="An intelligent sales agent for NVIDIA products using an agentic architecture",
     keywords="ai, sales, agent, nvidia, gpu",
     python_requires=">=3.8",
+    cmdclass={"build_py": BuildPyWithIndex},
     entry_points={
         "console_scripts": [
             "nvidia-agent=main:main",
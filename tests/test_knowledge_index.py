@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from nvidia_sales_agent.entities import ProductEntityRecognizer
+from nvidia_sales_agent.knowledge import DOMAIN_KNOWLEDGE
+from nvidia_sales_agent.knowledge_index import INDEX_MAGIC, _HEADER, build_index, load_index
+from nvidia_sales_agent.retrieval import SectionIndex
+from nvidia_sales_agent.router import LexicalRouter
+from nvidia_sales_agent.specs import SpecTable
+
+QUERIES = [
+    "compare rtx 4090 vs 4080 memory",
+    "best gpu for machine learning under $2000",
+    "how much memory does the H100 have",
+    "bluefield-3 dpu networking",
+    "jetson orin for robots",
+    "omniverse enterprise pricing",
+    "DGX H100 power",
+]
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory):
+    return build_index(str(tmp_path_factory.mktemp("index") / "knowledge.idx"))
+
+
+def test_loaded_index_matches_a_fresh_build(index_path):
+    index = load_index(index_path, DOMAIN_KNOWLEDGE)
+    assert index is not None
+
+    router = LexicalRouter.from_index(index, "router")
+    recognizer = ProductEntityRecognizer.from_index(index, "entities")
+    table = SpecTable.from_index(index, "specs", DOMAIN_KNOWLEDGE, recognizer)
+    sections = {domain: SectionIndex.from_index(index, f"sections/{domain}", recognizer, domain)
+                for domain in DOMAIN_KNOWLEDGE}
+
+    fresh_recognizer = ProductEntityRecognizer(DOMAIN_KNOWLEDGE)
+    fresh_router = LexicalRouter(DOMAIN_KNOWLEDGE)
+    fresh_table = SpecTable(DOMAIN_KNOWLEDGE, fresh_recognizer)
+    for query in QUERIES:
+        assert router.route(query) == fresh_router.route(query)
+        assert recognizer.sections(query) == fresh_recognizer.sections(query)
+        assert table.rows_for(query) == fresh_table.rows_for(query)
+        for domain, text in DOMAIN_KNOWLEDGE.items():
+            fresh_sections = SectionIndex(text, recognizer=fresh_recognizer, domain=domain)
+            assert ([s["heading"] for s in sections[domain].rank(query)] ==
+                    [s["heading"] for s in fresh_sections.rank(query)])
+    for column, values in fresh_table.columns.items():
+        assert np.array_equal(table.columns[column], values, equal_nan=True)
+
+
+def test_index_of_other_knowledge_is_ignored(index_path):
+    knowledge = dict(DOMAIN_KNOWLEDGE)
+    domain = next(iter(knowledge))
+    knowledge[domain] += "\nEdited."
+    assert load_index(index_path, knowledge) is None
+
+
+def test_unreadable_files_are_ignored(tmp_path):
+    assert load_index(str(tmp_path / "missing.idx"), DOMAIN_KNOWLEDGE) is None
+
+    corrupt = tmp_path / "corrupt.idx"
+    corrupt.write_bytes(b"not an index")
+    assert load_index(str(corrupt), DOMAIN_KNOWLEDGE) is None
+
+    stale = tmp_path / "stale.idx"
+    stale.write_bytes(_HEADER.pack(INDEX_MAGIC, 0, 0))
+    assert load_index(str(stale), DOMAIN_KNOWLEDGE) is None
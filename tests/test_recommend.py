@@ -0,0 +1,81 @@
+import pytest
+
+from nvidia_sales_agent.compare import ComparisonEngine
+from nvidia_sales_agent.knowledge import DOMAIN_KNOWLEDGE
+from nvidia_sales_agent.orchestrator import OrchestratorAgent, RECOMMENDATION_AGENT
+from nvidia_sales_agent.product_agent import ProductCatalogAgent
+from nvidia_sales_agent.recommend import Recommender
+from nvidia_sales_agent.ui_notifier import UINotifier
+
+
+@pytest.fixture(scope="module")
+def recommender():
+    return Recommender(ComparisonEngine())
+
+
+def shortlist(recommender, query):
+    result = recommender.recommend(query)
+    return [recommender.engine.table.names[row] for row in result["shortlist"]]
+
+
+def test_budget_bounds_the_shortlist(recommender):
+    result = recommender.recommend("best gaming gpu under $800")
+    prices = recommender.engine.values["launch_price_usd"][result["shortlist"]]
+    assert result["use_case"] == "gaming"
+    assert result["constraints"] == [{"column": "launch_price_usd", "bound": "max", "value": 800.0,
+                                      "label": "budget"}]
+    assert len(result["shortlist"]) == 3
+    assert (prices <= 800).all()
+
+
+def test_binding_constraint_names_the_relaxed_pick(recommender):
+    result = recommender.recommend("best gaming gpu under $800")
+    assert [c["relaxed_pick"] for c in result["binding"]] == ["GeForce RTX 4090"]
+
+
+def test_infeasible_constraints_are_reported(recommender):
+    result = recommender.recommend("best gaming gpu under $100")
+    assert result["shortlist"] == []
+    assert [c["label"] for c in result["conflicts"]] == ["budget"]
+
+
+def test_gaming_models_are_not_machine_learning(recommender):
+    assert recommender.recommend("best GPU models for gaming under $700")["use_case"] == "gaming"
+
+
+def test_same_product_in_two_domains_is_listed_once(recommender):
+    names = shortlist(recommender, "best GPU to train models at 1440p")
+    assert not {"L40/L40S", "NVIDIA L40S"} <= set(names)
+    assert len(names) == 3
+    assert "NVIDIA L40S" in shortlist(recommender, "best data center gpu")
+
+
+def test_non_recommendation_questions_are_ignored(recommender):
+    assert recommender.recommend("What is DLSS?") is None
+    assert recommender.recommend("best way to learn CUDA") is None
+
+
+@pytest.fixture(scope="module")
+def orchestrator():
+    orchestrator = OrchestratorAgent(UINotifier(lambda notification: None))
+    for agent_id in DOMAIN_KNOWLEDGE:
+        orchestrator.register_agent(agent_id, ProductCatalogAgent(agent_id, claude_client=orchestrator.claude_client))
+    return orchestrator
+
+
+@pytest.mark.parametrize("query", [
+    "best networking for AI clusters",
+    "What's the best cloud gaming service for gamers?",
+    "What is the best NVIDIA product for autonomous vehicles?",
+])
+def test_non_gpu_best_questions_go_to_the_agents(orchestrator, query):
+    assert orchestrator._structured_response({"query": query}) is None
+
+
+@pytest.mark.parametrize("query", [
+    "best GPU models for gaming under $700",
+    "best card for 4k gaming",
+    "best workstation for 3d rendering",
+])
+def test_gpu_best_questions_are_solved(orchestrator, query):
+    assert orchestrator._structured_response({"query": query})["agent_id"] == RECOMMENDATION_AGENT
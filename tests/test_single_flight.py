@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from nvidia_sales_agent.deadline import Deadline, current_deadline, deadline_scope
+from nvidia_sales_agent.errors import DeadlineExceededError
+from nvidia_sales_agent.single_flight import SingleFlight
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    started = []
+
+    async def work(deadline):
+        started.append(deadline)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", work) for _ in range(3)])
+
+    results = run(main())
+    assert results == [("done", False), ("done", True), ("done", True)]
+    assert len(started) == 1
+    assert flight.coalesced_calls == 2
+    assert flight.in_flight() == 0
+
+
+def test_waiter_gives_up_at_its_own_deadline():
+    flight = SingleFlight()
+    deadlines = []
+
+    async def work(deadline):
+        deadlines.append(deadline)
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def caller(budget, delay=0.0):
+        await asyncio.sleep(delay)
+        with deadline_scope(Deadline(budget)):
+            try:
+                return await flight.do("key", work)
+            except DeadlineExceededError:
+                return "deadline"
+
+    async def main():
+        return await asyncio.gather(caller(0.05), caller(5.0, delay=0.01))
+
+    assert run(main()) == ["deadline", ("done", True)]
+    # The run is bounded by the latest waiter's deadline, not the first caller's
+    assert deadlines[0].remaining() > 4
+
+
+def test_run_is_cancelled_when_every_waiter_gives_up():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work(deadline):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        with deadline_scope(Deadline(0.05)):
+            with pytest.raises(DeadlineExceededError):
+                await flight.do("key", work)
+        await asyncio.sleep(0.01)
+
+    run(main())
+    assert cancelled == [True]
+    assert flight.in_flight() == 0
+
+
+def test_run_does_not_inherit_the_callers_context():
+    flight = SingleFlight()
+
+    async def work(deadline):
+        return current_deadline(), deadline.remaining()
+
+    async def main():
+        with deadline_scope(Deadline(5.0)):
+            return await flight.do("key", work)
+
+    (inherited, remaining), _ = run(main())
+    assert inherited is None
+    assert 4 < remaining <= 5
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def work(deadline):
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+
+    assert [type(result) for result in run(main())] == [ValueError, ValueError]
@@ -0,0 +1,37 @@
+import pytest
+
+from nvidia_sales_agent.knowledge import DOMAIN_KNOWLEDGE
+from nvidia_sales_agent.specs import SpecTable
+
+
+@pytest.fixture(scope="module")
+def table():
+    return SpecTable(DOMAIN_KNOWLEDGE)
+
+
+def test_direct_spec_question(table):
+    assert table.lookup("TDP of the 4070 Ti?") == "GeForce RTX 4070 Ti TDP: 285W"
+
+
+def test_bare_model_token_names_the_product(table):
+    assert table.lookup("How much memory does the H100 have?") == "NVIDIA H100 NVL Memory: 80GB HBM3 memory"
+
+
+def test_several_columns_list_each_value(table):
+    answer = table.lookup("How much memory and what memory interface does the RTX 4090 have?")
+    assert answer.splitlines() == ["GeForce RTX 4090:", "- Memory Interface: 384-bit", "- Memory: 24GB GDDR6X"]
+
+
+def test_network_interface_is_not_the_memory_interface(table):
+    assert table.columns_for("What interface does ConnectX-7 use?") == []
+    assert table.lookup("What interface does ConnectX-7 use?") is None
+
+
+@pytest.mark.parametrize("query", [
+    "Is the RTX 4090 good for 4K gaming?",
+    "Compare the memory of the RTX 4080 and RTX 4090",
+    "TDP of the H100?",
+    "How much memory do I need for gaming?",
+])
+def test_questions_the_table_cannot_answer(table, query):
+    assert table.lookup(query) is None
@@ -4,9 +4,10 @@ import datetime
 import threading
 import uuid
 from collections import defaultdict
-from queue import Queue
+from queue import Queue, Empty
 import json
-from flask import Flask, render_template, request, jsonify
+import math
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import os
 from threading import Thread
 
@@ -32,6 +33,10 @@ else:
 from nvidia_sales_agent.orchestrator import OrchestratorAgent
 from nvidia_sales_agent.product_agent import ProductCatalogAgent
 from nvidia_sales_agent.claude_helper import ClaudeClient
+from nvidia_sales_agent.completion_cache import CompletionCache
+from nvidia_sales_agent.rate_limiter import get_shared_rate_limiter
+from nvidia_sales_agent.usage import get_stage_latency_stats
+from nvidia_sales_agent.hedging import HedgePolicy
 
 app = Flask(__name__)
 
@@ -50,6 +55,18 @@ product_domains = [
     "Cloud Gaming Services"
 ]
 
+# Completion cache shared by all sessions; set COMPLETION_CACHE_DB to persist it across restarts
+completion_cache = CompletionCache(db_path=os.environ.get("COMPLETION_CACHE_DB"))
+
+# Latency budget for each query in seconds; a request may ask for its own with 'deadline'
+QUERY_DEADLINE = float(os.environ.get("QUERY_DEADLINE_SECONDS", "20"))
+
+# Hedging of straggling agent calls, with latency histograms shared by all sessions
+hedge_policy = HedgePolicy()
+
+# Orchestration stage graph: default, fused, fast, degraded or incremental (see orchestrator.PIPELINES)
+PIPELINE = os.environ.get("ORCHESTRATOR_PIPELINE", "fused")
+
 class UINotifier:
     """
     Handles notifying the UI of events via a notification queue.
@@ -86,7 +103,8 @@ class SalesAgentSession:
         # Create Claude client
         try:
             # Try to create a Claude client
-            claude_client = ClaudeClient()
+            claude_client = ClaudeClient(cache=completion_cache, hedge_policy=hedge_policy)
+            claude_client.add_call_observer(self.on_llm_call)
             using_claude = True
         except ValueError:
             # Fallback if no API key is available
@@ -99,7 +117,9 @@ class SalesAgentSession:
             agents[domain] = ProductCatalogAgent(domain, claude_client=claude_client)
             
         # Create orchestrator that will coordinate the agents
-        orchestrator = OrchestratorAgent(self.ui_notifier, claude_client=claude_client)
+        orchestrator = OrchestratorAgent(self.ui_notifier, claude_client=claude_client,
+                                         session_id=self.session_id, speculative=True,
+                                         pipeline=PIPELINE)
         
         # Register all agents with the orchestrator
         for agent_id, agent in agents.items():
@@ -119,15 +139,40 @@ class SalesAgentSession:
             "timestamp": datetime.datetime.now().isoformat()
         })
         
-    async def process_query(self, query):
+    def on_llm_call(self, call_info):
+        """
+        Surface noticeable queueing for shared LLM capacity in the activity log
         """
-        Process a user query through the orchestrator
+        if call_info["queue_wait_ms"] >= 100:
+            self.ui_notifier.notify({
+                "type": "orchestrator_thinking",
+                "message": f"Waited {call_info['queue_wait_ms']:.0f} ms for LLM capacity",
+                "timestamp": datetime.datetime.now().isoformat()
+            })
+        
+    async def process_query(self, query, deadline=None):
         """
-        return await self.orchestrator.process_query(query)
+        Process a user query through the orchestrator within a latency budget
+        
+        Returns a dict with the 'response' text and its 'usage' accounting
+        """
+        return await self.orchestrator.process_query(query, include_usage=True,
+                                                     deadline=QUERY_DEADLINE if deadline is None else deadline)
 
 # Queue to store notifications for each session
 notification_queues = defaultdict(Queue)
 
+# Single long-lived event loop shared by all sessions, so every ClaudeClient
+# reuses the same pooled keep-alive connections instead of reconnecting per query
+event_loop = asyncio.new_event_loop()
+
+def run_event_loop():
+    """Run the shared event loop in a background thread"""
+    asyncio.set_event_loop(event_loop)
+    event_loop.run_forever()
+
+Thread(target=run_event_loop, daemon=True).start()
+
 @app.route('/')
 def index():
     """Render the main page"""
@@ -142,26 +187,55 @@ def api_create_session():
     # Create notification queue for this session
     notification_queues[session_id] = Queue()
     
-    # Define function to initialize session with proper event loop
-    def init_session():
-        # Set up a new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Create the session with the notification queue
-        session = SalesAgentSession(session_id, notification_queues[session_id])
-        session.create_agents()
-        
-        # Store the session
-        agent_sessions[session_id] = session
+    # Create the session with the notification queue
+    session = SalesAgentSession(session_id, notification_queues[session_id])
+    session.create_agents()
     
-    # Run initialization in a separate thread
-    init_thread = Thread(target=init_session)
-    init_thread.start()
-    init_thread.join()  # Wait for initialization to complete
+    # Store the session
+    agent_sessions[session_id] = session
     
     return jsonify({"session_id": session_id})
 
+def parse_deadline(value):
+    """
+    Validate the latency budget of a query request
+    
+    Returns the budget in seconds (None if not given); raises ValueError unless
+    it is a positive, finite number
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("deadline must be a number of seconds")
+    try:
+        deadline = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("deadline must be a number of seconds")
+    if not math.isfinite(deadline) or deadline <= 0:
+        raise ValueError("deadline must be a positive number of seconds")
+    return deadline
+
+def report_query_failure(session_id, future):
+    """
+    Send the failure of a query, if it failed, to the session as its response
+    
+    Without it the error would stay in the unread future and the UI would wait forever
+    """
+    if future.cancelled():
+        error = "the query was cancelled"
+    elif future.exception() is not None:
+        error = str(future.exception()) or type(future.exception()).__name__
+    else:
+        return
+    print(f"Error processing query for session {session_id}: {error}")
+    notification_queues[session_id].put({
+        "type": "response",
+        "message": f"Sorry, something went wrong while answering: {error}",
+        "error": True,
+        "session_id": session_id,
+        "timestamp": datetime.datetime.now().isoformat()
+    })
+
 @app.route('/api/query', methods=['POST'])
 def api_query():
     """Process a user query"""
@@ -174,28 +248,34 @@ def api_query():
             "error": "Missing session_id or query"
         }), 400
         
+    try:
+        deadline = parse_deadline(data.get('deadline'))
+    except ValueError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+        
     if session_id not in agent_sessions:
         return jsonify({
             "error": "Invalid session_id"
         }), 404
         
-    # Process query asynchronously
-    def process():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
+    # Process query asynchronously on the shared event loop
+    async def process():
         session = agent_sessions[session_id]
-        response = loop.run_until_complete(session.process_query(query))
+        result = await session.process_query(query, deadline)
         
         # Add final response to notification queue
         notification_queues[session_id].put({
             "type": "response",
-            "message": response,
+            "message": result["response"],
+            "usage": result["usage"],
             "session_id": session_id,
             "timestamp": datetime.datetime.now().isoformat()
         })
         
-    Thread(target=process).start()
+    future = asyncio.run_coroutine_threadsafe(process(), event_loop)
+    future.add_done_callback(lambda future: report_query_failure(session_id, future))
     
     return jsonify({"status": "processing"})
 
@@ -223,6 +303,72 @@ def api_get_notifications():
         
     return jsonify({"notifications": notifications})
 
+@app.route('/api/events', methods=['GET'])
+def api_events():
+    """Stream notifications for a session as server-sent events"""
+    session_id = request.args.get('session_id')
+    
+    if not session_id:
+        return jsonify({
+            "error": "Missing session_id"
+        }), 400
+        
+    if session_id not in notification_queues:
+        return jsonify({
+            "error": "Invalid session_id"
+        }), 404
+        
+    queue = notification_queues[session_id]
+    
+    def generate():
+        while True:
+            try:
+                notification = queue.get(timeout=15)
+            except Empty:
+                # Comment line keeps the connection alive through proxies
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(notification)}\n\n"
+            
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/cache_stats', methods=['GET'])
+def api_cache_stats():
+    """Get completion cache hit/miss/eviction counters"""
+    return jsonify(completion_cache.stats())
+
+@app.route('/api/stage_stats', methods=['GET'])
+def api_stage_stats():
+    """Get per-stage, per-model Claude latency across queries"""
+    return jsonify(get_stage_latency_stats().stats())
+
+@app.route('/api/hedge_stats', methods=['GET'])
+def api_hedge_stats():
+    """Get request hedging counters and current hedge thresholds"""
+    return jsonify(hedge_policy.stats())
+
+@app.route('/api/routing_stats', methods=['GET'])
+def api_routing_stats():
+    """Get routing, speculation, sufficiency assessment, confidence, incremental refinement, comparison and
+    recommendation counters summed over all sessions"""
+    totals = {"routing": defaultdict(int), "speculation": defaultdict(int), "assessment": defaultdict(int),
+              "confidence": defaultdict(int), "incremental": defaultdict(int),
+              "comparison": defaultdict(int), "recommendation": defaultdict(int)}
+    for session in list(agent_sessions.values()):
+        orchestrator = getattr(session, "orchestrator", None)
+        if orchestrator is None:
+            continue
+        for name, counters in totals.items():
+            for key, value in getattr(orchestrator, f"{name}_stats").items():
+                counters[key] += value
+    return jsonify(totals)
+
+@app.route('/api/limiter_stats', methods=['GET'])
+def api_limiter_stats():
+    """Get queueing statistics from the shared LLM rate limiter"""
+    return jsonify(get_shared_rate_limiter().stats())
+
 if __name__ == '__main__':
     # Ensure template directory exists
     os.makedirs('templates', exist_ok=True)